@@ -0,0 +1,92 @@
+# ai_ledger.py
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+
+from metrics import CACHE_REQUESTS
+
+QUOTA_REGEX = re.compile(r'(\d+)\s*(?:ai\s+)?queries\s+left|queries\s+left\D*(\d+)', re.IGNORECASE)
+
+class AIQuotaLedger:
+    """Persistent record of the remaining daily Blackbird AI queries"""
+
+    def __init__(self, path=os.path.join("results", "ai_quota.json")):
+        self.path = path
+        self.data = {"date": None, "remaining": None, "updated": None, "history": []}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.data.update(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Could not read AI quota ledger: {e}")
+
+    def record_from_line(self, text):
+        """Update the ledger from an 'ai queries left' line, returns the new count or None"""
+        if 'queries left' not in text.lower():
+            return None
+        match = QUOTA_REGEX.search(text)
+        if not match:
+            return None
+        remaining = int(match.group(1) or match.group(2))
+        self.record(remaining)
+        return remaining
+
+    def record(self, remaining):
+        now = datetime.now()
+        self.data["date"] = now.strftime("%Y-%m-%d")
+        self.data["remaining"] = remaining
+        self.data["updated"] = now.strftime("%Y-%m-%d %H:%M:%S")
+        # Keep a short trail so quota burn can be audited
+        self.data["history"] = (self.data.get("history") or [])[-99:] + [[self.data["updated"], remaining]]
+        self.save()
+
+    def remaining_today(self):
+        """Remaining queries today, or None when unknown (no data yet or the quota has reset)"""
+        if self.data.get("date") != datetime.now().strftime("%Y-%m-%d"):
+            return None
+        return self.data.get("remaining")
+
+    def has_quota(self):
+        remaining = self.remaining_today()
+        return remaining is None or remaining > 0
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=4)
+
+def result_set_hash(target, hits):
+    """Hash of a target's result set; unchanged hits mean an unchanged AI report"""
+    digest = hashlib.sha256(target.encode('utf-8'))
+    for site, url in sorted(set(hits)):
+        digest.update(f"\n{site}\t{url}".encode('utf-8'))
+    return digest.hexdigest()
+
+class AIReportCache:
+    """AI reports keyed by result_set_hash(), one text file each"""
+
+    def __init__(self, directory=os.path.join("results", "ai_cache")):
+        self.directory = directory
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key):
+        try:
+            with open(self.path_for(key), 'r', encoding='utf-8') as f:
+                report = f.read()
+        except OSError:
+            CACHE_REQUESTS.inc(cache="ai_report", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="ai_report", result="hit")
+        return report
+
+    def put(self, key, report):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        with open(self.path_for(key), 'w', encoding='utf-8') as f:
+            f.write(report)
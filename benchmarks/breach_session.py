@@ -0,0 +1,142 @@
+# benchmarks/breach_session.py
+# Compare per-lookup latency of one-off requests.get/requests.post calls (a new
+# connection for the status check and another for the search) with the shared
+# keep-alive BreachClient, against a local breach.vip stand-in:
+#   python benchmarks/breach_session.py --lookups 200 --handshake-ms 30
+# --handshake-ms delays the first response of every connection, standing in for the
+# TCP+TLS round trips of the real service. With --certfile/--keyfile the stand-in
+# speaks TLS itself, the certificate must be valid for 127.0.0.1:
+#   openssl req -x509 -newkey rsa:2048 -nodes -keyout key.pem -out cert.pem -days 1 \
+#       -subj /CN=127.0.0.1 -addext subjectAltName=IP:127.0.0.1
+import os
+import sys
+import ssl
+import socket
+import gzip
+import json
+import time
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    handshake_seconds = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # Like a real server: headers and body must not wait on the client's delayed ACK
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with StandInHandler.lock:
+            StandInHandler.connections += 1
+        time.sleep(self.handshake_seconds)
+
+    def send_body(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_body({'status': 'ok'})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        term = request.get('term', '')
+        self.send_body({'results': [{'source': f"Breach {i}", 'email': term, 'username': term.split('@')[0],
+                                     'password': 'x' * 12} for i in range(25)]})
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stand_in(handshake_seconds, certfile=None, keyfile=None):
+    StandInHandler.handshake_seconds = handshake_seconds
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    scheme = "http"
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}"
+
+def one_off_lookup(base_url, email):
+    """What a lookup did before the shared session: status check, then search, each on a new connection"""
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    requests.get(base_url + "/", headers=headers, timeout=10).raise_for_status()
+    response = requests.post(base_url + "/api/search", json={'term': email, 'fields': ['email']},
+                             headers=headers, timeout=30)
+    return response.json()
+
+def pooled_lookup(breach_vip, email):
+    if not breach_vip.check_breach_vip_status():
+        raise RuntimeError("stand-in reported as down")
+    result = breach_vip.search_single_email_api(email)
+    if not result['success']:
+        raise RuntimeError(result['error'])
+    return result['data']
+
+def measure(lookup, count):
+    StandInHandler.connections = 0
+    latencies = []
+    for i in range(count):
+        started = time.perf_counter()
+        data = lookup(f"user{i}@example.com")
+        latencies.append(time.perf_counter() - started)
+        assert len(data['results']) == 25
+    return latencies, StandInHandler.connections
+
+def report(name, latencies, connections):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) >= 20 else ordered[-1]
+    print(f"{name:<22} mean {statistics.mean(latencies) * 1000:7.2f}ms  "
+          f"p50 {statistics.median(latencies) * 1000:7.2f}ms  p95 {p95 * 1000:7.2f}ms  "
+          f"{connections} connection(s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the shared breach.vip session")
+    parser.add_argument("--lookups", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=20,
+                        help="Delay before the first response of each connection")
+    parser.add_argument("--certfile", help="Serve TLS with this certificate (self-signed is fine)")
+    parser.add_argument("--keyfile")
+    args = parser.parse_args(argv)
+
+    server, base_url = start_stand_in(args.handshake_ms / 1000, args.certfile, args.keyfile)
+    # The modules read the base URL when breach_client is first imported
+    os.environ["CROW_BREACH_VIP_URL"] = base_url
+    # Measure the connections, not the 15/min search limit (it applies to breach.vip, not the stand-in)
+    os.environ["CROW_BREACH_VIP_RATE"] = "1000000000"
+    import breach_vip
+    from breach_client import CLIENT
+    if args.certfile:
+        # Both variants verify the stand-in's certificate like they would breach.vip's
+        os.environ["REQUESTS_CA_BUNDLE"] = args.certfile
+
+    one_off, one_off_connections = measure(lambda email: one_off_lookup(base_url, email), args.lookups)
+    pooled, pooled_connections = measure(lambda email: pooled_lookup(breach_vip, email), args.lookups)
+    CLIENT.close()
+    server.shutdown()
+
+    print(f"{args.lookups} lookups against {base_url}, {args.handshake_ms:g}ms per new connection")
+    report("requests.get/post", one_off, one_off_connections)
+    report("BreachClient session", pooled, pooled_connections)
+    print(f"Speed-up:              {statistics.mean(one_off) / statistics.mean(pooled):7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# benchmarks/output_render.py
+# Compare QTextEdit.append (one rich-text parse and layout per line) with OutputView
+# (cached formats, batched cursor inserts). Runs headless:
+#   QT_QPA_PLATFORM=offscreen python benchmarks/output_render.py --lines 50000
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtWidgets import QApplication, QTextEdit
+from output_view import OutputView
+
+def sample_lines(count):
+    """Blackbird-like output: mostly misses, some hits, errors and AI lines"""
+    lines = []
+    for i in range(count):
+        if i % 50 == 0:
+            lines.append(f"✔️  [Site{i}] https://site{i}.example/user")
+        elif i % 37 == 0:
+            lines.append(f"❌  [Site{i}] Error")
+        elif i % 101 == 0:
+            lines.append(f"[Summary] Profile line {i} with <angle brackets> & ampersands")
+        else:
+            lines.append(f"❌  [Site{i}] Not Found")
+    return lines
+
+def run(view, lines, app, per_event):
+    """Append every line, letting the event loop run every per_event lines like queued signals do"""
+    started = time.perf_counter()
+    for i, line in enumerate(lines, 1):
+        view.append(line)
+        if i % per_event == 0:
+            app.processEvents()
+    if isinstance(view, OutputView):
+        view.flush()
+    app.processEvents()
+    return time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the output area renderers")
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--per-event", type=int, default=20,
+                        help="Lines delivered between two event-loop iterations")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    lines = sample_lines(args.lines)
+
+    legacy = QTextEdit()
+    legacy.setReadOnly(True)
+    legacy.resize(1000, 600)
+    legacy.show()
+    legacy_seconds = run(legacy, lines, app, args.per_event)
+
+    view = OutputView()
+    view.resize(1000, 600)
+    view.show()
+    view_seconds = run(view, lines, app, args.per_event)
+
+    # Same visible text either way
+    assert legacy.toPlainText() == view.toPlainText(), "Renderers produced different text"
+
+    print(f"{args.lines} lines, event loop every {args.per_event} line(s)")
+    print(f"QTextEdit.append: {legacy_seconds:8.3f}s  ({args.lines / legacy_seconds:10.0f} lines/s)")
+    print(f"OutputView:       {view_seconds:8.3f}s  ({args.lines / view_seconds:10.0f} lines/s)")
+    print(f"Speed-up:         {legacy_seconds / view_seconds:8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# blackbird_output.py
+import re
+
+# Blackbird prints one line per checked site, e.g.
+#   ✔️  [GitHub] https://github.com/user
+#   ❌  [Reddit] Not Found          (only with --verbose)
+#   ❌  [Twitch] Error              (only with --verbose)
+# Rich markup is stripped when stdout is a pipe, so only plain text reaches us.
+SITE_LINE_REGEX = re.compile(r'^\s*(?P<mark>✔️|✔|✅|❌|✖️|✖)?\s*\[(?P<site>[^\]]+)\]\s*(?P<rest>.*)$')
+URL_REGEX = re.compile(r'https?://\S+')
+
+HIT = "hit"
+MISS = "miss"
+ERROR = "error"
+
+def classify_line(text):
+    """Return 'hit', 'miss', 'error' or None for a line of Blackbird output"""
+    match = SITE_LINE_REGEX.match(text)
+    if not match:
+        return None
+
+    mark = match.group('mark') or ''
+    rest = match.group('rest').lower()
+
+    if mark in ('✔️', '✔', '✅') and URL_REGEX.search(match.group('rest')):
+        return HIT
+    if 'error' in rest or 'timeout' in rest or 'timed out' in rest:
+        return ERROR
+    if mark in ('❌', '✖️', '✖') or 'not found' in rest:
+        return MISS
+    return None
+
+def parse_hit(text):
+    """Return (site, url) for a hit line, or None"""
+    if classify_line(text) != HIT:
+        return None
+    match = SITE_LINE_REGEX.match(text)
+    url = URL_REGEX.search(match.group('rest')).group(0)
+    return match.group('site').strip(), url
+
+def parse_site(text):
+    """Return the site name of a per-site line, or None"""
+    match = SITE_LINE_REGEX.match(text)
+    return match.group('site').strip() if match else None
+
+# Display levels of the output area, filtering happens in the worker before emitting
+DISPLAY_HITS = 0
+DISPLAY_HITS_ERRORS = 1
+DISPLAY_ALL = 2
+DISPLAY_LEVELS = {DISPLAY_HITS: "Hits only", DISPLAY_HITS_ERRORS: "Hits + errors", DISPLAY_ALL: "Everything"}
+
+def should_display(category, level):
+    """Per-site misses/errors below the display level are hidden, every other line is shown"""
+    if category == MISS:
+        return level >= DISPLAY_ALL
+    if category == ERROR:
+        return level >= DISPLAY_HITS_ERRORS
+    return True
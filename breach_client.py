@@ -0,0 +1,93 @@
+# breach_client.py
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+from net_budget import DEFAULT_TOTAL
+from rate_limiter import TokenBucket
+
+DEFAULT_BASE_URL = "https://breach.vip"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+# Connections kept alive per host. Breach requests never run more than the network
+# budget allows, so this only matters when the budget total is raised above the default
+POOL_MAXSIZE = DEFAULT_TOTAL
+# Hosts with a pool of their own (breach.vip and at most one fallback)
+POOL_CONNECTIONS = 2
+# Longest wait for a network slot: lookups run on the GUI thread, so a busy budget
+# skips them instead of freezing the window until another scan finishes
+SLOT_TIMEOUT = 10
+# Longest wait for the rate limiter, for the same reason: a search that would have to
+# sit out a server-imposed pause fails with the time left instead
+LIMIT_TIMEOUT = 10
+# Documented breach.vip limit on searches
+DEFAULT_RATE_PER_MINUTE = 15
+
+def rate_per_minute():
+    """Search rate from CROW_BREACH_VIP_RATE (requests per minute), else the documented limit"""
+    try:
+        rate = float(os.environ.get("CROW_BREACH_VIP_RATE", DEFAULT_RATE_PER_MINUTE))
+    except ValueError:
+        print("Warning: CROW_BREACH_VIP_RATE is not a number, using the default")
+        return DEFAULT_RATE_PER_MINUTE
+    return rate if rate > 0 else DEFAULT_RATE_PER_MINUTE
+
+class BreachClient:
+    """Keep-alive session shared by the breach.vip modules
+
+    Every lookup used to open a new TCP+TLS connection for the status check and
+    another for the search. Here they reuse pooled connections to the same host.
+    The session's headers are set once and never changed afterwards, so threads can
+    share it freely (urllib3's pool and the cookie jar do their own locking).
+    """
+
+    def __init__(self, base_url=None, pool_maxsize=POOL_MAXSIZE):
+        self.base_url = (base_url or os.environ.get("CROW_BREACH_VIP_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.pool_maxsize = pool_maxsize
+        self.lock = threading.Lock()
+        self.session = None
+
+    def new_session(self):
+        session = requests.Session()
+        # Not blocking: an extra request gets a throwaway connection instead of waiting
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=self.pool_maxsize,
+                              pool_block=False)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            'User-Agent': USER_AGENT,
+            # gzip and deflate, plus br/zstd when their decoders are installed
+            'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
+            'Connection': 'keep-alive',
+        })
+        return session
+
+    def get_session(self):
+        if self.session is None:
+            with self.lock:
+                if self.session is None:
+                    self.session = self.new_session()
+        return self.session
+
+    def url(self, path):
+        return self.base_url + path
+
+    def get(self, path, **kwargs):
+        return self.get_session().get(self.url(path), **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.get_session().post(self.url(path), **kwargs)
+
+    def close(self):
+        with self.lock:
+            session, self.session = self.session, None
+        if session is not None:
+            session.close()
+
+# Shared by breach_vip and breach_vip_username
+CLIENT = BreachClient()
+# One search budget for both modules, whichever thread or batch they run in.
+# Capacity 1: no bursts, so no sliding minute ever sees more than the limit
+LIMITER = TokenBucket(rate_per_minute() / 60, capacity=1, name="breach_vip")
@@ -1,39 +1,60 @@
 # breach_vip_email_hooks
 import os
+import sys
+import argparse
 import json
 import re
 import time
 import requests
 import socket
 from datetime import datetime
-from PyQt6.QtWidgets import QMessageBox
+from metrics import record_breach_request
+from net_budget import BUDGET
+from breach_client import CLIENT, LIMITER, SLOT_TIMEOUT, LIMIT_TIMEOUT
+from correlation_index import index_breach_results
+from event_bus import Publisher, ConsoleSink, FileSink
+
+# Event bus source name; callers pick the channel (the GUI passes the run's tab)
+SOURCE = "breach_vip"
 
 def is_enabled(parent):
     """Check if email search is enabled"""
     return hasattr(parent, 'enable_breach_email_checkbox') and parent.enable_breach_email_checkbox.isChecked()
 
-def check_breach_vip_status():
-    """Check if Breach.vip is accessible with multiple endpoints"""
+def check_breach_vip_status(events=None):
+    """Check if Breach.vip is accessible with multiple endpoints (a busy network budget counts as not accessible)"""
     test_endpoints = [
-        "https://breach.vip/",
-        "https://breach.vip/api/status",
-        "https://breach.vip/api/search",  # Main API endpoint
+        "/",
+        "/api/status",
+        "/api/search",  # Main API endpoint
     ]
     
     headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'Accept': 'application/json, text/html, */*'
     }
     
     for endpoint in test_endpoints:
-        try:
-            response = requests.get(endpoint, headers=headers, timeout=10)
-            if response.status_code < 500:  # Not a server error
-                return True
-            else:
-                print(f"⚠️  {endpoint}: HTTP {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️  {endpoint}: {e}")
+        status_code = None
+        with BUDGET.try_slot("breach", SLOT_TIMEOUT) as acquired:
+            if not acquired:
+                message = f"⏳ No free network slot within {SLOT_TIMEOUT}s, skipping the Breach.vip status check"
+                if events:
+                    events.warning(message)
+                else:
+                    print(message)
+                return False
+            started = time.perf_counter()
+            try:
+                response = CLIENT.get(endpoint, headers=headers, timeout=10)
+                status_code = response.status_code
+                if response.status_code < 500:  # Not a server error
+                    return True
+                else:
+                    print(f"⚠️  {CLIENT.url(endpoint)}: HTTP {response.status_code}")
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️  {CLIENT.url(endpoint)}: {e}")
+            finally:
+                record_breach_request("email", "status", started, status_code)
     
     return False
 
@@ -45,58 +66,60 @@ def get_alternative_api_endpoints():
         # Note: These may require API keys or have different interfaces
     ]
 
-def process_single_email(email, output_area):
+def process_single_email(email, events=None):
     """Process a single email for Breach.vip search"""
-    if not output_area:
-        return
-        
+    events = events or Publisher(SOURCE)
     # Validate email format
     if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-        output_area.append(f"❌ Invalid email format: {email}")
+        events.warning(f"❌ Invalid email format: {email}")
         return
     
-    output_area.append(f"🔍 Searching Breach.vip for email: {email}")
+    events.progress(f"🔍 Searching Breach.vip for email: {email}")
     
     # Check if Breach.vip is accessible
-    if not check_breach_vip_status():
-        output_area.append("⚠️  Breach.vip appears to be down or unreachable")
-        output_area.append("💡 Trying alternative methods...")
+    if not check_breach_vip_status(events):
+        events.warning("⚠️  Breach.vip appears to be down or unreachable")
+        events.progress("💡 Trying alternative methods...")
         
         # Try alternative check methods
         result = search_single_email_fallback(email)
         if result.get('success', False):
             data = result['data']
-            display_email_results(data, email, output_area, source="Alternative")
+            display_email_results(data, email, events, source="Alternative")
         else:
-            output_area.append("❌ All search methods failed")
-            output_area.append("Please try again later or check your internet connection")
+            events.warning("❌ All search methods failed")
+            events.progress("Please try again later or check your internet connection")
         return
     
     try:
         result = search_single_email_api(email)
+        events.metric("lookup", target=email, success=result.get('success', False),
+                      status_code=result.get('status_code'))
         
         if result.get('success', False):
             data = result['data']
-            display_email_results(data, email, output_area)
+            display_email_results(data, email, events)
+            index_breach_results(email, data)
+            events.result("breach", target=email, records=data.get('results') or [])
         else:
             error_msg = result.get('error', 'Unknown error')
-            output_area.append(f"❌ Search failed: {error_msg}")
+            events.warning(f"❌ Search failed: {error_msg}")
             
             # If API returns 503/500, try fallback
-            if '503' in error_msg or '500' in error_msg:
-                output_area.append("🔄 Trying fallback method...")
+            if result.get('status_code') in (500, 503):
+                events.progress("🔄 Trying fallback method...")
                 result = search_single_email_fallback(email)
                 if result.get('success', False):
                     data = result['data']
-                    display_email_results(data, email, output_area, source="Fallback")
+                    display_email_results(data, email, events, source="Fallback")
             
     except Exception as e:
-        output_area.append(f"❌ Error searching {email}: {e}")
-        output_area.append("🔄 Trying fallback method...")
+        events.warning(f"❌ Error searching {email}: {e}")
+        events.progress("🔄 Trying fallback method...")
         result = search_single_email_fallback(email)
         if result.get('success', False):
             data = result['data']
-            display_email_results(data, email, output_area, source="Fallback")
+            display_email_results(data, email, events, source="Fallback")
 
 def search_single_email_fallback(email):
     """Fallback method for email search when API is down"""
@@ -131,16 +154,18 @@ def search_single_email_fallback(email):
             'source': 'fallback'
         }
 
-def process_email_file(file_path, output_area):
-    """Process a file containing multiple emails for Breach.vip search"""
-    if not output_area:
-        return
-    
+def process_email_file(file_path, events=None, confirm=None):
+    """Process a file containing multiple emails for Breach.vip search
+
+    confirm(title, question) decides whether a multi-email batch goes ahead
+    (the GUI asks the user); without it the batch runs.
+    """
+    events = events or Publisher(SOURCE)
     # Check service status before processing file
-    if not check_breach_vip_status():
-        output_area.append("❌ Breach.vip appears to be down or unreachable")
-        output_area.append("⚠️  Cannot process file while service is unavailable")
-        output_area.append("💡 Please try again later")
+    if not check_breach_vip_status(events):
+        events.warning("❌ Breach.vip appears to be down or unreachable")
+        events.warning("⚠️  Cannot process file while service is unavailable")
+        events.progress("💡 Please try again later")
         return
     
     try:
@@ -148,7 +173,7 @@ def process_email_file(file_path, output_area):
             emails = [line.strip() for line in f if line.strip()]
             
         if not emails:
-            QMessageBox.warning(None, "File Error", "The file is empty or contains no valid emails.")
+            events.warning("❌ The file is empty or contains no valid emails.")
             return
             
         valid_emails = []
@@ -163,27 +188,24 @@ def process_email_file(file_path, output_area):
                 invalid_emails.append(email)
                 
         if not valid_emails:
-            QMessageBox.warning(None, "File Error", "No valid email addresses found in the file.")
+            events.warning("❌ No valid email addresses found in the file.")
             return
             
         # Show confirmation dialog for multiple emails
         if len(valid_emails) > 1:
-            reply = QMessageBox.question(
-                None,
-                "Multiple Emails Found",
+            question = (
                 f"Found {len(valid_emails)} valid email(s) and {len(invalid_emails)} invalid entry(s).\n\n"
-                f"Do you want to search all {len(valid_emails)} emails? This may take a while due to rate limits.",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                f"Do you want to search all {len(valid_emails)} emails? This may take a while due to rate limits."
             )
-            if reply != QMessageBox.StandardButton.Yes:
+            if confirm and not confirm("Multiple Emails Found", question):
                 return
                 
         # Process all valid emails
-        output_area.append(f"📁 Processing {len(valid_emails)} email(s) from file: {os.path.basename(file_path)}")
+        events.progress(f"📁 Processing {len(valid_emails)} email(s) from file: {os.path.basename(file_path)}")
         if invalid_emails:
-            output_area.append(f"⚠️  Skipped {len(invalid_emails)} invalid entries")
+            events.warning(f"⚠️  Skipped {len(invalid_emails)} invalid entries")
             
-        output_area.append("=" * 60)
+        events.progress("=" * 60)
     
         # Create results directory if it doesn't exist
         results_dir = "results"
@@ -196,23 +218,31 @@ def process_email_file(file_path, output_area):
         batch_filepath = os.path.join(results_dir, batch_filename)
         
         all_results = []
+        sent = 0
         service_down = False
         
         for i, email in enumerate(valid_emails, 1):
             if service_down:
-                output_area.append(f"⚠️  Skipping remaining emails - service unavailable")
+                events.warning(f"⚠️  Skipping remaining emails - service unavailable")
                 break
                 
-            output_area.append(f"\n🔍 [{i}/{len(valid_emails)}] Searching: {email}")
+            events.progress(f"\n🔍 [{i}/{len(valid_emails)}] Searching: {email}")
             
             try:
                 # Re-check service status periodically
-                if i % 5 == 0 and not check_breach_vip_status():
-                    output_area.append("❌ Breach.vip service became unavailable")
+                if i % 5 == 0 and not check_breach_vip_status(events):
+                    events.warning("❌ Breach.vip service became unavailable")
                     service_down = True
                     break
                 
-                result = search_single_email_api(email)
+                # Every search of the batch goes out: a server-imposed pause is waited out
+                result = search_single_email_api(email, limit_timeout=None)
+                sent += result.get('sent', True)
+                if result.get('success', False):
+                    index_breach_results(email, result.get('data'))
+                    events.result("breach", target=email, records=(result.get('data') or {}).get('results') or [])
+                events.metric("lookup", target=email, success=result.get('success', False),
+                              status_code=result.get('status_code'))
                 all_results.append({
                     'email': email,
                     'result': result,
@@ -225,26 +255,22 @@ def process_email_file(file_path, output_area):
                     if data.get('results') and len(data['results']) > 0:
                         record_count = len(data['results'])
                         unique_breaches = len(set(r.get('source', '') for r in data['results']))
-                        output_area.append(f"   🚨 Found {record_count} records across {unique_breaches} breaches")
+                        events.record(f"   🚨 Found {record_count} records across {unique_breaches} breaches",
+                                      target=email, records=record_count, breaches=unique_breaches)
                     else:
-                        output_area.append(f"   ✅ No breach records found")
+                        events.record(f"   ✅ No breach records found", target=email, records=0)
                 else:
                     error_msg = result.get('error', 'Unknown error')
-                    output_area.append(f"   ❌ Search failed: {error_msg}")
+                    events.warning(f"   ❌ Search failed: {error_msg}")
                     
                     # Check if it's a service error
-                    if any(code in error_msg for code in ['503', '500', '429']):
-                        output_area.append("   ⚠️  Service error detected")
-                        if '429' in error_msg:
-                            output_area.append("   💤 Rate limited, waiting 60 seconds...")
-                            time.sleep(60)
-                
-                # Respect rate limit - wait between requests
-                if i < len(valid_emails):  # Don't wait after the last one
-                    time.sleep(4)  # 4 seconds between requests to stay under 15/minute
-                    
+                    if result.get('status_code') in (500, 503):
+                        events.warning("   ⚠️  Service error detected")
+                    elif result.get('status_code') == 429 and i < len(valid_emails):
+                        events.progress(f"   💤 Rate limited, next search in {LIMITER.delay():.0f} seconds...")
+
             except Exception as e:
-                output_area.append(f"   ❌ Error searching {email}: {e}")
+                events.warning(f"   ❌ Error searching {email}: {e}")
                 all_results.append({
                     'email': email,
                     'result': {'success': False, 'error': str(e)},
@@ -253,31 +279,36 @@ def process_email_file(file_path, output_area):
                 
                 # Check for network errors
                 if 'Connection' in str(e) or 'Timeout' in str(e):
-                    output_area.append("   ⚠️  Network error - service may be down")
-                    if not check_breach_vip_status():
+                    events.warning("   ⚠️  Network error - service may be down")
+                    if not check_breach_vip_status(events):
                         service_down = True
                         break
                 
         # Save batch results
         if all_results:
-            save_batch_results(all_results, batch_filepath, output_area)
-            output_area.append(f"\n💾 Batch results saved to: {batch_filepath}")
+            save_batch_results(all_results, batch_filepath, events)
+            events.progress(f"\n💾 Batch results saved to: {batch_filepath}")
             
             if service_down:
-                output_area.append(f"⚠️  Search interrupted - {len(all_results)}/{len(valid_emails)} emails processed")
+                events.warning(f"⚠️  Search interrupted - {len(all_results)}/{len(valid_emails)} emails processed")
             else:
-                output_area.append("🎉 Batch search completed!")
+                events.progress("🎉 Batch search completed!")
         else:
-            output_area.append("❌ No results to save")
+            events.warning("❌ No results to save")
+
+        # Number of lookups actually sent, used by the run history
+        return sent
         
     except Exception as e:
-        output_area.append(f"❌ Error processing file: {e}")
+        events.warning(f"❌ Error processing file: {e}")
+
+def search_single_email_api(email, limit_timeout=LIMIT_TIMEOUT):
+    """Make API call to Breach.vip for a single email with better error handling
 
-def search_single_email_api(email):
-    """Make API call to Breach.vip for a single email with better error handling"""
+    limit_timeout bounds the wait for the rate limiter (None waits out any pause, as
+    batches do). A search that was never sent comes back with 'sent': False.
+    """
     try:
-        url = "https://breach.vip/api/search"
-        
         payload = {
             "term": email,
             "fields": ["email"],
@@ -287,13 +318,33 @@ def search_single_email_api(email):
         }
         
         headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         }
         
-        # Add timeout and retry logic
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        # Wait for the shared rate limit before taking a network slot
+        if LIMITER.acquire(timeout=limit_timeout) is None:
+            return {
+                'success': False,
+                'error': f"Rate limited - retry in {LIMITER.delay():.0f}s",
+                'status_code': 429,
+                'sent': False
+            }
+        status_code = None
+        with BUDGET.try_slot("breach", SLOT_TIMEOUT) as acquired:
+            if not acquired:
+                return {
+                    'success': False,
+                    'error': f"No free network slot within {SLOT_TIMEOUT}s - other scans are using the network budget",
+                    'sent': False
+                }
+            started = time.perf_counter()
+            try:
+                response = CLIENT.post("/api/search", json=payload, headers=headers, timeout=30)
+                status_code = response.status_code
+            finally:
+                record_breach_request("email", "search", started, status_code)
+        backoff = LIMITER.observe(response.status_code, response.headers)
         
         if response.status_code == 200:
             return {
@@ -304,7 +355,7 @@ def search_single_email_api(email):
         else:
             error_msg = f"API returned status {response.status_code}"
             if response.status_code == 429:
-                error_msg = "Rate limited - please wait 1 minute"
+                error_msg = f"Rate limited - pausing requests for {backoff:.0f} seconds"
             elif response.status_code == 400:
                 error_msg = "Bad request - invalid input"
             elif response.status_code == 500:
@@ -346,7 +397,7 @@ def search_single_email_api(email):
 # Keep the rest of the functions (save_batch_results, display_email_results) the same as before
 # ... [rest of the file remains the same] ...
 
-def save_batch_results(all_results, filepath, output_area):
+def save_batch_results(all_results, filepath, events):
     """Save batch email results to file"""
     try:
         # Calculate summary stats
@@ -424,16 +475,12 @@ def save_batch_results(all_results, filepath, output_area):
             f.write("=" * 60 + "\n")
             
     except Exception as e:
-        if output_area:
-            output_area.append(f"❌ Error saving batch results: {e}")
+        events.warning(f"❌ Error saving batch results: {e}")
 
-def display_email_results(data, email, output_area, source="Breach.vip"):
+def display_email_results(data, email, events, source="Breach.vip"):
     """Display email breach results in a formatted way and save to file"""
-    if not output_area:
-        return
-        
-    output_area.append(f"\n📊 {source.upper()} EMAIL RESULTS FOR: {email}")
-    output_area.append("=" * 60)
+    events.progress(f"\n📊 {source.upper()} EMAIL RESULTS FOR: {email}")
+    events.progress("=" * 60)
     
     # Create results directory if it doesn't exist
     results_dir = "results"
@@ -557,12 +604,35 @@ def display_email_results(data, email, output_area, source="Breach.vip"):
     
     # Display results
     for line in display_lines:
-        output_area.append(line)
+        events.record(line)
         
     # Save to file
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write('\n'.join(file_lines))
-        output_area.append(f"💾 Results saved to: {filepath}")
+        events.progress(f"💾 Results saved to: {filepath}")
     except Exception as e:
-        output_area.append(f"❌ Error saving results to file: {e}")
\ No newline at end of file
+        events.warning(f"❌ Error saving results to file: {e}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search Breach.vip for emails without the GUI")
+    parser.add_argument("targets", nargs="+", help="Emails, or files with one email per line")
+    parser.add_argument("--events", help="Also append every event to this NDJSON file")
+    args = parser.parse_args(argv)
+
+    sinks = [ConsoleSink()]
+    if args.events:
+        sinks.append(FileSink(args.events))
+    try:
+        for target in args.targets:
+            if os.path.isfile(target):
+                process_email_file(target)
+            else:
+                process_single_email(target)
+    finally:
+        for sink in sinks:
+            sink.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
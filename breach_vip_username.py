@@ -1,88 +1,111 @@
 # breach_vip_username.py
 import os
+import sys
+import argparse
 import json
 import re
 import time
 import requests
 from datetime import datetime
-from PyQt6.QtWidgets import QMessageBox
+from metrics import record_breach_request
+from net_budget import BUDGET
+from breach_client import CLIENT, LIMITER, SLOT_TIMEOUT, LIMIT_TIMEOUT
+from correlation_index import index_breach_results
+from event_bus import Publisher, ConsoleSink, FileSink
+
+# Event bus source name; callers pick the channel (the GUI passes the run's tab)
+SOURCE = "breach_vip_username"
 
 def is_enabled(parent):
     """Check if username search is enabled"""
     return hasattr(parent, 'enable_breach_username_checkbox') and parent.enable_breach_username_checkbox.isChecked()
 
-def check_breach_vip_status():
-    """Check if Breach.vip is accessible with multiple endpoints"""
+def check_breach_vip_status(events=None):
+    """Check if Breach.vip is accessible with multiple endpoints (a busy network budget counts as not accessible)"""
     test_endpoints = [
-        "https://breach.vip/",
-        "https://breach.vip/api/status",
-        "https://breach.vip/api/search",  # Main API endpoint
+        "/",
+        "/api/status",
+        "/api/search",  # Main API endpoint
     ]
     
     headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'Accept': 'application/json, text/html, */*'
     }
     
     for endpoint in test_endpoints:
-        try:
-            response = requests.get(endpoint, headers=headers, timeout=10)
-            if response.status_code < 500:  # Not a server error
-                return True
-            else:
-                print(f"⚠️  {endpoint}: HTTP {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️  {endpoint}: {e}")
+        status_code = None
+        with BUDGET.try_slot("breach", SLOT_TIMEOUT) as acquired:
+            if not acquired:
+                message = f"⏳ No free network slot within {SLOT_TIMEOUT}s, skipping the Breach.vip status check"
+                if events:
+                    events.warning(message)
+                else:
+                    print(message)
+                return False
+            started = time.perf_counter()
+            try:
+                response = CLIENT.get(endpoint, headers=headers, timeout=10)
+                status_code = response.status_code
+                if response.status_code < 500:  # Not a server error
+                    return True
+                else:
+                    print(f"⚠️  {CLIENT.url(endpoint)}: HTTP {response.status_code}")
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️  {CLIENT.url(endpoint)}: {e}")
+            finally:
+                record_breach_request("username", "status", started, status_code)
     
     return False
 
-def process_single_username(username, output_area):
+def process_single_username(username, events=None):
     """Process a single username for Breach.vip search"""
-    if not output_area:
-        return
-        
-    output_area.append(f"🔍 Searching Breach.vip for username: {username}")
+    events = events or Publisher(SOURCE)
+    events.progress(f"🔍 Searching Breach.vip for username: {username}")
     
     # Check if Breach.vip is accessible
-    if not check_breach_vip_status():
-        output_area.append("⚠️  Breach.vip appears to be down or unreachable")
-        output_area.append("💡 Trying alternative methods...")
+    if not check_breach_vip_status(events):
+        events.warning("⚠️  Breach.vip appears to be down or unreachable")
+        events.progress("💡 Trying alternative methods...")
         
         # Try alternative check methods
         result = search_single_username_fallback(username)
         if result.get('success', False):
             data = result['data']
-            display_username_results(data, username, output_area, source="Alternative")
+            display_username_results(data, username, events, source="Alternative")
         else:
-            output_area.append("❌ All search methods failed")
-            output_area.append("Please try again later or check your internet connection")
+            events.warning("❌ All search methods failed")
+            events.progress("Please try again later or check your internet connection")
         return
     
     try:
         result = search_single_username_api(username)
+        events.metric("lookup", target=username, success=result.get('success', False),
+                      status_code=result.get('status_code'))
         
         if result.get('success', False):
             data = result['data']
-            display_username_results(data, username, output_area)
+            display_username_results(data, username, events)
+            index_breach_results(username, data)
+            events.result("breach", target=username, records=data.get('results') or [])
         else:
             error_msg = result.get('error', 'Unknown error')
-            output_area.append(f"❌ Search failed: {error_msg}")
+            events.warning(f"❌ Search failed: {error_msg}")
             
             # If API returns 503/500, try fallback
-            if '503' in error_msg or '500' in error_msg:
-                output_area.append("🔄 Trying fallback method...")
+            if result.get('status_code') in (500, 503):
+                events.progress("🔄 Trying fallback method...")
                 result = search_single_username_fallback(username)
                 if result.get('success', False):
                     data = result['data']
-                    display_username_results(data, username, output_area, source="Fallback")
+                    display_username_results(data, username, events, source="Fallback")
             
     except Exception as e:
-        output_area.append(f"❌ Error searching {username}: {e}")
-        output_area.append("🔄 Trying fallback method...")
+        events.warning(f"❌ Error searching {username}: {e}")
+        events.progress("🔄 Trying fallback method...")
         result = search_single_username_fallback(username)
         if result.get('success', False):
             data = result['data']
-            display_username_results(data, username, output_area, source="Fallback")
+            display_username_results(data, username, events, source="Fallback")
 
 def search_single_username_fallback(username):
     """Fallback method for username search when API is down"""
@@ -116,16 +139,18 @@ def search_single_username_fallback(username):
             'source': 'fallback'
         }
 
-def process_username_file(file_path, output_area):
-    """Process a file containing multiple usernames for Breach.vip search"""
-    if not output_area:
-        return
-    
+def process_username_file(file_path, events=None, confirm=None):
+    """Process a file containing multiple usernames for Breach.vip search
+
+    confirm(title, question) decides whether a multi-username batch goes ahead
+    (the GUI asks the user); without it the batch runs.
+    """
+    events = events or Publisher(SOURCE)
     # Check service status before processing file
-    if not check_breach_vip_status():
-        output_area.append("❌ Breach.vip appears to be down or unreachable")
-        output_area.append("⚠️  Cannot process file while service is unavailable")
-        output_area.append("💡 Please try again later")
+    if not check_breach_vip_status(events):
+        events.warning("❌ Breach.vip appears to be down or unreachable")
+        events.warning("⚠️  Cannot process file while service is unavailable")
+        events.progress("💡 Please try again later")
         return
     
     try:
@@ -133,7 +158,7 @@ def process_username_file(file_path, output_area):
             usernames = [line.strip() for line in f if line.strip()]
             
         if not usernames:
-            QMessageBox.warning(None, "File Error", "The file is empty or contains no valid usernames.")
+            events.warning("❌ The file is empty or contains no valid usernames.")
             return
             
         valid_usernames = []
@@ -147,27 +172,24 @@ def process_username_file(file_path, output_area):
                 invalid_usernames.append(username)
                 
         if not valid_usernames:
-            QMessageBox.warning(None, "File Error", "No valid usernames found in the file.")
+            events.warning("❌ No valid usernames found in the file.")
             return
             
         # Show confirmation dialog for multiple usernames
         if len(valid_usernames) > 1:
-            reply = QMessageBox.question(
-                None,
-                "Multiple Usernames Found",
+            question = (
                 f"Found {len(valid_usernames)} valid username(s) and {len(invalid_usernames)} invalid entry(s).\n\n"
-                f"Do you want to search all {len(valid_usernames)} usernames? This may take a while due to rate limits.",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                f"Do you want to search all {len(valid_usernames)} usernames? This may take a while due to rate limits."
             )
-            if reply != QMessageBox.StandardButton.Yes:
+            if confirm and not confirm("Multiple Usernames Found", question):
                 return
                 
         # Process all valid usernames
-        output_area.append(f"📁 Processing {len(valid_usernames)} username(s) from file: {os.path.basename(file_path)}")
+        events.progress(f"📁 Processing {len(valid_usernames)} username(s) from file: {os.path.basename(file_path)}")
         if invalid_usernames:
-            output_area.append(f"⚠️  Skipped {len(invalid_usernames)} invalid entries")
+            events.warning(f"⚠️  Skipped {len(invalid_usernames)} invalid entries")
             
-        output_area.append("=" * 60)
+        events.progress("=" * 60)
     
         # Create results directory if it doesn't exist
         results_dir = "results"
@@ -180,23 +202,31 @@ def process_username_file(file_path, output_area):
         batch_filepath = os.path.join(results_dir, batch_filename)
         
         all_results = []
+        sent = 0
         service_down = False
         
         for i, username in enumerate(valid_usernames, 1):
             if service_down:
-                output_area.append(f"⚠️  Skipping remaining usernames - service unavailable")
+                events.warning(f"⚠️  Skipping remaining usernames - service unavailable")
                 break
                 
-            output_area.append(f"\n🔍 [{i}/{len(valid_usernames)}] Searching: {username}")
+            events.progress(f"\n🔍 [{i}/{len(valid_usernames)}] Searching: {username}")
             
             try:
                 # Re-check service status periodically
-                if i % 5 == 0 and not check_breach_vip_status():
-                    output_area.append("❌ Breach.vip service became unavailable")
+                if i % 5 == 0 and not check_breach_vip_status(events):
+                    events.warning("❌ Breach.vip service became unavailable")
                     service_down = True
                     break
                 
-                result = search_single_username_api(username)
+                # Every search of the batch goes out: a server-imposed pause is waited out
+                result = search_single_username_api(username, limit_timeout=None)
+                sent += result.get('sent', True)
+                if result.get('success', False):
+                    index_breach_results(username, result.get('data'))
+                    events.result("breach", target=username, records=(result.get('data') or {}).get('results') or [])
+                events.metric("lookup", target=username, success=result.get('success', False),
+                              status_code=result.get('status_code'))
                 all_results.append({
                     'username': username,
                     'result': result,
@@ -209,26 +239,22 @@ def process_username_file(file_path, output_area):
                     if data.get('results') and len(data['results']) > 0:
                         record_count = len(data['results'])
                         unique_breaches = len(set(r.get('source', '') for r in data['results']))
-                        output_area.append(f"   🚨 Found {record_count} records across {unique_breaches} breaches")
+                        events.record(f"   🚨 Found {record_count} records across {unique_breaches} breaches",
+                                      target=username, records=record_count, breaches=unique_breaches)
                     else:
-                        output_area.append(f"   ✅ No breach records found")
+                        events.record(f"   ✅ No breach records found", target=username, records=0)
                 else:
                     error_msg = result.get('error', 'Unknown error')
-                    output_area.append(f"   ❌ Search failed: {error_msg}")
+                    events.warning(f"   ❌ Search failed: {error_msg}")
                     
                     # Check if it's a service error
-                    if any(code in error_msg for code in ['503', '500', '429']):
-                        output_area.append("   ⚠️  Service error detected")
-                        if '429' in error_msg:
-                            output_area.append("   💤 Rate limited, waiting 60 seconds...")
-                            time.sleep(60)
-                
-                # Respect rate limit - wait between requests
-                if i < len(valid_usernames):  # Don't wait after the last one
-                    time.sleep(4)  # 4 seconds between requests to stay under 15/minute
-                    
+                    if result.get('status_code') in (500, 503):
+                        events.warning("   ⚠️  Service error detected")
+                    elif result.get('status_code') == 429 and i < len(valid_usernames):
+                        events.progress(f"   💤 Rate limited, next search in {LIMITER.delay():.0f} seconds...")
+
             except Exception as e:
-                output_area.append(f"   ❌ Error searching {username}: {e}")
+                events.warning(f"   ❌ Error searching {username}: {e}")
                 all_results.append({
                     'username': username,
                     'result': {'success': False, 'error': str(e)},
@@ -237,31 +263,36 @@ def process_username_file(file_path, output_area):
                 
                 # Check for network errors
                 if 'Connection' in str(e) or 'Timeout' in str(e):
-                    output_area.append("   ⚠️  Network error - service may be down")
-                    if not check_breach_vip_status():
+                    events.warning("   ⚠️  Network error - service may be down")
+                    if not check_breach_vip_status(events):
                         service_down = True
                         break
                 
         # Save batch results
         if all_results:
-            save_batch_results(all_results, batch_filepath, output_area)
-            output_area.append(f"\n💾 Batch results saved to: {batch_filepath}")
+            save_batch_results(all_results, batch_filepath, events)
+            events.progress(f"\n💾 Batch results saved to: {batch_filepath}")
             
             if service_down:
-                output_area.append(f"⚠️  Search interrupted - {len(all_results)}/{len(valid_usernames)} usernames processed")
+                events.warning(f"⚠️  Search interrupted - {len(all_results)}/{len(valid_usernames)} usernames processed")
             else:
-                output_area.append("🎉 Batch search completed!")
+                events.progress("🎉 Batch search completed!")
         else:
-            output_area.append("❌ No results to save")
+            events.warning("❌ No results to save")
+
+        # Number of lookups actually sent, used by the run history
+        return sent
         
     except Exception as e:
-        output_area.append(f"❌ Error processing file: {e}")
+        events.warning(f"❌ Error processing file: {e}")
+
+def search_single_username_api(username, limit_timeout=LIMIT_TIMEOUT):
+    """Make API call to Breach.vip for a single username with better error handling
 
-def search_single_username_api(username):
-    """Make API call to Breach.vip for a single username with better error handling"""
+    limit_timeout bounds the wait for the rate limiter (None waits out any pause, as
+    batches do). A search that was never sent comes back with 'sent': False.
+    """
     try:
-        url = "https://breach.vip/api/search"
-        
         payload = {
             "term": username,
             "fields": ["username", "name"],  # Search in username and name fields
@@ -271,13 +302,33 @@ def search_single_username_api(username):
         }
         
         headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         }
         
-        # Add timeout and retry logic
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        # Wait for the shared rate limit before taking a network slot
+        if LIMITER.acquire(timeout=limit_timeout) is None:
+            return {
+                'success': False,
+                'error': f"Rate limited - retry in {LIMITER.delay():.0f}s",
+                'status_code': 429,
+                'sent': False
+            }
+        status_code = None
+        with BUDGET.try_slot("breach", SLOT_TIMEOUT) as acquired:
+            if not acquired:
+                return {
+                    'success': False,
+                    'error': f"No free network slot within {SLOT_TIMEOUT}s - other scans are using the network budget",
+                    'sent': False
+                }
+            started = time.perf_counter()
+            try:
+                response = CLIENT.post("/api/search", json=payload, headers=headers, timeout=30)
+                status_code = response.status_code
+            finally:
+                record_breach_request("username", "search", started, status_code)
+        backoff = LIMITER.observe(response.status_code, response.headers)
         
         if response.status_code == 200:
             return {
@@ -288,7 +339,7 @@ def search_single_username_api(username):
         else:
             error_msg = f"API returned status {response.status_code}"
             if response.status_code == 429:
-                error_msg = "Rate limited - please wait 1 minute"
+                error_msg = f"Rate limited - pausing requests for {backoff:.0f} seconds"
             elif response.status_code == 400:
                 error_msg = "Bad request - invalid input"
             elif response.status_code == 500:
@@ -330,7 +381,7 @@ def search_single_username_api(username):
 # Keep the rest of the functions (save_batch_results, display_username_results) the same as before
 # ... [rest of the file remains the same] ...
 
-def save_batch_results(all_results, filepath, output_area):
+def save_batch_results(all_results, filepath, events):
     """Save batch username results to file"""
     try:
         # Calculate summary stats
@@ -408,16 +459,12 @@ def save_batch_results(all_results, filepath, output_area):
             f.write("=" * 60 + "\n")
             
     except Exception as e:
-        if output_area:
-            output_area.append(f"❌ Error saving batch results: {e}")
+        events.warning(f"❌ Error saving batch results: {e}")
 
-def display_username_results(data, username, output_area, source="Breach.vip"):
+def display_username_results(data, username, events, source="Breach.vip"):
     """Display username breach results in a formatted way and save to file"""
-    if not output_area:
-        return
-        
-    output_area.append(f"\n📊 {source.upper()} USERNAME RESULTS FOR: {username}")
-    output_area.append("=" * 60)
+    events.progress(f"\n📊 {source.upper()} USERNAME RESULTS FOR: {username}")
+    events.progress("=" * 60)
     
     # Create results directory if it doesn't exist
     results_dir = "results"
@@ -563,12 +610,35 @@ def display_username_results(data, username, output_area, source="Breach.vip"):
     
     # Display results
     for line in display_lines:
-        output_area.append(line)
+        events.record(line)
         
     # Save to file
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write('\n'.join(file_lines))
-        output_area.append(f"💾 Results saved to: {filepath}")
+        events.progress(f"💾 Results saved to: {filepath}")
     except Exception as e:
-        output_area.append(f"❌ Error saving results to file: {e}")
\ No newline at end of file
+        events.warning(f"❌ Error saving results to file: {e}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search Breach.vip for usernames without the GUI")
+    parser.add_argument("targets", nargs="+", help="Usernames, or files with one username per line")
+    parser.add_argument("--events", help="Also append every event to this NDJSON file")
+    args = parser.parse_args(argv)
+
+    sinks = [ConsoleSink()]
+    if args.events:
+        sinks.append(FileSink(args.events))
+    try:
+        for target in args.targets:
+            if os.path.isfile(target):
+                process_username_file(target)
+            else:
+                process_single_username(target)
+    finally:
+        for sink in sinks:
+            sink.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
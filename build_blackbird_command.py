@@ -1,6 +1,44 @@
 # build_blackbird_command.py
 import os
 
+from net_budget import DEFAULT_TOTAL, DEFAULT_WEIGHTS, format_weights
+from scan_planner import DEFAULT_TOP_N
+from blackbird_output import DISPLAY_HITS_ERRORS
+
+# What a fresh GUI holds for every setting (Save Settings file format, minus the API key)
+DEFAULT_SETTINGS = {
+    "username_input": "",
+    "email_input": "",
+    "tor_checkbox": False,
+    "permute_checkbox": False,
+    "enable_breach_username_checkbox": False,
+    "enable_breach_email_checkbox": False,
+    "permuteall_checkbox": False,
+    "no_nsfw_checkbox": False,
+    "proxy_input": "",
+    "timeout_spinbox": 30,
+    "net_total_slots": DEFAULT_TOTAL,
+    "net_weights": format_weights(DEFAULT_WEIGHTS),
+    "no_update_checkbox": False,
+    "diff_checkbox": False,
+    "two_pass_checkbox": False,
+    "two_pass_top_n": DEFAULT_TOP_N,
+    "csv_checkbox": False,
+    "pdf_checkbox": False,
+    "json_checkbox": False,
+    "verbose_checkbox": False,
+    "dump_checkbox": False,
+    "display_level": DISPLAY_HITS_ERRORS,
+    "instagram_session_id": "",
+    "AI_checkbox": False,
+    "ai_second_pass_checkbox": True,
+    "filter": "",
+}
+
+def complete_settings(settings):
+    """settings with every key DEFAULT_SETTINGS has, missing ones at their GUI default"""
+    return {**DEFAULT_SETTINGS, **settings}
+
 def build_blackbird_command(username_input, email_input, username_file_input, email_file_input, 
                             permute_checkbox, permuteall_checkbox, AI_checkbox, no_nsfw_checkbox, 
                             no_update_checkbox, csv_checkbox, pdf_checkbox, json_checkbox, verbose_checkbox, 
@@ -95,4 +133,27 @@ def build_blackbird_command(username_input, email_input, username_file_input, em
     if instagram_session_id:
         os.environ["INSTAGRAM_SESSION_ID"] = instagram_session_id
 
-    return command
\ No newline at end of file
+    return command
+
+def command_args_from_settings(settings):
+    """build_blackbird_command() arguments from a settings dict (Save Settings file format)"""
+    return {
+        "username_input": settings.get("username_input", ""),
+        "email_input": settings.get("email_input", ""),
+        "username_file_input": "",
+        "email_file_input": "",
+        "permute_checkbox": bool(settings.get("permute_checkbox")),
+        "permuteall_checkbox": bool(settings.get("permuteall_checkbox")),
+        "AI_checkbox": bool(settings.get("AI_checkbox")),
+        "no_nsfw_checkbox": bool(settings.get("no_nsfw_checkbox")),
+        "no_update_checkbox": bool(settings.get("no_update_checkbox")),
+        "csv_checkbox": bool(settings.get("csv_checkbox")),
+        "pdf_checkbox": bool(settings.get("pdf_checkbox")),
+        "json_checkbox": bool(settings.get("json_checkbox")),
+        "verbose_checkbox": bool(settings.get("verbose_checkbox")),
+        "dump_checkbox": bool(settings.get("dump_checkbox")),
+        "proxy_input": settings.get("proxy_input", ""),
+        "timeout_spinbox": int(settings.get("timeout_spinbox") or 30),
+        "filter_input": settings.get("filter", ""),
+        "instagram_session_id": settings.get("instagram_session_id", ""),
+    }
@@ -0,0 +1,325 @@
+# correlation_index.py
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from xml.sax.saxutils import escape, quoteattr
+
+from crow_db import connect
+
+# Entity kinds linking targets together
+SITE = "site"
+BREACH = "breach"
+USERNAME = "username"
+EMAIL = "email"
+KINDS = (SITE, BREACH, USERNAME, EMAIL)
+
+EMAIL_REGEX = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+USERNAME_KEYS = ("username", "user", "login", "handle", "screen_name")
+
+# Inverted index: one row per (entity, target); the target index answers the reverse direction
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entity_targets (
+    kind TEXT NOT NULL,
+    entity TEXT NOT NULL COLLATE NOCASE,
+    target TEXT NOT NULL COLLATE NOCASE,
+    occurrences INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL,
+    last_seen REAL,
+    PRIMARY KEY (kind, entity, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entity_targets_target ON entity_targets(target, kind);
+"""
+
+def identity_entity(target):
+    """A target is itself an email or a username, so lookups on one find the other"""
+    target = (target or "").strip()
+    if not target:
+        return None
+    return (EMAIL, target.lower()) if EMAIL_REGEX.fullmatch(target) else (USERNAME, target)
+
+def entities_from_values(values):
+    """Emails and usernames mentioned in a record's fields"""
+    entities = set()
+    for key, value in values.items():
+        if value in (None, ""):
+            continue
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, ensure_ascii=False, default=str)
+        text = str(value)
+        for email in EMAIL_REGEX.findall(text):
+            entities.add((EMAIL, email.lower()))
+        if str(key).lower() in USERNAME_KEYS and not EMAIL_REGEX.search(text) and len(text) <= 64:
+            entities.add((USERNAME, text.strip()))
+    return entities
+
+def breach_entities(records):
+    """Breach sources plus the emails/usernames found in breach.vip records"""
+    entities = set()
+    for record in records or []:
+        if not isinstance(record, dict):
+            continue
+        if record.get('source'):
+            entities.add((BREACH, str(record['source'])))
+        entities |= entities_from_values({key: value for key, value in record.items()
+                                          if key not in ('source', 'categories')})
+    return entities
+
+def entity_keys(target, entities):
+    """(kind, entity) pairs one upsert_entities call links target to: entities plus the target itself"""
+    keys = {(kind, entity) for kind, entity in set(entities) if entity}
+    identity = identity_entity(target)
+    if identity:
+        keys.add(identity)
+    return keys
+
+def file_entities(conn, path):
+    """Entities the results index added for one ingested file, rebuilt from its stored rows"""
+    entities = set()
+    for row in conn.execute("SELECT site, metadata FROM results WHERE file_path = ?", (path,)):
+        if row['site']:
+            entities.add((SITE, row['site']))
+        if row['metadata']:
+            entities |= entities_from_values(json.loads(row['metadata']))
+    for row in conn.execute("SELECT report FROM ai_reports WHERE file_path = ?", (path,)):
+        entities |= {(EMAIL, email.lower()) for email in EMAIL_REGEX.findall(row['report'])}
+    return entities
+
+def upsert_entities(conn, target, entities, seen_at=None):
+    """Add (kind, entity) pairs for a target inside the caller's transaction"""
+    seen_at = seen_at or time.time()
+    rows = [(kind, entity, target, seen_at, seen_at) for kind, entity in entity_keys(target, entities)]
+    conn.executemany(
+        """INSERT INTO entity_targets (kind, entity, target, occurrences, first_seen, last_seen)
+           VALUES (?, ?, ?, 1, ?, ?)
+           ON CONFLICT(kind, entity, target) DO UPDATE SET occurrences = occurrences + 1,
+               last_seen = excluded.last_seen""", rows)
+    return len(rows)
+
+def remove_entities(conn, target, entities):
+    """Undo one upsert_entities call (same target and entities) inside the caller's transaction"""
+    rows = [(kind, entity, target) for kind, entity in entity_keys(target, entities)]
+    conn.executemany("UPDATE entity_targets SET occurrences = occurrences - 1 "
+                     "WHERE kind = ? AND entity = ? AND target = ?", rows)
+    conn.executemany("DELETE FROM entity_targets WHERE kind = ? AND entity = ? AND target = ? AND occurrences <= 0",
+                     rows)
+
+class CorrelationIndex:
+    """Which targets share sites, breach sources, usernames and emails"""
+
+    def __init__(self, db_path=None):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    def add(self, target, entities, seen_at=None):
+        with self.lock, self.conn:
+            return upsert_entities(self.conn, target, entities, seen_at)
+
+    def add_breach_records(self, target, records):
+        return self.add(target, breach_entities(records))
+
+    def targets_for(self, kind, entity):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT target, occurrences, last_seen FROM entity_targets WHERE kind = ? AND entity = ? "
+                "ORDER BY target", (kind, entity)).fetchall()
+        return [dict(row) for row in rows]
+
+    def entities_for(self, target, kind=None):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT kind, entity, occurrences FROM entity_targets WHERE target = ? AND (? IS NULL OR kind = ?) "
+                "ORDER BY kind, entity", (target, kind, kind)).fetchall()
+        return [dict(row) for row in rows]
+
+    def overlap(self, target_a, target_b, kind=None):
+        """Entities two targets have in common"""
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT a.kind, a.entity FROM entity_targets a
+                   JOIN entity_targets b ON b.kind = a.kind AND b.entity = a.entity AND b.target = ?
+                   WHERE a.target = ? AND (? IS NULL OR a.kind = ?) ORDER BY a.kind, a.entity""",
+                (target_b, target_a, kind, kind)).fetchall()
+        return [dict(row) for row in rows]
+
+    def related(self, target, kind=None, limit=20):
+        """Other targets ranked by the number of entities shared with target"""
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT b.target, COUNT(*) AS shared, GROUP_CONCAT(a.kind || ':' || a.entity, ', ') AS entities
+                   FROM entity_targets a
+                   JOIN entity_targets b ON b.kind = a.kind AND b.entity = a.entity AND b.target != a.target
+                   WHERE a.target = ? AND (? IS NULL OR a.kind = ?)
+                   GROUP BY b.target ORDER BY shared DESC, b.target LIMIT ?""",
+                (target, kind, kind, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def shared_entities(self, kind=None, min_targets=2, limit=50):
+        """Entities linked to at least min_targets targets"""
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT kind, entity, COUNT(*) AS targets FROM entity_targets
+                   WHERE (? IS NULL OR kind = ?) GROUP BY kind, entity HAVING COUNT(*) >= ?
+                   ORDER BY targets DESC, kind, entity LIMIT ?""",
+                (kind, kind, min_targets, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def graph(self, kind=None, min_targets=2):
+        """Bipartite target/entity graph, limited to entities shared by min_targets targets"""
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT e.kind, e.entity, e.target, e.occurrences FROM entity_targets e
+                   JOIN (SELECT kind, entity FROM entity_targets WHERE (? IS NULL OR kind = ?)
+                         GROUP BY kind, entity HAVING COUNT(*) >= ?) s
+                     ON s.kind = e.kind AND s.entity = e.entity
+                   ORDER BY e.kind, e.entity, e.target""", (kind, kind, min_targets)).fetchall()
+        nodes = {}
+        edges = []
+        for row in rows:
+            target_id = f"target:{row['target']}"
+            entity_id = f"{row['kind']}:{row['entity']}"
+            nodes.setdefault(target_id, {'id': target_id, 'type': "target", 'label': row['target']})
+            nodes.setdefault(entity_id, {'id': entity_id, 'type': row['kind'], 'label': row['entity']})
+            edges.append({'source': target_id, 'target': entity_id, 'weight': row['occurrences']})
+        return {'nodes': list(nodes.values()), 'edges': edges}
+
+    def rebuild_from_results(self):
+        """Backfill from the results index (results_index.py), e.g. after upgrading
+
+        Every link gets at least the occurrences ingesting each indexed file once gives
+        it, the count forget() later takes back. Raising to that count instead of adding
+        to it makes a rebuild of an up-to-date index change nothing, and keeps the links
+        of breach lookups. Returns the number of links derived from the files.
+        """
+        with self.lock, self.conn:
+            try:
+                files = self.conn.execute(
+                    "SELECT path, target FROM result_files WHERE target IS NOT NULL").fetchall()
+            except sqlite3.OperationalError:
+                # Results index never created
+                return 0
+            # Keyed case-insensitively like the table (entity and target are NOCASE)
+            links = {}
+            for row in files:
+                for kind, entity in entity_keys(row["target"], file_entities(self.conn, row["path"])):
+                    key = (kind, entity.lower(), row["target"].lower())
+                    links.setdefault(key, [kind, entity, row["target"], 0])[3] += 1
+            now = time.time()
+            self.conn.executemany(
+                """INSERT INTO entity_targets (kind, entity, target, occurrences, first_seen, last_seen)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(kind, entity, target) DO UPDATE SET
+                       occurrences = MAX(occurrences, excluded.occurrences)""",
+                [(kind, entity, target, count, now, now) for kind, entity, target, count in links.values()])
+            return len(links)
+
+def graph_to_graphml(graph):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">',
+             '  <key id="type" for="node" attr.name="type" attr.type="string"/>',
+             '  <key id="label" for="node" attr.name="label" attr.type="string"/>',
+             '  <key id="weight" for="edge" attr.name="weight" attr.type="int"/>',
+             '  <graph id="crow" edgedefault="undirected">']
+    for node in graph['nodes']:
+        lines.append(f'    <node id={quoteattr(node["id"])}><data key="type">{escape(node["type"])}</data>'
+                     f'<data key="label">{escape(node["label"])}</data></node>')
+    for edge in graph['edges']:
+        lines.append(f'    <edge source={quoteattr(edge["source"])} target={quoteattr(edge["target"])}>'
+                     f'<data key="weight">{edge["weight"]}</data></edge>')
+    lines.extend(['  </graph>', '</graphml>'])
+    return "\n".join(lines) + "\n"
+
+# Index used by index_breach_results, opened on the first lookup and kept for the process
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+def shared_index():
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = CorrelationIndex()
+        return _shared_index
+
+def index_breach_results(target, data):
+    """Add a breach.vip response to the correlation index, never failing the lookup itself"""
+    try:
+        records = (data or {}).get('results')
+        if records:
+            shared_index().add_breach_records(target, records)
+    except Exception as e:
+        print(f"Warning: Could not update correlation index: {e}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find what targets have in common")
+    parser.add_argument("--db", help="Path to the Crow database (default: results/crow.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    who_parser = sub.add_parser("who", help="Targets linked to an entity")
+    who_parser.add_argument("kind", choices=KINDS)
+    who_parser.add_argument("entity")
+
+    show_parser = sub.add_parser("show", help="Entities of a target")
+    show_parser.add_argument("target")
+    show_parser.add_argument("--kind", choices=KINDS)
+
+    overlap_parser = sub.add_parser("overlap", help="Entities two targets share")
+    overlap_parser.add_argument("target_a")
+    overlap_parser.add_argument("target_b")
+    overlap_parser.add_argument("--kind", choices=KINDS)
+
+    related_parser = sub.add_parser("related", help="Targets sharing the most entities with a target")
+    related_parser.add_argument("target")
+    related_parser.add_argument("--kind", choices=KINDS)
+    related_parser.add_argument("-n", "--limit", type=int, default=20)
+
+    shared_parser = sub.add_parser("shared", help="Entities linking several targets")
+    shared_parser.add_argument("--kind", choices=KINDS)
+    shared_parser.add_argument("--min-targets", type=int, default=2)
+    shared_parser.add_argument("-n", "--limit", type=int, default=50)
+
+    export_parser = sub.add_parser("export", help="Export the entity graph")
+    export_parser.add_argument("path", help="Output file, .graphml or .json")
+    export_parser.add_argument("--kind", choices=KINDS)
+    export_parser.add_argument("--min-targets", type=int, default=2)
+
+    sub.add_parser("rebuild", help="Backfill from the results index")
+
+    args = parser.parse_args(argv)
+    index = CorrelationIndex(args.db)
+
+    if args.command == "who":
+        for row in index.targets_for(args.kind, args.entity):
+            print(f"{row['target']:<40} seen {row['occurrences']}x")
+    elif args.command == "show":
+        for row in index.entities_for(args.target, args.kind):
+            print(f"{row['kind']:<9} {row['entity']}")
+    elif args.command == "overlap":
+        rows = index.overlap(args.target_a, args.target_b, args.kind)
+        for row in rows:
+            print(f"{row['kind']:<9} {row['entity']}")
+        print(f"{len(rows)} shared entit{'y' if len(rows) == 1 else 'ies'}")
+    elif args.command == "related":
+        for row in index.related(args.target, args.kind, args.limit):
+            print(f"{row['target']:<30} {row['shared']:>4}  {row['entities'][:100]}")
+    elif args.command == "shared":
+        for row in index.shared_entities(args.kind, args.min_targets, args.limit):
+            print(f"{row['kind']:<9} {row['entity'][:50]:<50} {row['targets']:>4} target(s)")
+    elif args.command == "export":
+        graph = index.graph(args.kind, args.min_targets)
+        with open(args.path, 'w', encoding='utf-8') as f:
+            if args.path.lower().endswith(".json"):
+                json.dump(graph, f, indent=4, ensure_ascii=False)
+            else:
+                f.write(graph_to_graphml(graph))
+        print(f"✅ {len(graph['nodes'])} node(s), {len(graph['edges'])} edge(s) written to {args.path}")
+    elif args.command == "rebuild":
+        print(f"✅ {index.rebuild_from_results()} link(s) updated")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,18 +7,45 @@ import json
 import requests
 import re
 import time  # Add this import
+import threading
 from datetime import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QLineEdit, QPushButton, QTextEdit, QFileDialog, 
-                             QCheckBox, QGroupBox, QFormLayout, QSpinBox, QMessageBox, QInputDialog)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+                             QCheckBox, QGroupBox, QFormLayout, QSpinBox, QMessageBox, QInputDialog, QComboBox,
+                             QTabWidget, QTabBar)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 # Import the separate save and load functions
 from pathlib import Path
-from save_settings import save_settings
-from load_settings import load_settings
+from save_settings import save_settings, collect_settings
+from load_settings import load_settings, apply_settings
 from build_blackbird_command import build_blackbird_command
 from tor_spoofing import TORSpoofer
 from tor_api_setup import TORAPISetup
+from blackbird_output import (classify_line, parse_hit, parse_site, should_display, HIT, MISS, ERROR,
+                              DISPLAY_ALL, DISPLAY_HITS_ERRORS, DISPLAY_LEVELS)
+from run_log import RunLog
+from investigation_tab import InvestigationTab
+from run_queue import RunQueue, DONE, STOPPED, FAILED, job_label
+from run_queue_panel import RunQueuePanel
+from site_latency import parse_latency_line, snapshot_log_offsets, collect_new_log_records
+from telemetry_store import TelemetryStore
+from results_diff import ResultsStore, DiffFilter, target_key
+from site_catalog import catalog_version, quote_filter_value
+from scan_planner import plan_two_pass, is_filter_safe_name, DEFAULT_TOP_N
+from ai_ledger import AIQuotaLedger, AIReportCache, result_set_hash
+from results_index import ResultsIndex, run_targets
+from dump_store import ingest_run_dumps, format_size
+from net_budget import BUDGET, DEFAULT_TOTAL, DEFAULT_WEIGHTS, parse_weights, format_weights
+from event_bus import BUS, Publisher, FileSink, PROGRESS, RECORD, WARNING, RESULT
+from results_feed import start_feed_from_env
+from session_snapshot import save_session, load_session, restored_runs, TAIL_LINES
+from stall_watchdog import (watchdog_from_env, load_stalls, summarize, format_summary_row,
+                            DEFAULT_LOG_PATH as STALL_LOG_PATH)
+from metrics import BLACKBIRD_LINES, GUI_EVENT_LOOP_LAG, GUI_EVENT_LOOP_LAG_MAX, start_exporters_from_env
+from target_preflight import analyze_file, estimate_runtime, format_preflight, deduped_path, write_entries
+from timeout_tuner import recommend, load_site_stats, combine_filters, format_recommendation
+from run_history import (RunHistory, read_peak_memory_kb, children_peak_memory_kb,
+                         format_run_row, format_comparison, format_timestamp)
 
 # Worker class that handles executing the Blackbird command in a separate thread
 class BlackbirdWorker(QThread):
@@ -31,6 +58,40 @@ class BlackbirdWorker(QThread):
         self.needs_ai_confirmation = needs_ai_confirmation
         self.is_setup_ai = is_setup_ai
         self.tor_spoofer = tor_spoofer
+        # Per-run counters read by the run history once the worker finishes
+        self.stats = {HIT: 0, MISS: 0, ERROR: 0}
+        self.peak_memory_kb = None
+        self.returncode = None
+        self.stopped = False
+        self.run_id = None
+        self.breach_lookups = 0
+        # InvestigationTab showing this worker's output (set by attach_worker)
+        self.tab = None
+        # Parsed hits, and the optional differential filter applied before emitting
+        self.hits = []
+        self.diff = None
+        self.target = None
+        # Target named in results feed hit events; None for passes whose hits are already out (AI pass)
+        self.feed_target = None
+        self.catalog_version = None
+        # Extra (label, command) passes run back to back, e.g. the two-pass scan
+        self.followup_passes = []
+        self.started_at = None
+        self.finished_at = None
+        self.first_hit_seconds = None
+        # Per-site telemetry records and the log sizes at start (verbose runs only)
+        self.telemetry = []
+        self.log_offsets = None
+        # Network budget stats when the run started, to report this run's queueing delay
+        self.budget_snapshot = BUDGET.stats()
+        # --dump pages written during the run are moved into the dump store afterwards
+        self.dump_enabled = False
+        # (targets, permute) whose result files and dumps belong to this run (see run_targets)
+        self.run_targets = None
+        # Lines below the display level stay in the worker; the run log keeps everything
+        self.display_level = DISPLAY_ALL
+        self.hidden_lines = 0
+        self.run_log = None
     
     def run(self):
         # If TOR is enabled for AI, set environment variable to signal the blackbird.py
@@ -40,8 +101,57 @@ class BlackbirdWorker(QThread):
             import os
             os.environ["BLACKBIRD_USE_TOR"] = "1"
             os.environ["TOR_PORT"] = str(self.tor_spoofer.tor_port)
+
+        self.started_at = time.time()
+        try:
+            self.run_log = RunLog(f"run_{self.run_id}" if self.run_id is not None else None)
+        except OSError as e:
+            self.output_signal.emit(f"⚠️  Could not open run log: {e}")
+        passes = [(None, self.command)] + self.followup_passes
+        for label, command in passes:
+            if self.stopped:
+                break
+            if label:
+                self.output_signal.emit(label)
+            if not self.acquire_network_slot():
+                break
+            try:
+                returncode = self.run_command(command)
+            finally:
+                BUDGET.release("blackbird")
+            # Keep the first failure so the history shows a broken pass
+            if self.returncode in (None, 0):
+                self.returncode = returncode
+
+        # Differential mode: report what disappeared, only meaningful for a complete run
+        if self.diff and not self.stopped:
+            for text in self.diff.summary_lines():
+                self.output_signal.emit(text)
+
+        if self.run_log:
+            self.run_log.close()
+            if self.hidden_lines:
+                self.output_signal.emit(f"🔇 {self.hidden_lines} line(s) hidden by the display level - "
+                                        f"full output in {self.run_log.path}")
+
+        if self.peak_memory_kb is None:
+            self.peak_memory_kb = children_peak_memory_kb()
+        self.finished_at = time.time()
+
+    def acquire_network_slot(self):
+        """Wait for a Blackbird slot in the global network budget, False when stopped meanwhile"""
+        if BUDGET.acquire("blackbird", timeout=0):
+            return True
+        self.output_signal.emit("⏳ Waiting for a free network slot...")
+        while not self.stopped:
+            if BUDGET.acquire("blackbird", timeout=0.5):
+                return True
+        return False
+
+    def run_command(self, command):
+        """Run one Blackbird process to completion and return its exit code"""
         self.process = subprocess.Popen(
-            self.command, 
+            command, 
             stdout=subprocess.PIPE, 
             stderr=subprocess.STDOUT, 
             stdin=subprocess.PIPE,
@@ -54,7 +164,6 @@ class BlackbirdWorker(QThread):
         if self.is_setup_ai:
             try:
                 # Wait a bit for the prompt to appear
-                import time
                 time.sleep(2)
                 # Send 'Y' and newline
                 self.process.stdin.write('Y\n')
@@ -64,32 +173,83 @@ class BlackbirdWorker(QThread):
                 self.output_signal.emit(f"Setup confirmation error: {e}")
         
         # For regular AI analysis, wait for the specific prompt
-        elif self.needs_ai_confirmation:
-            confirmation_sent = False
-            for line in self.process.stdout:
-                text = line.strip()
-                self.output_signal.emit(text)
-                
-                # Check for AI analysis prompt
-                if not confirmation_sent and ('analyzing with ai' in text.lower() or 'consent' in text.lower()):
-                    try:
-                        self.process.stdin.write('Y\n')
-                        self.process.stdin.flush()
-                        confirmation_sent = True
-                        self.output_signal.emit("✓ Automatically confirmed AI analysis")
-                    except Exception as e:
-                        self.output_signal.emit(f"AI confirmation error: {e}")
-            return
-        
-        # Read output line by line for non-AI or after confirmation
+        confirmation_sent = not self.needs_ai_confirmation
+        last_memory_sample = 0
+
+        # Read output line by line
         for line in self.process.stdout:
-            self.output_signal.emit(line.strip())
-        
+            text = line.strip()
+            self.handle_line(text)
+
+            # Check for AI analysis prompt
+            if not confirmation_sent and ('analyzing with ai' in text.lower() or 'consent' in text.lower()):
+                try:
+                    self.process.stdin.write('Y\n')
+                    self.process.stdin.flush()
+                    confirmation_sent = True
+                    self.output_signal.emit("✓ Automatically confirmed AI analysis")
+                except Exception as e:
+                    self.output_signal.emit(f"AI confirmation error: {e}")
+
+            # Sample peak memory at most once per second while the process is alive
+            now = time.time()
+            if now - last_memory_sample > 1.0:
+                last_memory_sample = now
+                self.sample_peak_memory()
+
+        self.sample_peak_memory()
         self.process.stdout.close()
-        self.process.wait()
+        return self.process.wait()
+
+    def handle_line(self, text):
+        """Count per-site results and forward the line to the GUI"""
+        category = classify_line(text)
+        BLACKBIRD_LINES.inc(category=category or "other")
+        if self.run_log:
+            self.run_log.write(text)
+        if category:
+            self.stats[category] += 1
+        if category == HIT:
+            site, url = parse_hit(text)
+            self.hits.append((site, url))
+            if self.feed_target is not None:
+                BUS.publish(RESULT, "blackbird", "hit", run_id=self.run_id, target=self.feed_target,
+                            site=site, url=url)
+            if self.first_hit_seconds is None and self.started_at:
+                self.first_hit_seconds = time.time() - self.started_at
+
+        # One telemetry record per per-site line: outcome, and timing/status when printed
+        record = parse_latency_line(text)
+        if record is None and category:
+            record = {'site': parse_site(text), 'duration': None, 'status': None, 'error': None}
+        if record:
+            if category == ERROR and not record['error']:
+                record['error'] = "Error"
+            self.telemetry.append(record)
+
+        # Unchanged results never cross the thread boundary in differential mode
+        if self.diff:
+            text = self.diff.filter_line(text, category)
+            if text is None:
+                return
+
+        # Neither do lines below the display level
+        if not should_display(category, self.display_level):
+            self.hidden_lines += 1
+            return
+        self.output_signal.emit(text)
+
+    def sample_peak_memory(self):
+        """Track the Blackbird process' peak resident memory"""
+        if not self.process:
+            return
+        peak = read_peak_memory_kb(self.process.pid)
+        if peak is not None and (self.peak_memory_kb is None or peak > self.peak_memory_kb):
+            self.peak_memory_kb = peak
 
     def terminate(self):
         # Terminate the process if it's running
+        self.stopped = True
         if self.process:
             self.process.terminate()
             self.process.wait()
@@ -103,6 +263,52 @@ class BlackbirdGUI(QMainWindow):
         self.setGeometry(100, 100, 1000, 800)
         self.worker = None
 
+        # Run history database (results/crow.db)
+        try:
+            self.run_history = RunHistory()
+            self.results_store = ResultsStore()
+            self.telemetry_store = TelemetryStore()
+            self.results_index = ResultsIndex()
+            self.run_queue = RunQueue()
+        except Exception as e:
+            print(f"Warning: Run history disabled: {e}")
+            self.run_history = None
+            self.results_store = None
+            self.telemetry_store = None
+            self.results_index = None
+            self.run_queue = None
+
+        # Prometheus metrics, only exported when CROW_METRICS_PORT / CROW_METRICS_TEXTFILE is set
+        for target in start_exporters_from_env():
+            print(f"📈 Metrics exported to {target}")
+
+        # Heartbeat timer: any delay beyond its interval is time the event loop was blocked.
+        # Short enough that stalls just above the watchdog threshold still delay a beat
+        self.heartbeat_interval = 0.05
+        self.last_heartbeat = time.monotonic()
+        # The stall watchdog thread captures the GUI thread's stack while beats are late
+        self.stall_watchdog = watchdog_from_env(self.heartbeat_interval)
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.heartbeat_timer.timeout.connect(self.on_heartbeat)
+        self.heartbeat_timer.start(int(self.heartbeat_interval * 1000))
+
+        # Breach and Tor modules publish on the event bus from any thread; the GUI thread drains it
+        self.event_subscription = BUS.subscribe(kinds=(PROGRESS, RECORD, WARNING), on_full=self.drain_events)
+        self.event_timer = QTimer(self)
+        self.event_timer.timeout.connect(self.drain_events)
+        self.event_timer.start(50)
+        self.event_file_sink = None
+        if os.environ.get("CROW_EVENT_LOG"):
+            try:
+                self.event_file_sink = FileSink(os.environ["CROW_EVENT_LOG"])
+            except OSError as e:
+                print(f"Warning: Could not open event log: {e}")
+        # NDJSON feed of hits, breach records and AI reports for downstream tools (CROW_FEED)
+        self.results_feed = start_feed_from_env()
+        if self.results_feed:
+            print(f"📡 Results feed on {self.results_feed.describe()}")
+
         # Create the central widget and layout for the main window
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -159,6 +365,18 @@ class BlackbirdGUI(QMainWindow):
         AI_help_button.setFixedSize(30, 30)
         AI_help_button.clicked.connect(self.show_AI_help)
         AI_layout.addWidget(AI_help_button)
+
+        # Run AI as a separate pass over the hits only, skipped when the result set is unchanged
+        self.ai_second_pass_checkbox = QCheckBox("AI on hits only (second pass)")
+        self.ai_second_pass_checkbox.setChecked(True)
+        AI_layout.addWidget(self.ai_second_pass_checkbox)
+
+        # Remaining daily AI queries from the persistent ledger
+        self.ai_ledger = AIQuotaLedger()
+        self.ai_report_cache = AIReportCache()
+        self.ai_quota_label = QLabel()
+        AI_layout.addWidget(self.ai_quota_label)
+        self.update_ai_quota_label()
         options_layout.addLayout(AI_layout)
         
         # TOR Spoofing setup - ADD THIS RIGHT AFTER AI LAYOUT
@@ -212,11 +430,48 @@ class BlackbirdGUI(QMainWindow):
         self.timeout_spinbox.setRange(1, 300)  # Limit timeout to 1-300 seconds
         self.timeout_spinbox.setValue(30)  # Default timeout is 30 seconds
         timeout_layout.addWidget(self.timeout_spinbox)
+
+        # Recommend a timeout and exclusions from observed per-site latencies
+        timeout_tune_button = QPushButton("Auto-tune")
+        timeout_tune_button.setToolTip("Recommend a timeout from observed site response times")
+        timeout_tune_button.clicked.connect(self.tune_timeout)
+        timeout_layout.addWidget(timeout_tune_button)
         options_layout.addLayout(timeout_layout)
+
+        # Global network budget shared by Blackbird runs, breach.vip lookups and Tor probes
+        budget_layout = QHBoxLayout()
+        budget_layout.addWidget(QLabel("Network slots:"))
+        self.net_total_spinbox = QSpinBox()
+        self.net_total_spinbox.setRange(1, 64)
+        self.net_total_spinbox.setValue(DEFAULT_TOTAL)
+        self.net_total_spinbox.valueChanged.connect(self.apply_network_budget)
+        budget_layout.addWidget(self.net_total_spinbox)
+        budget_layout.addWidget(QLabel("Weights:"))
+        self.net_weights_input = QLineEdit(format_weights(DEFAULT_WEIGHTS))
+        self.net_weights_input.setToolTip("Share of the slots per subsystem, e.g. blackbird=2, breach=1, tor=1")
+        self.net_weights_input.editingFinished.connect(self.apply_network_budget)
+        budget_layout.addWidget(self.net_weights_input)
+        options_layout.addLayout(budget_layout)
         
         # Checkbox to disable update checks
         self.no_update_checkbox = QCheckBox("Don't check for updates")
         options_layout.addWidget(self.no_update_checkbox)
+
+        # Differential mode: only show results that changed since the last run for this target
+        self.diff_checkbox = QCheckBox("Only show changes since last run")
+        options_layout.addWidget(self.diff_checkbox)
+
+        # Two-pass scan: most productive sites first, then the long tail
+        two_pass_layout = QHBoxLayout()
+        self.two_pass_checkbox = QCheckBox("Two-pass scan (most productive sites first), top")
+        two_pass_layout.addWidget(self.two_pass_checkbox)
+        self.two_pass_top_n_spinbox = QSpinBox()
+        self.two_pass_top_n_spinbox.setRange(1, 500)
+        self.two_pass_top_n_spinbox.setValue(DEFAULT_TOP_N)
+        two_pass_layout.addWidget(self.two_pass_top_n_spinbox)
+        two_pass_layout.addWidget(QLabel("sites"))
+        two_pass_layout.addStretch()
+        options_layout.addLayout(two_pass_layout)
         
         # Filter input field with a help button
         filter_layout = QHBoxLayout()
@@ -254,6 +509,14 @@ class BlackbirdGUI(QMainWindow):
         output_layout.addWidget(self.dump_checkbox)
         output_layout.addWidget(self.enable_breach_username_checkbox)
         output_layout.addWidget(self.enable_breach_email_checkbox)
+
+        # Display level: which per-site lines reach the output area
+        output_layout.addWidget(QLabel("Show:"))
+        self.display_level_combo = QComboBox()
+        for level, label in DISPLAY_LEVELS.items():
+            self.display_level_combo.addItem(label, level)
+        self.display_level_combo.setCurrentIndex(self.display_level_combo.findData(DISPLAY_HITS_ERRORS))
+        output_layout.addWidget(self.display_level_combo)
         output_group.setLayout(output_layout)
         layout.addWidget(output_group)
 
@@ -279,6 +542,14 @@ class BlackbirdGUI(QMainWindow):
         load_button.clicked.connect(self.load_settings)
         button_layout.addWidget(load_button)
 
+        history_button = QPushButton("Run History")
+        history_button.clicked.connect(self.show_run_history)
+        button_layout.addWidget(history_button)
+
+        stalls_button = QPushButton("GUI Stalls")
+        stalls_button.clicked.connect(self.show_stall_summary)
+        button_layout.addWidget(stalls_button)
+
         # Add the button layout to the main layout
         layout.addLayout(button_layout)
 
@@ -292,13 +563,41 @@ class BlackbirdGUI(QMainWindow):
         self.stop_button.clicked.connect(self.stop_blackbird)  # Stop Blackbird on click
         self.stop_button.setEnabled(False)  # Disable initially
         button_layout.addWidget(self.stop_button)
+
+        # Queue the current settings; queued runs start one after another in the background
+        queue_button = QPushButton("Add to Queue")
+        queue_button.clicked.connect(self.enqueue_current_settings)
+        queue_button.setEnabled(self.run_queue is not None)
+        button_layout.addWidget(queue_button)
         
         layout.addLayout(button_layout)
 
-        # Output area for displaying logs and results
-        self.output_area = QTextEdit()
-        self.output_area.setReadOnly(True)
-        layout.addWidget(self.output_area)
+        # One tab per investigation, each with its own worker and output; the Log tab
+        # keeps setup and other messages that belong to no run
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.log_tab = InvestigationTab("Log")
+        self.tabs.addTab(self.log_tab, "Log")
+        self.tabs.tabBar().setTabButton(0, QTabBar.ButtonPosition.RightSide, None)
+        self.tabs.tabCloseRequested.connect(self.close_investigation_tab)
+        self.tabs.currentChanged.connect(self.update_run_buttons)
+        layout.addWidget(self.tabs)
+
+        # Run queue: the job being run and its tab, polled until the tab goes idle
+        self.queue_job_id = None
+        self.queue_tab = None
+        self.queue_panel = None
+        if self.run_queue:
+            self.queue_panel = RunQueuePanel(self.run_queue, self.process_run_queue)
+            self.tabs.addTab(self.queue_panel, "Queue")
+            self.tabs.tabBar().setTabButton(1, QTabBar.ButtonPosition.RightSide, None)
+            self.queue_timer = QTimer(self)
+            self.queue_timer.timeout.connect(self.process_run_queue)
+            self.queue_timer.start(1000)
+
+        # Tabs of the previous session come back without re-running anything
+        if os.environ.get("CROW_RESTORE_SESSION", "1") != "0":
+            self.restore_session_snapshot()
 
         # Easter egg setup
         self.key_sequence = ""
@@ -306,6 +605,7 @@ class BlackbirdGUI(QMainWindow):
 
     def setup_ai_api_key(self):
         """Configure AI API key through TOR for anonymous registration ONLY when TOR is enabled"""
+        self.tabs.setCurrentWidget(self.log_tab)
         self.output_area.clear()
         self.output_area.append("🔧 Starting API Key setup...")
         
@@ -373,6 +673,7 @@ class BlackbirdGUI(QMainWindow):
         
         # Create and start the worker for setup
         self.worker = BlackbirdWorker(" ".join(command), is_setup_ai=True)
+        self.log_tab.attach_worker(self.worker)
         self.worker.output_signal.connect(self.update_output)
         self.worker.finished.connect(lambda: self.on_tor_setup_finished(True))
         self.worker.start()
@@ -499,6 +800,8 @@ Crows mimic, crows are intelligent!
         # Open a file dialog to select a username file and set its path in the input field
         file_name, _ = QFileDialog.getOpenFileName(self, "Select Username File")
         if file_name:
+            file_name = self.preflight_target_file(file_name, "username",
+                                                   self.enable_breach_username_checkbox.isChecked())
             self.username_input.setText(f"file:{file_name}")  # Prefix to indicate file
             # Or if you want to keep both separate:
             # self.username_file_input.setText(file_name)
@@ -507,10 +810,42 @@ Crows mimic, crows are intelligent!
         # Open a file dialog to select an email file and set its path in the input field
         file_name, _ = QFileDialog.getOpenFileName(self, "Select Email File")
         if file_name:
+            file_name = self.preflight_target_file(file_name, "email",
+                                                   self.enable_breach_email_checkbox.isChecked())
             self.email_input.setText(f"file:{file_name}")  # Prefix to indicate file
             # Or if you want to keep both separate:
             # self.email_file_input.setText(file_name)
 
+    def preflight_target_file(self, file_name, kind, breach):
+        """Report valid/invalid/duplicate rows and the runtime estimate, returns the file to use"""
+        analysis = analyze_file(file_name, kind)
+        if not analysis['success']:
+            QMessageBox.warning(self, "Pre-flight Check", analysis['error'])
+            return file_name
+        estimate = estimate_runtime(analysis['unique'], self.filter_input.text(),
+                                    self.timeout_spinbox.value(), breach=breach)
+        report = format_preflight(analysis, estimate)
+        self.output_area.append("🛫 Pre-flight check\n" + report)
+        if not analysis['changed'] or not analysis['entries']:
+            return file_name
+
+        dialog = QMessageBox(self)
+        dialog.setWindowTitle("Pre-flight Check")
+        dialog.setText(report.split("\n\nInvalid rows")[0])
+        dialog.setDetailedText(report)
+        dedupe_button = dialog.addButton("Use Deduplicated File", QMessageBox.ButtonRole.AcceptRole)
+        dialog.addButton("Use Original", QMessageBox.ButtonRole.RejectRole)
+        dialog.exec()
+        if dialog.clickedButton() is not dedupe_button:
+            return file_name
+        try:
+            path = write_entries(analysis['entries'], deduped_path(file_name))
+        except OSError as e:
+            QMessageBox.warning(self, "Pre-flight Check", f"Could not write the deduplicated file: {e}")
+            return file_name
+        self.output_area.append(f"✅ {analysis['unique']} unique {kind}(s) written to {path}")
+        return path
+
     def save_settings(self):
         # Use the modular save_settings function
         save_settings(self)
@@ -662,6 +997,65 @@ Crows mimic, crows are intelligent!
             except ValueError:
                 QMessageBox.warning(self, "Invalid Input", "Port numbers must be integers.")
     
+    def count_targets(self):
+        """Rough number of targets in the current inputs (file entries or comma separated)"""
+        count = 0
+        for text in (self.username_input.text().strip(), self.email_input.text().strip()):
+            if text.startswith("file:"):
+                try:
+                    with open(text[5:].strip(), 'r', encoding='utf-8', errors='replace') as f:
+                        count += sum(1 for line in f if line.strip())
+                except OSError:
+                    count += 1
+            elif text:
+                count += len([item for item in text.split(',') if item.strip()])
+        return max(count, 1)
+
+    def tune_timeout(self):
+        """Show the recommended timeout and exclusion filter with the projected saving"""
+        from PyQt6.QtWidgets import QDialog, QDialogButtonBox
+        from PyQt6.QtGui import QFont
+
+        result = recommend(load_site_stats(), current_timeout=self.timeout_spinbox.value(),
+                           targets=self.count_targets())
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Timeout Auto-tune")
+        dialog.resize(700, 500)
+        layout = QVBoxLayout()
+
+        report = QTextEdit()
+        report.setReadOnly(True)
+        monospace = QFont("Monospace")
+        monospace.setStyleHint(QFont.StyleHint.TypeWriter)
+        report.setFont(monospace)
+        report.setPlainText(format_recommendation(result))
+        layout.addWidget(report)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Apply |
+                                   QDialogButtonBox.StandardButton.Close)
+        buttons.button(QDialogButtonBox.StandardButton.Apply).setEnabled(result['success'])
+        buttons.rejected.connect(dialog.reject)
+
+        def apply_recommendation():
+            combined = combine_filters(self.filter_input.text(), result['exclusion_filter'])
+            if combined is None:
+                QMessageBox.warning(dialog, "Timeout Auto-tune",
+                                    "Your filter contains 'or', the exclusions were not added.\n"
+                                    "Only the timeout was applied.")
+            else:
+                self.filter_input.setText(combined)
+            self.timeout_spinbox.setValue(result['recommended_timeout'])
+            self.output_area.append(f"⏱️  Timeout set to {result['recommended_timeout']}s, "
+                                    f"{len(result['excluded'])} slow/dead site(s) excluded")
+            dialog.accept()
+
+        buttons.button(QDialogButtonBox.StandardButton.Apply).clicked.connect(apply_recommendation)
+        layout.addWidget(buttons)
+
+        dialog.setLayout(layout)
+        dialog.exec()
+
     def show_tor_help(self):
         """Show TOR help information"""
         QMessageBox.information(self, "TOR IP Spoofing Help",
@@ -684,6 +1078,7 @@ Crows mimic, crows are intelligent!
             if hasattr(self, 'tor_checkbox') and self.tor_checkbox.isChecked():
                 if not self.tor_spoofer.tor_enabled:
                     if not self.tor_spoofer.enable_tor_for_ai():
+                        self.drain_events()
                         self.output_area.append("⚠️  TOR spoofing failed, continuing with direct connection")
             
             # Check multiple locations for API key
@@ -729,14 +1124,22 @@ Crows mimic, crows are intelligent!
                     QMessageBox.warning(self, "Warning", "AI analysis disabled - no API key configured.")
                     self.AI_checkbox.setChecked(False)
 
+        # Each run gets its own tab; everything below is written to it through self.output_area
+        tab = self.open_investigation_tab()
+
+        # Start the clock before the breach hooks, they are part of the run
+        run_started_at = time.time()
+        budget_snapshot = BUDGET.stats()
+        breach_lookups = 0
+
         # ================================================================
         # HOOK: BREACH.VIP USERNAME SEARCH
         # ================================================================
         if breach_vip_username.is_enabled(self) and self.username_input.text().strip():
-            
-            self.output_area.append("\n" + "=" * 60)
-            self.output_area.append("🔍 BREACH.VIP USERNAME SEARCH HOOK")
-            self.output_area.append("=" * 60)
+            events = Publisher(breach_vip_username.SOURCE, channel=tab)
+            events.progress("\n" + "=" * 60)
+            events.progress("🔍 BREACH.VIP USERNAME SEARCH HOOK")
+            events.progress("=" * 60)
             
             text = self.username_input.text().strip()
             
@@ -744,32 +1147,34 @@ Crows mimic, crows are intelligent!
             if text.startswith("file:"):
                 file_path = text[5:]  # Remove "file:" prefix
                 if os.path.exists(file_path):
-                    self.output_area.append(f"Searching Breach.vip for usernames from file: {os.path.basename(file_path)}")
-                    breach_vip_username.process_username_file(file_path, self.output_area)
+                    events.progress(f"Searching Breach.vip for usernames from file: {os.path.basename(file_path)}")
+                    breach_lookups += breach_vip_username.process_username_file(file_path, events, self.confirm_breach_batch) or 0
                 else:
-                    self.output_area.append(f"❌ File not found: {file_path}")
+                    events.warning(f"❌ File not found: {file_path}")
             else:
                 # Regular username input (could be single or multiple usernames)
                 usernames = [u.strip() for u in text.split(',') if u.strip()]
                 if len(usernames) == 1:
-                    self.output_area.append(f"Searching Breach.vip for username: {usernames[0]}")
-                    breach_vip_username.process_single_username(usernames[0], self.output_area)
+                    events.progress(f"Searching Breach.vip for username: {usernames[0]}")
+                    breach_vip_username.process_single_username(usernames[0], events)
+                    breach_lookups += 1
                 else:
-                    self.output_area.append(f"Searching Breach.vip for {len(usernames)} usernames")
+                    events.progress(f"Searching Breach.vip for {len(usernames)} usernames")
                     for username in usernames:
-                        self.output_area.append(f"  • Processing: {username}")
-                        breach_vip_username.process_single_username(username, self.output_area)
+                        events.progress(f"  • Processing: {username}")
+                        breach_vip_username.process_single_username(username, events)
+                        breach_lookups += 1
             
-            self.output_area.append("=" * 60 + "\n")
+            events.progress("=" * 60 + "\n")
 
         # ================================================================
         # HOOK: BREACH.VIP EMAIL SEARCH
         # ================================================================
         if breach_vip.is_enabled(self) and self.email_input.text().strip():
-            
-            self.output_area.append("\n" + "=" * 60)
-            self.output_area.append("📧 BREACH.VIP EMAIL SEARCH HOOK")
-            self.output_area.append("=" * 60)
+            events = Publisher(breach_vip.SOURCE, channel=tab)
+            events.progress("\n" + "=" * 60)
+            events.progress("📧 BREACH.VIP EMAIL SEARCH HOOK")
+            events.progress("=" * 60)
             
             text = self.email_input.text().strip()
             
@@ -777,28 +1182,31 @@ Crows mimic, crows are intelligent!
             if text.startswith("file:"):
                 file_path = text[5:]  # Remove "file:" prefix
                 if os.path.exists(file_path):
-                    self.output_area.append(f"Searching Breach.vip for emails from file: {os.path.basename(file_path)}")
-                    breach_vip.process_email_file(file_path, self.output_area)
+                    events.progress(f"Searching Breach.vip for emails from file: {os.path.basename(file_path)}")
+                    breach_lookups += breach_vip.process_email_file(file_path, events, self.confirm_breach_batch) or 0
                 else:
-                    self.output_area.append(f"❌ File not found: {file_path}")
+                    events.warning(f"❌ File not found: {file_path}")
             else:
                 # Regular email input (could be single or multiple emails)
                 emails = [e.strip() for e in text.split(',') if e.strip()]
                 if len(emails) == 1:
-                    self.output_area.append(f"Searching Breach.vip for email: {emails[0]}")
-                    breach_vip.process_single_email(emails[0], self.output_area)
+                    events.progress(f"Searching Breach.vip for email: {emails[0]}")
+                    breach_vip.process_single_email(emails[0], events)
+                    breach_lookups += 1
                 else:
-                    self.output_area.append(f"Searching Breach.vip for {len(emails)} emails")
+                    events.progress(f"Searching Breach.vip for {len(emails)} emails")
                     for email in emails:
-                        self.output_area.append(f"  • Processing: {email}")
-                        breach_vip.process_single_email(email, self.output_area)
+                        events.progress(f"  • Processing: {email}")
+                        breach_vip.process_single_email(email, events)
+                        breach_lookups += 1
             
-            self.output_area.append("=" * 60 + "\n")
+            events.progress("=" * 60 + "\n")
         
+        # Show the hook output before the Blackbird run starts writing to the tab
+        self.drain_events()
+
         # Rest of the existing run_blackbird method...
-        if self.worker and self.worker.isRunning():
-            self.worker.terminate()
-            self.worker.wait()
+        # Runs in other tabs keep going; the blackbird network slots cap how many scan at once
 
         # Get all input values
         username_input = self.username_input.text()
@@ -829,60 +1237,482 @@ Crows mimic, crows are intelligent!
             self.output_area.append("Note: This will analyze results using Blackbird AI")
             self.output_area.append("")
 
-        command = build_blackbird_command(
-            username_input,           # username(s) - could include "file:" prefix
-            email_input,              # email(s) - could include "file:" prefix
-            "",                       # username_file_input (empty string - we're using file: prefix)
-            "",                       # email_file_input (empty string - we're using file: prefix)
-            permute_checkbox,
-            permuteall_checkbox,
-            AI_checkbox,
-            no_nsfw_checkbox,
-            no_update_checkbox,
-            csv_checkbox,
-            pdf_checkbox,
-            json_checkbox,
-            verbose_checkbox,
-            dump_checkbox,
-            proxy_input,
-            timeout_spinbox,
-            filter_input,
-            instagram_session_id
-        )
+        # AI as a second pass: the main scan runs without --ai and finishes on its own
+        ai_second_pass = AI_checkbox and self.ai_second_pass_checkbox.isChecked()
+        if ai_second_pass:
+            self.output_area.append("🤖 AI analysis will run afterwards on the hits only")
+            AI_checkbox = False
+
+        # Keep the arguments as a dict so the run history can record them verbatim
+        command_args = {
+            "username_input": username_input,       # username(s) - could include "file:" prefix
+            "email_input": email_input,             # email(s) - could include "file:" prefix
+            "username_file_input": "",              # empty string - we're using file: prefix
+            "email_file_input": "",                 # empty string - we're using file: prefix
+            "permute_checkbox": permute_checkbox,
+            "permuteall_checkbox": permuteall_checkbox,
+            "AI_checkbox": AI_checkbox,
+            "no_nsfw_checkbox": no_nsfw_checkbox,
+            "no_update_checkbox": no_update_checkbox,
+            "csv_checkbox": csv_checkbox,
+            "pdf_checkbox": pdf_checkbox,
+            "json_checkbox": json_checkbox,
+            "verbose_checkbox": verbose_checkbox,
+            "dump_checkbox": dump_checkbox,
+            "proxy_input": proxy_input,
+            "timeout_spinbox": timeout_spinbox,
+            "filter_input": filter_input,
+            "instagram_session_id": instagram_session_id
+        }
+        command = build_blackbird_command(**command_args)
+        followup_passes = []
+
+        if self.two_pass_checkbox.isChecked():
+            command, followup_passes = self.plan_two_pass_commands(command_args, command)
 
         # self.output_area.clear()
         # Pass AI_checkbox to determine if we need to auto-confirm
         self.worker = BlackbirdWorker(" ".join(command), needs_ai_confirmation=AI_checkbox)
-        self.worker.output_signal.connect(self.update_output)
+        self.worker.followup_passes = followup_passes
+        self.worker.breach_lookups = breach_lookups
+        self.worker.budget_snapshot = budget_snapshot
+        self.worker.dump_enabled = dump_checkbox
+        self.worker.display_level = self.display_level_combo.currentData()
+        self.worker.run_id = self.record_run_start(command_args, command, run_started_at, tab.settings)
+        if verbose_checkbox:
+            self.worker.log_offsets = snapshot_log_offsets()
+        self.worker.target = target_key(command_args)
+        self.worker.run_targets = run_targets(command_args)
+        self.worker.feed_target = job_label(command_args)
+        self.worker.catalog_version = catalog_version()
+        if self.diff_checkbox.isChecked():
+            self.worker.diff = self.create_diff_filter(self.worker.target, self.worker.catalog_version)
+        tab.attach_worker(self.worker)
+        self.worker.output_signal.connect(lambda text, tab=tab: self.update_output(text, tab))
         self.worker.finished.connect(self.on_worker_finished)
+        self.worker.finished.connect(lambda worker=self.worker: self.record_run_finished(worker))
+        if ai_second_pass:
+            self.worker.finished.connect(
+                lambda worker=self.worker, args=command_args: self.start_ai_second_pass(worker, args))
         self.worker.start()
-        
-        self.run_button.setEnabled(False)
-        self.stop_button.setEnabled(True)
+
+        self.update_run_buttons()
+
+    def restore_session_snapshot(self):
+        """Reopen the tabs saved at the last close: hits and counters from the snapshot, the last
+        lines of each run log from its memory map, search answered from the saved index"""
+        manifest = load_session()
+        if not manifest:
+            return
+        current = None
+        for entry in manifest['tabs']:
+            runs = restored_runs(entry)
+            if not runs:
+                continue
+            tab = InvestigationTab(entry['title'], entry['settings'])
+            tab.restore_runs(runs)
+            self.tabs.addTab(tab, entry['title'])
+            if entry.get('current'):
+                current = tab
+
+            lines = sum(run.lines for run in runs)
+            tab.output_area.append(f"📂 Restored from the session of {format_timestamp(manifest['saved_at'])} - "
+                                   f"{lines} line(s) in the run log, search covers all of them")
+            hits = [hit for run in runs for hit in run.hits]
+            if hits:
+                tab.output_area.append(f"🎯 {len(hits)} hit(s):")
+                for site, url in hits:
+                    tab.output_area.append(f"   {site}: {url}")
+            tab.output_area.append(f"--- Last {TAIL_LINES} line(s) of the run log ---")
+            for text in runs[-1].run_log.tail(TAIL_LINES):
+                tab.output_area.append(text)
+        if current:
+            self.tabs.setCurrentWidget(current)
+
+    def save_session_snapshot(self):
+        tabs = []
+        for index in range(self.tabs.count()):
+            tab = self.tabs.widget(index)
+            if not isinstance(tab, InvestigationTab) or tab is self.log_tab:
+                continue
+            tabs.append({'title': tab.title, 'settings': tab.settings, 'workers': tab.workers,
+                         'current': tab is self.tabs.currentWidget()})
+        try:
+            save_session(tabs)
+        except OSError as e:
+            print(f"Warning: Could not save the session snapshot: {e}")
+
+    def closeEvent(self, event):
+        self.save_session_snapshot()
+        if self.results_feed:
+            self.results_feed.close()
+        super().closeEvent(event)
+
+    def open_investigation_tab(self):
+        """Add and select a tab for a new run, titled after its target"""
+        settings = collect_settings(self)
+        title = (settings.get("username_input") or settings.get("email_input") or "Run").strip()
+        if len(title) > 24:
+            title = title[:23] + "…"
+        tab = InvestigationTab(title, settings)
+        self.tabs.addTab(tab, title)
+        self.tabs.setCurrentWidget(tab)
+        return tab
+
+    def close_investigation_tab(self, index):
+        tab = self.tabs.widget(index)
+        if not isinstance(tab, InvestigationTab) or tab is self.log_tab:
+            return
+        if tab.is_running():
+            reply = QMessageBox.question(self, "Close Investigation",
+                                         f"'{tab.title}' is still running. Stop it and close the tab?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+            tab.stop()
+        tab.closed = True
+        self.tabs.removeTab(index)
+
+    def enqueue_current_settings(self):
+        job_id = self.run_queue.enqueue(collect_settings(self))
+        self.append_to_output_area(f"📋 Queued job #{job_id}", self.log_tab)
+        self.queue_panel.refresh()
+        self.process_run_queue()
+
+    def process_run_queue(self):
+        """Finish the current queued job once its tab is idle, then start the next one"""
+        if not self.run_queue:
+            return
+        if self.queue_job_id is not None:
+            # The tab may still be busy after the worker, e.g. with the AI second pass
+            if self.queue_tab.is_running():
+                return
+            status = STOPPED if self.queue_tab.worker.stopped else DONE
+            self.run_queue.mark_finished(self.queue_job_id, status)
+            self.queue_job_id = None
+            self.queue_tab = None
+            self.queue_panel.refresh()
+
+        if self.run_queue.is_paused():
+            return
+        job = self.run_queue.next_job()
+        if job:
+            self.start_queued_job(job)
+            self.queue_panel.refresh()
+
+    def start_queued_job(self, job):
+        """Run a queued settings snapshot through the normal Run path, then restore the form"""
+        current = collect_settings(self)
+        tab_count = self.tabs.count()
+        # The TOR checkbox toggles TOR when it changes; run_blackbird enables it when needed
+        tor_signals_blocked = self.tor_checkbox.blockSignals(True)
+        try:
+            apply_settings(self, job["settings"])
+            self.run_blackbird()
+        finally:
+            apply_settings(self, current)
+            self.tor_checkbox.blockSignals(tor_signals_blocked)
+
+        tab = self.current_tab()
+        if self.tabs.count() == tab_count or not tab.worker:
+            self.run_queue.mark_finished(job["id"], FAILED, error="Run did not start")
+            self.append_to_output_area(f"❌ Queued job #{job['id']} did not start", self.log_tab)
+            return
+        self.queue_job_id = job["id"]
+        self.queue_tab = tab
+        self.run_queue.mark_running(job["id"], tab.worker.run_id)
+
+    def current_tab(self):
+        widget = self.tabs.currentWidget()
+        return widget if isinstance(widget, InvestigationTab) else self.log_tab
+
+    @property
+    def output_area(self):
+        """Output view of the selected tab"""
+        return self.current_tab().output_area
+
+    def update_run_buttons(self, *_):
+        self.stop_button.setEnabled(self.current_tab().is_running())
+
+    def record_run_start(self, command_args, command, started_at, settings):
+        """Insert the run into the history database, returns the run id or None"""
+        if not self.run_history:
+            return None
+        try:
+            return self.run_history.start_run(command_args, command, settings, started_at)
+        except Exception as e:
+            self.output_area.append(f"⚠️  Could not record run history: {e}")
+            return None
+
+    def plan_two_pass_commands(self, command_args, command):
+        """Split the scan into a fast pass and a long-tail pass, or keep the single command"""
+        if command_args["AI_checkbox"]:
+            # Each pass would spend its own AI queries on a partial result set
+            self.output_area.append("ℹ️  Two-pass scan disabled while AI analysis is enabled")
+            return command, []
+        if not self.results_store:
+            return command, []
+
+        plan = plan_two_pass(command_args["filter_input"], self.results_store.site_hit_rates(),
+                             self.two_pass_top_n_spinbox.value())
+        if not plan['success']:
+            self.output_area.append(f"ℹ️  Two-pass scan skipped: {plan['error']}")
+            return command, []
+
+        self.output_area.append(f"⚡ Two-pass scan: {len(plan['top_sites'])} most productive sites first "
+                                f"(~{plan['expected_hit_share']:.0%} of historical hits)")
+        first = build_blackbird_command(**dict(command_args, filter_input=plan['first_pass_filter']))
+        second = build_blackbird_command(**dict(command_args, filter_input=plan['second_pass_filter']))
+        label = "⏩ Fast pass complete - scanning the remaining sites"
+        return first, [(label, " ".join(second))]
+
+    def update_ai_quota_label(self):
+        remaining = self.ai_ledger.remaining_today()
+        self.ai_quota_label.setText(f"AI queries left today: {'?' if remaining is None else remaining}")
+
+    def start_ai_second_pass(self, worker, command_args):
+        """Run AI analysis over the hit sites only, unless the result set is unchanged"""
+        tab = worker.tab
+        if worker.stopped:
+            return
+        if not worker.hits:
+            self.append_to_output_area("🤖 No hits - AI analysis skipped", tab)
+            return
+
+        cache_key = result_set_hash(worker.target, worker.hits)
+        cached_report = self.ai_report_cache.get(cache_key)
+        if cached_report:
+            self.append_to_output_area("🤖 Result set unchanged - AI report from cache (no query used):", tab)
+            for line in cached_report.splitlines():
+                self.append_to_output_area(line, tab)
+            return
+
+        if not self.ai_ledger.has_quota():
+            self.append_to_output_area("⚠️  No AI queries left today - AI analysis skipped", tab)
+            return
+
+        sites = sorted({site for site, _ in worker.hits})
+        safe_sites = [site for site in sites if is_filter_safe_name(site)]
+        if len(safe_sites) < len(sites):
+            self.append_to_output_area(f"⚠️  {len(sites) - len(safe_sites)} hit site(s) cannot be expressed "
+                                       f"in a filter and are left out of the AI pass", tab)
+        if not safe_sites:
+            return
+
+        hit_filter = " or ".join(f"name={quote_filter_value(site)}" for site in safe_sites)
+        ai_args = dict(command_args, AI_checkbox=True, filter_input=f'"{hit_filter}"',
+                       csv_checkbox=False, pdf_checkbox=False, json_checkbox=False,
+                       dump_checkbox=False, verbose_checkbox=False)
+        command = build_blackbird_command(**ai_args)
+
+        self.append_to_output_area(f"🤖 AI second pass over {len(safe_sites)} hit site(s)", tab)
+        tab.pending_ai_cache_key = cache_key
+        self.worker = BlackbirdWorker(" ".join(command), needs_ai_confirmation=True)
+        tab.attach_worker(self.worker)
+        self.worker.output_signal.connect(lambda text, tab=tab: self.update_output(text, tab))
+        self.worker.finished.connect(self.on_worker_finished)
+        self.worker.start()
+
+        self.update_run_buttons()
+
+    def create_diff_filter(self, target, version):
+        """Differential filter against the last complete run of this target, or None"""
+        if not self.results_store:
+            return None
+        previous = self.results_store.previous_results(target, version)
+        if previous is None:
+            self.output_area.append("ℹ️  No previous run for this target and site catalog - showing full results")
+            return None
+        self.output_area.append(f"🔁 Differential mode: comparing against {len(previous)} previously found site(s)")
+        return DiffFilter(previous)
+
+    def process_run_files(self, worker, events):
+        """Dump store and results index for a finished run, on a thread of its own (messages go
+        through the event bus to the run's tab)"""
+        targets, permute = worker.run_targets
+        if worker.dump_enabled:
+            self.store_run_dumps(worker, targets, permute, events)
+        if self.results_index:
+            self.index_run_results(worker, targets, permute, events)
+
+    def store_run_dumps(self, worker, targets, permute, events):
+        """Deduplicate and compress the HTML pages a run dumped"""
+        run_label = f"run_{worker.run_id}" if worker.run_id is not None else time.strftime("run_%Y%m%d_%H%M%S")
+        try:
+            result = ingest_run_dumps(run_label, worker.started_at, targets=targets, permute=permute)
+        except Exception as e:
+            events.warning(f"⚠️  Could not store HTML dumps: {e}")
+            return
+        if result['success']:
+            events.progress(
+                f"💾 HTML dumps: {result['files']} page(s), {result['unique']} new unique, "
+                f"{format_size(result['bytes_in'])} → {format_size(result['bytes_stored'])} "
+                f"({result['manifest']})")
+
+    def index_run_results(self, worker, targets, permute, events):
+        """Load the CSV/JSON files and AI reports written for the run's targets into the results index"""
+        try:
+            result = self.results_index.ingest_directory(since=worker.started_at, run_id=worker.run_id,
+                                                         targets=targets, permute=permute)
+        except Exception as e:
+            events.warning(f"⚠️  Could not index results: {e}")
+            return
+        if result['files']:
+            events.progress(f"🗂️  Indexed {result['rows']} result(s) from {result['files']} file(s)")
+
+    def apply_network_budget(self):
+        """Push the network budget settings to the shared scheduler"""
+        try:
+            weights = parse_weights(self.net_weights_input.text())
+        except ValueError as e:
+            self.append_to_output_area(f"⚠️  Invalid network weights: {e}")
+            return
+        BUDGET.configure(self.net_total_spinbox.value(), weights)
+
+    def record_run_finished(self, worker):
+        """Store the counters of a finished worker in the history database"""
+        for line in BUDGET.delay_report(since=worker.budget_snapshot):
+            self.append_to_output_area(line, worker.tab)
+        if (worker.dump_enabled or self.results_index) and worker.started_at and worker.run_targets:
+            threading.Thread(target=self.process_run_files, args=(worker, Publisher("crow", channel=worker.tab)),
+                             name="run-files", daemon=True).start()
+        if not self.run_history or worker.run_id is None:
+            return
+        try:
+            # Only a complete run becomes the baseline for differential mode
+            if self.results_store:
+                self.results_store.record_hits(worker.run_id, worker.target, worker.catalog_version,
+                                               worker.hits, snapshot=not worker.stopped)
+            if self.telemetry_store:
+                log_records = collect_new_log_records(worker.log_offsets) if worker.log_offsets is not None else []
+                # The log and the output report the same requests: sites found in the log
+                # (with timing) are left out of the output records so nothing counts twice
+                logged_sites = {record['site'] for record in log_records}
+                self.telemetry_store.record(worker.run_id,
+                                            [record for record in worker.telemetry if record['site'] not in logged_sites],
+                                            source="output")
+                self.telemetry_store.record(worker.run_id, log_records, source="log")
+            self.run_history.finish_run(
+                worker.run_id,
+                status="stopped" if worker.stopped else "finished",
+                exit_code=worker.returncode,
+                hits=worker.stats[HIT],
+                misses=worker.stats[MISS],
+                errors=worker.stats[ERROR],
+                breach_lookups=worker.breach_lookups,
+                peak_memory_kb=worker.peak_memory_kb,
+                first_hit_seconds=worker.first_hit_seconds
+            )
+            if worker.first_hit_seconds is not None:
+                self.append_to_output_area(f"⏱️  First result after {worker.first_hit_seconds:.1f}s", worker.tab)
+        except Exception as e:
+            self.append_to_output_area(f"⚠️  Could not record run history: {e}", worker.tab)
+
+    def show_run_history(self):
+        """Show recent runs and compare two of them"""
+        from PyQt6.QtWidgets import QDialog, QListWidget, QAbstractItemView
+        from PyQt6.QtGui import QFont
+
+        if not self.run_history:
+            QMessageBox.warning(self, "Run History", "Run history database is not available.")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Run History")
+        dialog.resize(1000, 600)
+        layout = QVBoxLayout()
+
+        monospace = QFont("Monospace")
+        monospace.setStyleHint(QFont.StyleHint.TypeWriter)
+
+        runs = self.run_history.list_runs(200)
+        run_list = QListWidget()
+        run_list.setFont(monospace)
+        run_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        for run in runs:
+            run_list.addItem(format_run_row(run))
+        layout.addWidget(QLabel("Select two runs to compare (older one first is the baseline):"))
+        layout.addWidget(run_list)
+
+        details = QTextEdit()
+        details.setReadOnly(True)
+        details.setFont(monospace)
+        layout.addWidget(details)
+
+        def compare_selected():
+            rows = sorted(index.row() for index in run_list.selectedIndexes())
+            if len(rows) != 2:
+                QMessageBox.information(dialog, "Compare Runs", "Select exactly two runs.")
+                return
+            # Rows are newest first, so the higher row is the older baseline
+            comparison = self.run_history.compare_runs(runs[rows[1]]['id'], runs[rows[0]]['id'])
+            details.setPlainText(format_comparison(comparison))
+
+        compare_button = QPushButton("Compare Selected")
+        compare_button.clicked.connect(compare_selected)
+        layout.addWidget(compare_button)
+
+        dialog.setLayout(layout)
+        dialog.exec()
+
+    def show_stall_summary(self):
+        """Top sources of GUI stalls recorded by the watchdog, with the stack of the longest one"""
+        from PyQt6.QtWidgets import QDialog, QListWidget
+        from PyQt6.QtGui import QFont
+
+        path = self.stall_watchdog.path if self.stall_watchdog else os.environ.get("CROW_STALL_LOG", STALL_LOG_PATH)
+        stalls = load_stalls(path)
+        if not stalls:
+            QMessageBox.information(self, "GUI Stalls", "No GUI stalls recorded yet.")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("GUI Stalls")
+        dialog.resize(1000, 600)
+        layout = QVBoxLayout()
+
+        monospace = QFont("Monospace")
+        monospace.setStyleHint(QFont.StyleHint.TypeWriter)
+
+        sources = summarize(stalls)
+        source_list = QListWidget()
+        source_list.setFont(monospace)
+        for entry in sources:
+            source_list.addItem(format_summary_row(entry))
+        layout.addWidget(QLabel(f"{len(stalls)} stall(s), sources by total blocked time:"))
+        layout.addWidget(source_list)
+
+        details = QTextEdit()
+        details.setReadOnly(True)
+        details.setFont(monospace)
+        layout.addWidget(details)
+        source_list.currentRowChanged.connect(
+            lambda row: details.setPlainText("".join(sources[row]['stack']) if row >= 0 else ""))
+        source_list.setCurrentRow(0)
+
+        dialog.setLayout(layout)
+        dialog.exec()
 
     def get_output_area(self):
         """Get the output area from parent"""
         return self.output_area if hasattr(self, 'output_area') else None
     
     def stop_blackbird(self):
-        # Stop the Blackbird process if running
-        if self.worker and self.worker.isRunning():
-            self.worker.terminate()
-            self.worker.wait()
+        # Stop the Blackbird process of the selected tab if running
+        tab = self.current_tab()
+        tab.stop()
         self.run_button.setEnabled(True)  # Re-enable Run button
         self.stop_button.setEnabled(False)  # Disable Stop button
-        self.output_area.clear()
+        tab.output_area.clear()
+
+    def update_output(self, text, tab=None):
+        # AI report state lives in the tab of the run producing it
+        tab = tab or self.log_tab
 
-    def update_output(self, text):
-        # Initialize AI results buffer if it doesn't exist
-        if not hasattr(self, 'ai_results_buffer'):
-            self.ai_results_buffer = []
-            self.ai_results_started = False
-        
         # Check if AI analysis is starting
         if 'analyzing with ai' in text.lower() or '✨ analyzing with ai' in text.lower():
-            self.ai_results_started = True
-            self.ai_results_buffer = [
+            tab.ai_results_started = True
+            tab.ai_results_buffer = [
                 "🤖 BLACKBIRD AI ANALYSIS REPORT",
                 "=" * 60,
                 f"Generated: {self.get_current_timestamp()}",
@@ -891,63 +1721,51 @@ Crows mimic, crows are intelligent!
             ]
             
             # Add search context
-            username = self.username_input.text().strip()
-            email = self.email_input.text().strip()
+            username, email = self.tab_targets(tab)
             if username:
-                self.ai_results_buffer.append(f"Target Username: {username}")
+                tab.ai_results_buffer.append(f"Target Username: {username}")
             if email:
-                self.ai_results_buffer.append(f"Target Email: {email}")
+                tab.ai_results_buffer.append(f"Target Email: {email}")
             if username or email:
-                self.ai_results_buffer.append("")
+                tab.ai_results_buffer.append("")
         
         # Buffer AI results
-        if self.ai_results_started:
+        if tab.ai_results_started:
             # Clean and format the text for file output
             clean_text = text.replace('🤖', '').replace('📊', '').strip()
-            self.ai_results_buffer.append(clean_text)
+            tab.ai_results_buffer.append(clean_text)
             
             # Check if AI analysis is complete
             if 'ai queries left' in text.lower():
-                self.ai_results_buffer.extend([
+                tab.ai_results_buffer.extend([
                     "",
                     "=" * 60,
                     f"Analysis complete - {self.get_current_timestamp()}",
                     "=" * 60
                 ])
-                self.auto_save_ai_results()  # Auto-save instead of dialog
-                self.ai_results_started = False
-        
-        # Format for GUI display
-        formatted_text = self.format_ai_text_for_gui(text)
-        
-        # Update GUI
-        self.append_to_output_area(formatted_text)
-
-    def format_ai_text_for_gui(self, text):
-        """Format AI text for GUI display with emojis"""
-        if any(keyword in text.lower() for keyword in ['analyzing with ai', 'ai queries left', '✨']):
-            return f"🤖 {text}"
-        elif text.startswith('[Summary]'):
-            return f"📋 {text}"
-        elif text.startswith('[Profile Type]'):
-            return f"🎯 {text}"
-        elif text.startswith('[Insights]'):
-            return f"💡 {text}"
-        elif text.startswith('[Risk Flags]'):
-            return f"⚠️  {text}"
-        elif text.startswith('[Tags]'):
-            return f"🏷️  {text}"
-        else:
-            return text
+                self.auto_save_ai_results(tab)  # Auto-save instead of dialog
+                tab.ai_results_started = False
+
+                # Cache the report against the result set that produced it
+                if tab.pending_ai_cache_key:
+                    self.ai_report_cache.put(tab.pending_ai_cache_key, '\n'.join(tab.ai_results_buffer))
+                    tab.pending_ai_cache_key = None
+
+        # Keep the daily AI quota ledger current
+        if self.ai_ledger.record_from_line(text) is not None:
+            self.update_ai_quota_label()
+
+        # AI sections are highlighted by the output view's per-category formats
+        self.append_to_output_area(text, tab)
 
     def get_current_timestamp(self):
         """Get current timestamp for file naming and reports"""
         from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    def auto_save_ai_results(self):
+    def auto_save_ai_results(self, tab):
         """Automatically save AI results to file"""
-        if not self.ai_results_buffer:
+        if not tab.ai_results_buffer:
             return
         
         try:
@@ -955,8 +1773,7 @@ Crows mimic, crows are intelligent!
             from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            username = self.username_input.text().strip()
-            email = self.email_input.text().strip()
+            username, email = self.tab_targets(tab)
             
             # Create descriptive filename
             if username:
@@ -982,28 +1799,59 @@ Crows mimic, crows are intelligent!
 
             # Save to file
             with open(full_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(self.ai_results_buffer))
+                f.write('\n'.join(tab.ai_results_buffer))
             
             # Notify user
-            self.append_to_output_area(f"💾 AI results auto-saved to: {filename}")
+            self.append_to_output_area(f"💾 AI results auto-saved to: {filename}", tab)
+            BUS.publish(RESULT, "ai", "ai_report", run_id=tab.worker.run_id if tab.worker else None,
+                        target=username or email, report='\n'.join(tab.ai_results_buffer), path=full_path)
             
         except Exception as e:
-            self.append_to_output_area(f"❌ Error auto-saving AI results: {e}")
-
-    def append_to_output_area(self, text):
-        """Helper method to append text to output area with auto-scroll"""
-        scrollbar = self.output_area.verticalScrollBar()
-        was_at_bottom = scrollbar.value() == scrollbar.maximum()
-        
-        self.output_area.append(text)
-        
-        if was_at_bottom:
-            scrollbar.setValue(scrollbar.maximum())
+            self.append_to_output_area(f"❌ Error auto-saving AI results: {e}", tab)
+
+    def tab_targets(self, tab):
+        """Username and email of the run shown in tab (the launch-time settings, not the live inputs)"""
+        if tab.settings:
+            return tab.target_text("username_input"), tab.target_text("email_input")
+        return self.username_input.text().strip(), self.email_input.text().strip()
+
+    def drain_events(self):
+        """Show event bus messages in the tab they were published for (current tab otherwise)"""
+        for event in self.event_subscription.drain():
+            tab = event.channel if isinstance(event.channel, InvestigationTab) else None
+            self.append_to_output_area(event.message, tab)
+        dropped = self.event_subscription.take_dropped()
+        if dropped:
+            self.append_to_output_area(f"⚠️  {dropped} message(s) dropped, the output could not keep up",
+                                       self.log_tab)
+
+    def confirm_breach_batch(self, title, question):
+        reply = QMessageBox.question(self, title, question,
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        return reply == QMessageBox.StandardButton.Yes
+
+    def append_to_output_area(self, text, tab=None):
+        """Helper method to append text to output area (OutputView batches and auto-scrolls)"""
+        if tab is None:
+            tab = self.current_tab()
+        elif getattr(tab, 'closed', False):
+            tab = self.log_tab
+        tab.output_area.append(text)
+
+    def on_heartbeat(self):
+        now = time.monotonic()
+        lag = max(0.0, now - self.last_heartbeat - self.heartbeat_interval)
+        self.last_heartbeat = now
+        if self.stall_watchdog:
+            self.stall_watchdog.beat()
+        GUI_EVENT_LOOP_LAG.observe(lag)
+        if lag > GUI_EVENT_LOOP_LAG_MAX.get():
+            GUI_EVENT_LOOP_LAG_MAX.set(lag)
 
     def on_worker_finished(self):
-        # Re-enable the Run button and disable the Stop button when worker finishes
+        # Re-enable the Run button; Stop follows the selected tab
         self.run_button.setEnabled(True)
-        self.stop_button.setEnabled(False)
+        self.update_run_buttons()
 
 if __name__ == "__main__":
     # Create and run the application
@@ -0,0 +1,608 @@
+# crow_daemon.py
+import os
+import sys
+import hmac
+import json
+import time
+import argparse
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+from collections import deque
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from build_blackbird_command import build_blackbird_command, command_args_from_settings
+from blackbird_output import classify_line, parse_hit, should_display, HIT, MISS, ERROR, DISPLAY_HITS_ERRORS
+from run_log import RunLog
+from net_budget import BUDGET
+from metrics import REGISTRY, CONTENT_TYPE, BLACKBIRD_LINES
+from site_catalog import catalog_version
+from results_diff import ResultsStore, target_key
+from results_index import ResultsIndex, run_targets
+from run_history import RunHistory
+from dump_store import ingest_run_dumps
+from event_bus import BUS, RESULT, Publisher
+import breach_vip
+import breach_vip_username
+from results_feed import start_feed_from_env
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+# Events kept per job for streaming clients that connect late or reconnect
+MAX_EVENTS = 50000
+# Finished jobs kept in memory (their history stays in crow.db)
+MAX_FINISHED_JOBS = 200
+KEEPALIVE_SECONDS = 15
+
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+STOPPED = "stopped"
+FAILED = "failed"
+
+# GUI-only options: a job turning one of them on is refused rather than run without it
+UNSUPPORTED_SETTINGS = {
+    "tor_checkbox": "Tor for AI requests",
+    "two_pass_checkbox": "two-pass scan",
+    "diff_checkbox": "differential output",
+}
+# Breach.vip hooks run before Blackbird, like in the GUI: (input, checkbox, file search, single search)
+BREACH_HOOKS = (
+    ("username_input", "enable_breach_username_checkbox",
+     breach_vip_username.process_username_file, breach_vip_username.process_single_username,
+     breach_vip_username.SOURCE),
+    ("email_input", "enable_breach_email_checkbox",
+     breach_vip.process_email_file, breach_vip.process_single_email, breach_vip.SOURCE),
+)
+
+def unsupported_settings(settings):
+    """Labels of the GUI-only options settings turns on"""
+    return [label for key, label in UNSUPPORTED_SETTINGS.items() if settings.get(key)]
+
+def process_argv(command):
+    """Argument vector for running a build_blackbird_command() list without a shell
+
+    The GUI joins the list and runs it through a shell, so filters arrive wrapped in
+    double quotes. The daemon takes settings from the network and never uses a shell.
+    """
+    argv = [sys.executable]
+    for argument in command[1:]:
+        if len(argument) >= 2 and argument[0] == argument[-1] == '"':
+            argument = argument[1:-1]
+        argv.append(argument)
+    return argv
+
+class DaemonJob:
+    """One submitted run: its settings, counters and a numbered event buffer"""
+
+    def __init__(self, job_id, settings, label=None):
+        self.id = job_id
+        self.settings = settings
+        self.label = label or (settings.get("username_input") or settings.get("email_input") or "-")
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.stats = {HIT: 0, MISS: 0, ERROR: 0}
+        self.hits = []
+        self.ai_report = []
+        self.run_id = None
+        self.breach_lookups = 0
+        self.returncode = None
+        self.error = None
+        self.log_path = None
+        self.process = None
+        self.future = None
+        self.stopped = False
+        self.condition = threading.Condition()
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.next_sequence = 0
+        # Set together with the final "end" event, streams stop once they have sent it
+        self.ended = False
+
+    def add_event(self, kind, data):
+        with self.condition:
+            self.events.append((self.next_sequence, kind, data))
+            self.next_sequence += 1
+            self.condition.notify_all()
+
+    def is_done(self):
+        return self.status in (FINISHED, STOPPED, FAILED)
+
+    def finish(self):
+        """Publish the final status and the closing "end" event"""
+        self.add_event("status", {"status": self.status})
+        with self.condition:
+            self.events.append((self.next_sequence, "end", self.summary()))
+            self.next_sequence += 1
+            self.ended = True
+            self.condition.notify_all()
+
+    def wait_events(self, sequence, timeout):
+        """Events numbered sequence and later, waiting up to timeout for new ones"""
+        with self.condition:
+            if sequence >= self.next_sequence and not self.ended:
+                self.condition.wait(timeout)
+            first = self.next_sequence - len(self.events)
+            events = [event for event in self.events if event[0] >= sequence]
+            if sequence < first:
+                # Older events fell out of the buffer; the run log still has every line
+                events.insert(0, (first - 1, "gap", {"missing": first - sequence, "log": self.log_path}))
+            return events, self.ended
+
+    def set_status(self, status):
+        self.status = status
+        self.add_event("status", {"status": status})
+
+    def summary(self):
+        return {
+            "id": self.id, "label": self.label, "status": self.status, "run_id": self.run_id,
+            "created_at": self.created_at, "started_at": self.started_at, "finished_at": self.finished_at,
+            "hits": self.stats[HIT], "misses": self.stats[MISS], "errors": self.stats[ERROR],
+            "returncode": self.returncode, "error": self.error, "log": self.log_path,
+        }
+
+class JobManager:
+    """Runs jobs on a fixed pool of threads that stay up, with stores opened once"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, db_path=None):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crow-job")
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.next_id = 1
+        try:
+            self.run_history = RunHistory(db_path)
+            self.results_store = ResultsStore(db_path)
+            self.results_index = ResultsIndex(db_path)
+        except Exception as e:
+            print(f"Warning: Run history disabled: {e}")
+            self.run_history = None
+            self.results_store = None
+            self.results_index = None
+        # Warm the catalog hash cache so the first job does not pay for it
+        self.catalog_version = catalog_version()
+
+    def submit(self, settings, label=None):
+        with self.lock:
+            job = DaemonJob(self.next_id, settings, label)
+            self.next_id += 1
+            self.jobs[job.id] = job
+            self.prune()
+        job.add_event("status", {"status": QUEUED})
+        job.future = self.executor.submit(self.run_job, job)
+        return job
+
+    def prune(self):
+        finished = sorted(job.id for job in self.jobs.values() if job.ended)
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return [job.summary() for job in sorted(self.jobs.values(), key=lambda job: job.id)]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if not job or job.is_done():
+            return job
+        job.stopped = True
+        if job.future and job.future.cancel():
+            # Never started, so run_job will not publish the end of it
+            job.finished_at = time.time()
+            job.status = STOPPED
+            job.finish()
+        elif job.process:
+            job.process.terminate()
+        return job
+
+    def run_job(self, job):
+        job.started_at = time.time()
+        try:
+            self.execute(job)
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            if job.status in (QUEUED, RUNNING):
+                job.status = STOPPED if job.stopped else FINISHED
+            self.record_finished(job)
+            job.finish()
+
+    def execute(self, job):
+        command_args = command_args_from_settings(job.settings)
+        # The session id goes to this process only, not to the daemon's environment
+        session_id = command_args["instagram_session_id"]
+        command = build_blackbird_command(**dict(command_args, instagram_session_id=""))
+        env = dict(os.environ)
+        if session_id:
+            env["INSTAGRAM_SESSION_ID"] = session_id
+
+        if self.run_history:
+            job.run_id = self.run_history.start_run(command_args, command, job.settings, job.started_at)
+        job.command_args = command_args
+        job.set_status(RUNNING)
+        job.breach_lookups = self.run_breach_lookups(job)
+
+        run_log = RunLog(f"run_{job.run_id}" if job.run_id is not None else f"daemon_job_{job.id}")
+        job.log_path = run_log.path
+        display_level = job.settings.get("display_level", DISPLAY_HITS_ERRORS)
+        needs_ai_confirmation = command_args["AI_checkbox"]
+
+        while not BUDGET.acquire("blackbird", timeout=0.5):
+            if job.stopped:
+                run_log.close()
+                return
+        try:
+            if job.stopped:
+                return
+            job.process = subprocess.Popen(process_argv(command), stdout=subprocess.PIPE,
+                                           stderr=subprocess.STDOUT, stdin=subprocess.PIPE,
+                                           text=True, bufsize=1, env=env)
+            # A cancel that came in while the process was being started saw no process to stop
+            if job.stopped:
+                job.process.terminate()
+            ai_section = False
+            for line in job.process.stdout:
+                text = line.strip()
+                category = classify_line(text)
+                BLACKBIRD_LINES.inc(category=category or "other")
+                run_log.write(text)
+                if category:
+                    job.stats[category] += 1
+                if category == HIT:
+                    site, url = parse_hit(text)
+                    job.hits.append((site, url))
+                    job.add_event("hit", {"site": site, "url": url})
+                    BUS.publish(RESULT, "blackbird", "hit", run_id=job.run_id, target=job.label, site=site, url=url)
+
+                lower = text.lower()
+                if 'analyzing with ai' in lower:
+                    ai_section = True
+                    if needs_ai_confirmation:
+                        job.process.stdin.write('Y\n')
+                        job.process.stdin.flush()
+                        needs_ai_confirmation = False
+                if ai_section:
+                    job.ai_report.append(text)
+                    if 'queries left' in lower:
+                        ai_section = False
+
+                if should_display(category, display_level):
+                    job.add_event("line", {"text": text, "category": category})
+            job.process.stdout.close()
+            job.returncode = job.process.wait()
+            if job.ai_report:
+                BUS.publish(RESULT, "ai", "ai_report", run_id=job.run_id, target=job.label,
+                            report="\n".join(job.ai_report))
+        finally:
+            BUDGET.release("blackbird")
+            run_log.close()
+
+    def run_breach_lookups(self, job):
+        """The GUI's Breach.vip hooks for a job (batches run without confirmation), returns the lookups sent"""
+        lookups = 0
+        for key, checkbox, search_file, search_single, source in BREACH_HOOKS:
+            text = str(job.settings.get(key) or "").strip()
+            if not job.settings.get(checkbox) or not text:
+                continue
+            events = Publisher(source)
+            if text.startswith("file:"):
+                if os.path.exists(text[5:]):
+                    lookups += search_file(text[5:], events) or 0
+                else:
+                    events.warning(f"❌ File not found: {text[5:]}")
+                continue
+            for target in [item.strip() for item in text.split(',') if item.strip()]:
+                if job.stopped:
+                    break
+                search_single(target, events)
+                lookups += 1
+        return lookups
+
+    def record_finished(self, job):
+        """Same bookkeeping as a GUI run: history, baseline, results index, dump store"""
+        command_args = getattr(job, "command_args", None)
+        if job.run_id is None or not self.run_history:
+            return
+        try:
+            if command_args and self.results_store:
+                self.results_store.record_hits(job.run_id, target_key(command_args), self.catalog_version,
+                                               job.hits, snapshot=job.status == FINISHED)
+            if command_args:
+                # Only the job's own files: the other worker may still be writing its results
+                targets, permute = run_targets(command_args)
+                if self.results_index:
+                    self.results_index.ingest_directory(since=job.started_at, run_id=job.run_id,
+                                                        targets=targets, permute=permute)
+                if command_args["dump_checkbox"]:
+                    ingest_run_dumps(f"run_{job.run_id}", job.started_at, targets=targets, permute=permute)
+            self.run_history.finish_run(job.run_id, status=job.status, exit_code=job.returncode,
+                                        hits=job.stats[HIT], misses=job.stats[MISS], errors=job.stats[ERROR],
+                                        breach_lookups=job.breach_lookups)
+        except Exception as e:
+            print(f"Warning: Could not record daemon job #{job.id}: {e}")
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """REST API: /runs, /runs/<id>, /runs/<id>/events, /runs/<id>/report, /runs/<id>/log"""
+    manager = None
+    token = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def authorized(self):
+        if not self.token:
+            return True
+        header = self.headers.get("Authorization", "")
+        if hmac.compare_digest(header, f"Bearer {self.token}"):
+            return True
+        self.send_json(401, {"error": "Missing or wrong bearer token"})
+        return False
+
+    def route(self):
+        """(path parts, query) of the request"""
+        url = urlparse(self.path)
+        return [part for part in url.path.split('/') if part], parse_qs(url.query)
+
+    def job_from(self, parts):
+        try:
+            job = self.manager.get(int(parts[1]))
+        except ValueError:
+            job = None
+        if not job:
+            self.send_json(404, {"error": "No such job"})
+        return job
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        parts, query = self.route()
+        if parts == ["health"]:
+            self.send_json(200, {"status": "ok", "jobs": len(self.manager.list()), "budget": BUDGET.stats()})
+        elif parts == ["metrics"]:
+            body = REGISTRY.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif parts == ["runs"]:
+            self.send_json(200, {"runs": self.manager.list()})
+        elif len(parts) == 2 and parts[0] == "runs":
+            job = self.job_from(parts)
+            if job:
+                self.send_json(200, job.summary())
+        elif len(parts) == 3 and parts[0] == "runs":
+            job = self.job_from(parts)
+            if not job:
+                return
+            if parts[2] == "events":
+                self.stream_events(job, query)
+            elif parts[2] == "report":
+                self.send_json(200, {**job.summary(), "hit_list": [{"site": site, "url": url}
+                                                                    for site, url in job.hits],
+                                     "ai_report": "\n".join(job.ai_report)})
+            elif parts[2] == "log":
+                self.send_log(job)
+            else:
+                self.send_json(404, {"error": "Unknown endpoint"})
+        else:
+            self.send_json(404, {"error": "Unknown endpoint"})
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        parts, _ = self.route()
+        # A JSON content type cannot be sent cross-site without a CORS preflight
+        if not self.headers.get("Content-Type", "").startswith("application/json"):
+            self.send_json(415, {"error": "Content-Type must be application/json"})
+            return
+        if parts == ["runs"]:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except (ValueError, json.JSONDecodeError) as e:
+                self.send_json(400, {"error": f"Invalid JSON: {e}"})
+                return
+            # Either a bare settings file or {"settings": {...}, "label": "..."}
+            settings = payload.get("settings", payload) if isinstance(payload, dict) else None
+            if not isinstance(settings, dict) or not (settings.get("username_input") or settings.get("email_input")):
+                self.send_json(400, {"error": "Settings need username_input or email_input"})
+                return
+            unsupported = unsupported_settings(settings)
+            if unsupported:
+                self.send_json(400, {"error": f"Not supported by the daemon: {', '.join(unsupported)}"})
+                return
+            job = self.manager.submit(settings, payload.get("label"))
+            self.send_json(202, job.summary())
+        elif len(parts) == 3 and parts[0] == "runs" and parts[2] == "cancel":
+            job = self.job_from(parts)
+            if job:
+                self.send_json(200, self.manager.cancel(job.id).summary())
+        else:
+            self.send_json(404, {"error": "Unknown endpoint"})
+
+    def do_DELETE(self):
+        if not self.authorized():
+            return
+        parts, _ = self.route()
+        if len(parts) == 2 and parts[0] == "runs":
+            job = self.job_from(parts)
+            if job:
+                self.send_json(200, self.manager.cancel(job.id).summary())
+        else:
+            self.send_json(404, {"error": "Unknown endpoint"})
+
+    def stream_events(self, job, query):
+        """Server-sent events (default) or NDJSON (?format=ndjson) until the job ends"""
+        ndjson = query.get("format", [""])[0] == "ndjson"
+        try:
+            sequence = int(self.headers.get("Last-Event-ID", "-1")) + 1
+        except ValueError:
+            sequence = 0
+        try:
+            sequence = max(0, int(query.get("from", [sequence])[0]))
+        except ValueError:
+            self.send_json(400, {"error": "from must be an event number"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson" if ndjson else "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            while True:
+                events, done = job.wait_events(sequence, KEEPALIVE_SECONDS)
+                if not events:
+                    if done:
+                        break
+                    if not ndjson:
+                        self.wfile.write(b": keepalive\n\n")
+                        self.wfile.flush()
+                    continue
+                chunks = []
+                for number, kind, data in events:
+                    if ndjson:
+                        chunks.append(json.dumps({"id": number, "event": kind, "data": data},
+                                                 ensure_ascii=False) + "\n")
+                    else:
+                        chunks.append(f"id: {number}\nevent: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n")
+                    sequence = number + 1
+                self.wfile.write("".join(chunks).encode('utf-8'))
+                self.wfile.flush()
+                if events[-1][1] == "end":
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_log(self, job):
+        if not job.log_path or not os.path.exists(job.log_path):
+            self.send_json(404, {"error": "No run log yet"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(os.path.getsize(job.log_path)))
+        self.end_headers()
+        with open(job.log_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                self.wfile.write(chunk)
+
+def serve(port=DEFAULT_PORT, address="127.0.0.1", workers=DEFAULT_WORKERS, token=None, db_path=None):
+    """Start the daemon in a background thread, returns the server"""
+    handler = type("CrowDaemonHandler", (DaemonHandler,),
+                   {"manager": JobManager(workers, db_path), "token": token})
+    server = ThreadingHTTPServer((address, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="crow-daemon", daemon=True).start()
+    return server
+
+def client_request(url, method="GET", payload=None, token=None):
+    """Tiny client for the CLI commands below"""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method)
+    if data is not None:
+        request.add_header("Content-Type", "application/json")
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    return urllib.request.urlopen(request)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Crow investigations as a local service")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}", help="Daemon URL (client commands)")
+    parser.add_argument("--token", default=os.environ.get("CROW_DAEMON_TOKEN"),
+                        help="Bearer token (default: CROW_DAEMON_TOKEN)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="Start the daemon")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--address", default="127.0.0.1")
+    serve_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    serve_parser.add_argument("--db", help="Path to the Crow database (default: results/crow.db)")
+    serve_parser.add_argument("--feed", default=os.environ.get("CROW_FEED"),
+                              help="Also publish results as NDJSON on unix:/path or [tcp:][host:]port")
+
+    submit_parser = sub.add_parser("submit", help="Submit a saved settings file")
+    submit_parser.add_argument("settings")
+    submit_parser.add_argument("--follow", action="store_true", help="Stream the run until it ends")
+    follow_parser = sub.add_parser("follow", help="Stream the events of a job")
+    follow_parser.add_argument("job_id", type=int)
+    sub.add_parser("list", help="List jobs")
+    cancel_parser = sub.add_parser("cancel", help="Cancel a job")
+    cancel_parser.add_argument("job_id", type=int)
+    report_parser = sub.add_parser("report", help="Print a job's report as JSON")
+    report_parser.add_argument("job_id", type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = serve(args.port, args.address, args.workers, args.token, args.db)
+        print(f"🛰️  Crow daemon listening on http://{args.address}:{args.port}")
+        if not args.token and args.address not in ("127.0.0.1", "localhost", "::1"):
+            print("⚠️  No CROW_DAEMON_TOKEN set while listening beyond localhost")
+        feed = start_feed_from_env(args.feed)
+        if feed:
+            print(f"📡 Results feed on {feed.describe()}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+            if feed:
+                feed.close()
+        return 0
+
+    try:
+        if args.command == "submit":
+            with open(args.settings, 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+            job = json.load(client_request(f"{args.url}/runs", "POST", settings, args.token))
+            print(f"✅ Submitted job #{job['id']} ({job['label']})")
+            if args.follow:
+                return follow(args.url, job['id'], args.token)
+        elif args.command == "follow":
+            return follow(args.url, args.job_id, args.token)
+        elif args.command == "list":
+            for job in json.load(client_request(f"{args.url}/runs", token=args.token))["runs"]:
+                print(f"#{job['id']:<5} {job['status']:<9} hits={job['hits']:<4} err={job['errors']:<4} {job['label']}")
+        elif args.command == "cancel":
+            job = json.load(client_request(f"{args.url}/runs/{args.job_id}/cancel", "POST", {}, args.token))
+            print(f"🛑 Job #{job['id']}: {job['status']}")
+        elif args.command == "report":
+            print(json.dumps(json.load(client_request(f"{args.url}/runs/{args.job_id}/report", token=args.token)),
+                             indent=4, ensure_ascii=False))
+    except (OSError, urllib.error.URLError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+def follow(url, job_id, token=None):
+    """Print a job's lines as NDJSON events arrive, returns 0 when it finished cleanly"""
+    status = None
+    with client_request(f"{url}/runs/{job_id}/events?format=ndjson", token=token) as response:
+        for raw in response:
+            event = json.loads(raw)
+            if event["event"] == "line":
+                print(event["data"]["text"])
+            elif event["event"] == "end":
+                status = event["data"]["status"]
+                print(f"🏁 Job #{job_id} {status}: {event['data']['hits']} hit(s)")
+    return 0 if status == FINISHED else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
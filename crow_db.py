@@ -0,0 +1,25 @@
+# crow_db.py
+import os
+import sqlite3
+
+# Every Crow store (run history, telemetry, indexes...) lives in this one file
+DEFAULT_DB_PATH = os.path.join("results", "crow.db")
+
+def connect(db_path=None):
+    """Open the shared Crow SQLite database, creating the file if needed"""
+    path = db_path or os.environ.get("CROW_DB_PATH") or DEFAULT_DB_PATH
+
+    # Create results directory if it doesn't exist
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    # check_same_thread=False: workers write from QThreads, callers serialise access
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+
+    # WAL lets the GUI read history while a worker is appending to it
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
@@ -0,0 +1,276 @@
+# dump_store.py
+import os
+import sys
+import json
+import gzip
+import time
+import hashlib
+import argparse
+import threading
+
+# zstandard is optional; without it blobs are gzip-compressed. Both formats stay
+# readable as long as the matching module is installed (gzip always is).
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from results_index import belongs_to_run
+
+DEFAULT_RESULTS_DIRECTORY = "results"
+DEFAULT_STORE_DIRECTORY = os.path.join("results", "dump_store")
+DUMP_EXTENSIONS = (".html", ".htm")
+ZSTD_LEVEL = 10
+
+def compress(data):
+    """Compressed blob and its file extension"""
+    if zstandard:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), ".zst"
+    return gzip.compress(data, compresslevel=6), ".gz"
+
+def decompress(blob, extension):
+    if extension == ".zst":
+        if not zstandard:
+            raise RuntimeError("This blob is zstd-compressed - install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+def find_dump_files(results_directory=DEFAULT_RESULTS_DIRECTORY, since=None, exclude=None):
+    """HTML dumps under results_directory, optionally only those modified after since"""
+    exclude = os.path.abspath(exclude) if exclude else None
+    found = []
+    for root, dirs, files in os.walk(results_directory):
+        if exclude and os.path.abspath(root).startswith(exclude):
+            dirs[:] = []
+            continue
+        for name in files:
+            if not name.lower().endswith(DUMP_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            try:
+                if since is None or os.path.getmtime(path) >= since:
+                    found.append(path)
+            except OSError:
+                continue
+    return sorted(found)
+
+class DumpStore:
+    """Content-addressed store for --dump pages: objects/<hash[:2]>/<hash>.zst plus one manifest per run"""
+
+    def __init__(self, directory=DEFAULT_STORE_DIRECTORY):
+        self.directory = directory
+        self.objects_directory = os.path.join(directory, "objects")
+        self.manifests_directory = os.path.join(directory, "manifests")
+
+    def object_path(self, digest):
+        """Existing blob path of a hash (any codec), or None"""
+        for extension in (".zst", ".gz"):
+            path = os.path.join(self.objects_directory, digest[:2], digest + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, data):
+        """Store bytes once, returns (hash, newly_stored, stored_size)"""
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self.object_path(digest)
+        if existing:
+            return digest, False, 0
+        blob, extension = compress(data)
+        directory = os.path.join(self.objects_directory, digest[:2])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, digest + extension)
+        # Write then rename so a crash never leaves a truncated blob behind a valid name
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(temp_path, path)
+        return digest, True, len(blob)
+
+    def get(self, digest):
+        path = self.object_path(digest)
+        if not path:
+            raise KeyError(f"No object {digest}")
+        with open(path, 'rb') as f:
+            return decompress(f.read(), os.path.splitext(path)[1])
+
+    def ingest(self, paths, run_label, base_directory=DEFAULT_RESULTS_DIRECTORY, remove_originals=True):
+        """Move dump files into the store and write the run's manifest"""
+        files = {}
+        stats = {'files': 0, 'unique': 0, 'bytes_in': 0, 'bytes_stored': 0}
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                print(f"Warning: Could not read dump {path}: {e}")
+                continue
+            digest, new, stored = self.put(data)
+            relative = os.path.relpath(path, base_directory)
+            files[relative] = {'hash': digest, 'size': len(data)}
+            stats['files'] += 1
+            stats['bytes_in'] += len(data)
+            if new:
+                stats['unique'] += 1
+                stats['bytes_stored'] += stored
+
+        if not files:
+            return {'success': False, 'error': "No dump files found", **stats}
+
+        manifest = {'run': run_label, 'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+                    'base_directory': base_directory, 'files': files}
+        self.write_manifest(run_label, manifest)
+
+        # Originals go only once the manifest that replaces them is on disk
+        if remove_originals:
+            for relative in files:
+                path = os.path.join(base_directory, relative)
+                try:
+                    os.remove(path)
+                    remove_empty_parents(os.path.dirname(path), base_directory)
+                except OSError as e:
+                    print(f"Warning: Could not remove {path}: {e}")
+        return {'success': True, 'manifest': self.manifest_path(run_label), **stats}
+
+    def manifest_path(self, run_label):
+        return os.path.join(self.manifests_directory, f"{run_label}.json")
+
+    def write_manifest(self, run_label, manifest):
+        os.makedirs(self.manifests_directory, exist_ok=True)
+        path = self.manifest_path(run_label)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=4, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def manifests(self):
+        """Run labels, newest manifest first"""
+        try:
+            names = [name for name in os.listdir(self.manifests_directory) if name.endswith(".json")]
+        except OSError:
+            return []
+        paths = sorted((os.path.join(self.manifests_directory, name) for name in names),
+                       key=os.path.getmtime, reverse=True)
+        return [os.path.splitext(os.path.basename(path))[0] for path in paths]
+
+    def load_manifest(self, run_label):
+        with open(self.manifest_path(run_label), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def read(self, path):
+        """Bytes of a dump by its original path, whether or not it has been moved into the store"""
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+        for run_label in self.manifests():
+            manifest = self.load_manifest(run_label)
+            relative = os.path.relpath(path, manifest.get('base_directory', DEFAULT_RESULTS_DIRECTORY))
+            entry = manifest['files'].get(relative)
+            if entry:
+                return self.get(entry['hash'])
+        raise FileNotFoundError(path)
+
+    def extract(self, run_label, destination):
+        """Restore a run's dumps under destination, returns the number of files"""
+        manifest = self.load_manifest(run_label)
+        for relative, entry in manifest['files'].items():
+            path = os.path.join(destination, relative)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(self.get(entry['hash']))
+        return len(manifest['files'])
+
+    def usage(self):
+        """Logical size of all manifests against the bytes actually on disk"""
+        logical = 0
+        referenced = set()
+        for run_label in self.manifests():
+            for entry in self.load_manifest(run_label)['files'].values():
+                logical += entry['size']
+                referenced.add(entry['hash'])
+        stored = 0
+        for root, _, files in os.walk(self.objects_directory):
+            stored += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return {'manifests': len(self.manifests()), 'objects': len(referenced),
+                'logical_bytes': logical, 'stored_bytes': stored}
+
+def remove_empty_parents(directory, stop):
+    """Remove directory and its parents while empty, never going above stop"""
+    stop = os.path.abspath(stop)
+    directory = os.path.abspath(directory)
+    while directory.startswith(stop) and directory != stop:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
+
+def ingest_run_dumps(run_label, since, results_directory=DEFAULT_RESULTS_DIRECTORY,
+                     store_directory=DEFAULT_STORE_DIRECTORY, targets=None, permute=False):
+    """Post-process the dumps a run wrote after since (a time.time() value)
+
+    targets (see results_index.run_targets) keeps to the run's own dump folders: the
+    pages of runs still going in other tabs are neither claimed nor deleted.
+    """
+    store = DumpStore(store_directory)
+    paths = find_dump_files(results_directory, since, exclude=store_directory)
+    if targets is not None:
+        paths = [path for path in paths if belongs_to_run(path, targets, permute, results_directory)]
+    return store.ingest(paths, run_label, results_directory)
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-addressed storage for Blackbird HTML dumps")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIRECTORY, help="Store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = sub.add_parser("ingest", help="Move existing dumps into the store")
+    ingest_parser.add_argument("--results", default=DEFAULT_RESULTS_DIRECTORY)
+    ingest_parser.add_argument("--label", default=f"import_{time.strftime('%Y%m%d_%H%M%S')}")
+    ingest_parser.add_argument("--keep", action="store_true", help="Keep the original files")
+
+    sub.add_parser("runs", help="List manifests")
+    ls_parser = sub.add_parser("ls", help="List the files of a manifest")
+    ls_parser.add_argument("run")
+    cat_parser = sub.add_parser("cat", help="Print a dump by its original path")
+    cat_parser.add_argument("path")
+    extract_parser = sub.add_parser("extract", help="Restore the dumps of a manifest")
+    extract_parser.add_argument("run")
+    extract_parser.add_argument("destination")
+    sub.add_parser("usage", help="Logical vs stored size")
+
+    args = parser.parse_args(argv)
+    store = DumpStore(args.store)
+
+    if args.command == "ingest":
+        paths = find_dump_files(args.results, exclude=args.store)
+        result = store.ingest(paths, args.label, args.results, remove_originals=not args.keep)
+        if not result['success']:
+            print(f"❌ {result['error']}")
+            return 1
+        print(f"✅ {result['files']} file(s), {result['unique']} new object(s), "
+              f"{format_size(result['bytes_in'])} → {format_size(result['bytes_stored'])}")
+    elif args.command == "runs":
+        for run_label in store.manifests():
+            manifest = store.load_manifest(run_label)
+            print(f"{run_label:<30} {manifest['created']}  {len(manifest['files'])} file(s)")
+    elif args.command == "ls":
+        for relative, entry in sorted(store.load_manifest(args.run)['files'].items()):
+            print(f"{entry['hash'][:12]}  {format_size(entry['size']):>8}  {relative}")
+    elif args.command == "cat":
+        sys.stdout.buffer.write(store.read(args.path))
+    elif args.command == "extract":
+        print(f"✅ Restored {store.extract(args.run, args.destination)} file(s) to {args.destination}")
+    elif args.command == "usage":
+        usage = store.usage()
+        print(f"{usage['manifests']} manifest(s), {usage['objects']} unique page(s), "
+              f"{format_size(usage['logical_bytes'])} logical → {format_size(usage['stored_bytes'])} on disk")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# event_bus.py
+import json
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from metrics import REGISTRY
+
+PROGRESS = "progress"
+RECORD = "record"
+WARNING = "warning"
+METRIC = "metric"
+# Structured results for machine consumers (results feed), never shown as text
+RESULT = "result"
+KINDS = (PROGRESS, RECORD, WARNING, METRIC, RESULT)
+
+DEFAULT_MAXSIZE = 1000
+# How long a producer waits on a full blocking subscriber before the event is dropped
+BACKPRESSURE_TIMEOUT = 2.0
+
+EVENTS_PUBLISHED = REGISTRY.counter(
+    "crow_events_published_total", "Event bus events by source and kind", ["source", "kind"])
+EVENTS_DROPPED = REGISTRY.counter(
+    "crow_events_dropped_total", "Event bus events a full subscriber did not receive", ["source"])
+
+# channel: routing key chosen by the caller (the GUI passes the InvestigationTab of the run)
+Event = namedtuple("Event", "kind source message data channel timestamp")
+
+def event_dict(event):
+    """JSON-friendly form of an event, opaque channels are left out"""
+    result = {'time': event.timestamp, 'kind': event.kind, 'source': event.source, 'message': event.message}
+    if event.data:
+        result['data'] = event.data
+    if isinstance(event.channel, (str, int)):
+        result['channel'] = event.channel
+    return result
+
+class Subscription:
+    """Bounded queue of events for one consumer
+
+    A blocking subscription slows producers down when it is full (up to
+    BACKPRESSURE_TIMEOUT per event); a lossy one drops its oldest event instead.
+    on_full lets a consumer that also publishes (the GUI thread running a hook)
+    drain inline, since it can never wait for itself.
+    """
+
+    def __init__(self, bus, kinds=None, maxsize=DEFAULT_MAXSIZE, block=True, on_full=None):
+        self.bus = bus
+        self.kinds = frozenset(kinds) if kinds else None
+        self.queue = queue.Queue(maxsize)
+        self.block = block
+        self.on_full = on_full
+        self.consumer_thread = threading.get_ident()
+        self.lock = threading.Lock()
+        self.dropped = 0
+        self.closed = False
+
+    def offer(self, event):
+        """Queue an event for this consumer, False when it was filtered out or dropped"""
+        if self.kinds is not None and event.kind not in self.kinds:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            pass
+
+        if self.on_full and threading.get_ident() == self.consumer_thread:
+            self.on_full()
+        elif self.block:
+            try:
+                self.queue.put(event, timeout=BACKPRESSURE_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        else:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            with self.lock:
+                self.dropped += 1
+            EVENTS_DROPPED.inc(source=event.source)
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            EVENTS_DROPPED.inc(source=event.source)
+            return False
+
+    def get(self, timeout=None):
+        """Next event, None after timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self, max_items=None):
+        """Events already queued, without waiting"""
+        events = []
+        while max_items is None or len(events) < max_items:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def take_dropped(self):
+        """Events dropped since the last call"""
+        with self.lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def close(self):
+        self.closed = True
+        self.bus.unsubscribe(self)
+
+class EventBus:
+    """Thread-safe fan-out of progress/record/warning/metric/result events to subscribers"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = []
+
+    def subscribe(self, kinds=None, maxsize=DEFAULT_MAXSIZE, block=True, on_full=None):
+        subscription = Subscription(self, kinds, maxsize, block, on_full)
+        with self.lock:
+            self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions = [s for s in self.subscriptions if s is not subscription]
+
+    def has_subscribers(self):
+        return bool(self.subscriptions)
+
+    def publish(self, kind, source, message="", channel=None, **data):
+        """Send an event to every subscriber, returns how many received it"""
+        event = Event(kind, source, message, data or None, channel, time.time())
+        EVENTS_PUBLISHED.inc(source=source, kind=kind)
+        # The list is replaced, never mutated, so it can be read without the lock
+        return sum(subscription.offer(event) for subscription in self.subscriptions)
+
+BUS = EventBus()
+
+class Publisher:
+    """What a module holds instead of an output widget: its source name and the caller's channel"""
+
+    def __init__(self, source, channel=None, bus=None):
+        self.source = source
+        self.channel = channel
+        self.bus = bus or BUS
+
+    def progress(self, message, **data):
+        return self.bus.publish(PROGRESS, self.source, message, self.channel, **data)
+
+    def record(self, message, **data):
+        return self.bus.publish(RECORD, self.source, message, self.channel, **data)
+
+    def warning(self, message, **data):
+        return self.bus.publish(WARNING, self.source, message, self.channel, **data)
+
+    def metric(self, name, **data):
+        return self.bus.publish(METRIC, self.source, name, self.channel, **data)
+
+    def result(self, name, **data):
+        return self.bus.publish(RESULT, self.source, name, self.channel, **data)
+
+class ThreadedSink:
+    """Hands every event to handle() on a daemon thread of its own"""
+
+    def __init__(self, bus=None, kinds=None, maxsize=DEFAULT_MAXSIZE, name="event-sink"):
+        self.subscription = (bus or BUS).subscribe(kinds, maxsize)
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not (self.subscription.closed and self.subscription.queue.empty()):
+            event = self.subscription.get(timeout=0.5)
+            if event is None:
+                continue
+            try:
+                self.handle(event)
+            except Exception as e:
+                print(f"Warning: Event sink {self.thread.name} failed: {e}")
+
+    def handle(self, event):
+        raise NotImplementedError
+
+    def close(self, timeout=5):
+        """Stop receiving, deliver what is queued, then stop the thread"""
+        self.subscription.close()
+        self.thread.join(timeout)
+
+class ConsoleSink(ThreadedSink):
+    """Prints messages, for headless runs; metric events are left to the metrics exporters"""
+
+    def __init__(self, bus=None, maxsize=DEFAULT_MAXSIZE):
+        super().__init__(bus, (PROGRESS, RECORD, WARNING), maxsize, name="console-sink")
+
+    def handle(self, event):
+        print(event.message, flush=True)
+
+class FileSink(ThreadedSink):
+    """Appends every event to a newline-delimited JSON file"""
+
+    def __init__(self, path, bus=None, maxsize=DEFAULT_MAXSIZE):
+        self.file = open(path, 'a', encoding='utf-8')
+        super().__init__(bus, None, maxsize, name="file-sink")
+
+    def handle(self, event):
+        self.file.write(json.dumps(event_dict(event), ensure_ascii=False, default=str) + "\n")
+        if self.subscription.queue.empty():
+            self.file.flush()
+
+    def close(self, timeout=5):
+        super().close(timeout)
+        self.file.close()
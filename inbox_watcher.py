@@ -0,0 +1,358 @@
+# inbox_watcher.py
+import os
+import sys
+import json
+import time
+import shutil
+import select
+import hashlib
+import argparse
+import threading
+import ctypes
+import ctypes.util
+
+from crow_db import connect
+from run_queue import RunQueue, QUEUED
+from run_history import format_timestamp
+from target_preflight import analyze_file, write_entries, EMAIL_REGEX
+from build_blackbird_command import complete_settings
+
+DEFAULT_PROFILE_DIRECTORY = "profiles"
+# A file must be untouched this long before it is picked up (still being copied otherwise)
+SETTLE_SECONDS = 2.0
+DEFAULT_REPORT_INTERVAL = 60
+KIND_SAMPLE_ROWS = 200
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inbox_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    status TEXT NOT NULL,
+    profile TEXT,
+    kind TEXT,
+    entries INTEGER DEFAULT 0,
+    invalid INTEGER DEFAULT 0,
+    duplicates INTEGER DEFAULT 0,
+    job_id INTEGER,
+    error TEXT,
+    processed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_inbox_files_sha256 ON inbox_files(sha256);
+CREATE INDEX IF NOT EXISTS idx_inbox_files_processed_at ON inbox_files(processed_at);
+"""
+
+class Inotify:
+    """Minimal inotify binding: tells when files are written or moved into one directory"""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Could not watch {directory}")
+
+    def wait(self, timeout):
+        """True when events arrived within timeout; the events themselves are drained unread"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+def load_profile(name, directory=DEFAULT_PROFILE_DIRECTORY):
+    """Settings of a named profile (profiles/<name>.json) or of a settings file path
+
+    Keys the profile leaves out get their GUI default, so a queued job never picks up
+    whatever the form holds when it starts. A missing "default" profile means all defaults.
+    """
+    path = name if os.path.exists(name) else os.path.join(directory, f"{name}.json")
+    if name == "default" and not os.path.exists(path):
+        return complete_settings({})
+    with open(path, 'r', encoding='utf-8') as f:
+        return complete_settings(json.load(f))
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def detect_kind(path):
+    """'email' or 'username': the file name decides when it says so, else the first rows"""
+    name = os.path.basename(path).lower()
+    if "email" in name or "mail" in name:
+        return "email"
+    if "user" in name:
+        return "username"
+    emails = rows = 0
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rows += 1
+            emails += bool(EMAIL_REGEX.match(line))
+            if rows >= KIND_SAMPLE_ROWS:
+                break
+    return "email" if rows and emails * 2 >= rows else "username"
+
+def unique_destination(directory, name):
+    """Path in directory for name, prefixed with a timestamp when the name is taken"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    if os.path.exists(path):
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d_%H%M%S')}_{name}")
+    return path
+
+class InboxWatcher:
+    """Turns .txt target files dropped into an inbox into queued runs"""
+
+    def __init__(self, inbox, profile_name, settings, submit, db_path=None):
+        self.inbox = inbox
+        self.processed_directory = os.path.join(inbox, "processed")
+        self.failed_directory = os.path.join(inbox, "failed")
+        self.profile_name = profile_name
+        self.settings = settings
+        # submit(settings, label) queues a run and returns its job id
+        self.submit = submit
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.executescript(SCHEMA)
+        self.started_at = time.time()
+        self.totals = {'files': 0, 'entries': 0, 'failed': 0, 'duplicates': 0}
+
+    def pending_files(self, settled_only=True):
+        """Target files waiting in the inbox, oldest first"""
+        now = time.time()
+        files = []
+        try:
+            names = os.listdir(self.inbox)
+        except OSError as e:
+            print(f"Warning: Could not list inbox {self.inbox}: {e}")
+            return []
+        for name in names:
+            path = os.path.join(self.inbox, name)
+            if not name.lower().endswith(".txt") or not os.path.isfile(path):
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if not settled_only or now - mtime >= SETTLE_SECONDS:
+                files.append((mtime, path))
+        return [path for _, path in sorted(files)]
+
+    def already_queued(self, sha256):
+        with self.lock:
+            row = self.conn.execute("SELECT job_id FROM inbox_files WHERE sha256 = ? AND status = 'queued'",
+                                    (sha256,)).fetchone()
+        return row
+
+    def record(self, name, sha256, status, kind=None, analysis=None, job_id=None, error=None):
+        analysis = analysis or {}
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO inbox_files (name, sha256, status, profile, kind, entries, invalid, duplicates, "
+                "job_id, error, processed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, sha256, status, self.profile_name, kind, analysis.get('unique', 0),
+                 analysis.get('invalid', 0), analysis.get('duplicates', 0), job_id, error, time.time()))
+
+    def fail(self, path, sha256, error, kind=None, analysis=None):
+        name = os.path.basename(path)
+        destination = unique_destination(self.failed_directory, name)
+        shutil.move(path, destination)
+        with open(destination + ".error", 'w', encoding='utf-8') as f:
+            f.write(error + "\n")
+        self.record(name, sha256, "failed", kind, analysis, error=error)
+        self.totals['failed'] += 1
+        print(f"❌ {name}: {error}")
+        return {'success': False, 'error': error}
+
+    def process_file(self, path):
+        """Validate, dedupe and queue one file, then move it to processed/ or failed/"""
+        name = os.path.basename(path)
+        try:
+            sha256 = file_sha256(path)
+        except OSError as e:
+            print(f"Warning: Could not read {path}: {e}")
+            return {'success': False, 'error': str(e)}
+
+        existing = self.already_queued(sha256)
+        if existing:
+            shutil.move(path, unique_destination(self.processed_directory, name))
+            self.record(name, sha256, "duplicate", job_id=existing[0])
+            self.totals['duplicates'] += 1
+            print(f"⏭️  {name}: same content already queued as job #{existing[0]}")
+            return {'success': True, 'duplicate': True}
+
+        kind = detect_kind(path)
+        analysis = analyze_file(path, kind)
+        if not analysis['success']:
+            return self.fail(path, sha256, analysis['error'], kind)
+        if not analysis['entries']:
+            return self.fail(path, sha256, f"No valid {kind}s ({analysis['invalid']} invalid row(s))",
+                             kind, analysis)
+
+        # The run reads the deduplicated copy, kept next to the processed original
+        destination = unique_destination(self.processed_directory, name)
+        shutil.move(path, destination)
+        target_path = write_entries(analysis['entries'], os.path.splitext(destination)[0] + ".dedup.txt")
+        settings = dict(self.settings)
+        settings["username_input"] = f"file:{os.path.abspath(target_path)}" if kind == "username" else ""
+        settings["email_input"] = f"file:{os.path.abspath(target_path)}" if kind == "email" else ""
+        try:
+            job_id = self.submit(settings, f"{self.profile_name}: {name}")
+        except Exception as e:
+            shutil.move(destination, path)
+            os.remove(target_path)
+            print(f"⚠️  {name}: could not queue the run, will retry: {e}")
+            return {'success': False, 'error': str(e)}
+
+        self.record(name, sha256, "queued", kind, analysis, job_id=job_id)
+        self.totals['files'] += 1
+        self.totals['entries'] += analysis['unique']
+        print(f"📥 {name}: {analysis['unique']} {kind}(s) queued as job #{job_id} "
+              f"({analysis['invalid']} invalid, {analysis['duplicates']} duplicate)")
+        return {'success': True, 'job_id': job_id}
+
+    def scan(self):
+        """Process every settled file, returns how many were handled"""
+        handled = 0
+        for path in self.pending_files():
+            self.process_file(path)
+            handled += 1
+        return handled
+
+    def report(self, backlog_jobs=None):
+        """Throughput since start and the current backlog"""
+        minutes = max((time.time() - self.started_at) / 60, 1 / 60)
+        backlog_files = len(self.pending_files(settled_only=False))
+        jobs = f", {backlog_jobs} run(s) waiting" if backlog_jobs is not None else ""
+        return (f"📊 {self.totals['files']} file(s) / {self.totals['entries']} target(s) queued "
+                f"({self.totals['files'] / minutes:.1f} files/min, {self.totals['entries'] / minutes:.0f} "
+                f"targets/min), {self.totals['failed']} failed, {self.totals['duplicates']} duplicate; "
+                f"backlog: {backlog_files} file(s) in inbox{jobs}")
+
+    def watch(self, backlog=None, poll=False, interval=SETTLE_SECONDS, report_interval=DEFAULT_REPORT_INTERVAL,
+              stop_event=None):
+        """Process files as they arrive until stop_event is set (or forever)"""
+        stop_event = stop_event or threading.Event()
+        notifier = None
+        if not poll:
+            try:
+                notifier = Inotify(self.inbox)
+            except (OSError, AttributeError) as e:
+                print(f"ℹ️  inotify unavailable ({e}), polling every {interval:.0f}s")
+        print(f"👀 Watching {self.inbox} ({'inotify' if notifier else 'polling'}, profile {self.profile_name})")
+
+        last_report = time.time()
+        try:
+            while not stop_event.is_set():
+                self.scan()
+                # Unsettled files are looked at again after interval even without new events
+                if notifier:
+                    notifier.wait(interval)
+                else:
+                    stop_event.wait(interval)
+                if time.time() - last_report >= report_interval:
+                    last_report = time.time()
+                    print(self.report(backlog() if backlog else None))
+        finally:
+            if notifier:
+                notifier.close()
+
+def queue_submitter(run_queue):
+    """Submit to the GUI's persistent run queue"""
+    return lambda settings, label: run_queue.enqueue(settings, label)
+
+def daemon_submitter(url, token=None):
+    """Submit to a running crow_daemon.py"""
+    from crow_daemon import client_request
+
+    def submit(settings, label):
+        return json.load(client_request(f"{url}/runs", "POST", {"settings": settings, "label": label}, token))["id"]
+    return submit
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Queue runs for target files dropped into an inbox directory")
+    parser.add_argument("--db", help="Path to the Crow database (default: results/crow.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for command in ("watch", "once"):
+        command_parser = sub.add_parser(command, help="Watch the inbox" if command == "watch"
+                                        else "Process the files in the inbox and exit")
+        command_parser.add_argument("inbox")
+        command_parser.add_argument("--profile", default="default",
+                                    help="Settings profile: profiles/<name>.json or a settings file")
+        command_parser.add_argument("--daemon", help="Submit to crow_daemon.py at this URL instead of the run queue")
+        command_parser.add_argument("--token", default=os.environ.get("CROW_DAEMON_TOKEN"))
+        if command == "watch":
+            command_parser.add_argument("--poll", action="store_true", help="Poll instead of using inotify")
+            command_parser.add_argument("--interval", type=float, default=SETTLE_SECONDS)
+            command_parser.add_argument("--report-interval", type=float, default=DEFAULT_REPORT_INTERVAL)
+    history_parser = sub.add_parser("history", help="Recently processed files")
+    history_parser.add_argument("-n", "--limit", type=int, default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "history":
+        conn = connect(args.db)
+        conn.executescript(SCHEMA)
+        for row in conn.execute("SELECT * FROM inbox_files ORDER BY id DESC LIMIT ?", (args.limit,)):
+            job = f"job #{row['job_id']}" if row['job_id'] else row['error'] or ""
+            print(f"{format_timestamp(row['processed_at'])}  {row['status']:<9} {row['entries']:>6} "
+                  f"{row['kind'] or '-':<8} {row['name']}  {job}")
+        return 0
+
+    try:
+        settings = load_profile(args.profile)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Could not load profile {args.profile}: {e}")
+        return 1
+    os.makedirs(args.inbox, exist_ok=True)
+
+    if args.daemon:
+        from crow_daemon import unsupported_settings
+        unsupported = unsupported_settings(settings)
+        if unsupported:
+            print(f"❌ Profile {args.profile} uses options the daemon does not support: {', '.join(unsupported)}")
+            return 1
+        submit = daemon_submitter(args.daemon, args.token)
+        backlog = None
+    else:
+        run_queue = RunQueue(args.db)
+        submit = queue_submitter(run_queue)
+        backlog = lambda: run_queue.counts().get(QUEUED, 0)
+    watcher = InboxWatcher(args.inbox, args.profile, settings, submit, args.db)
+
+    if args.command == "once":
+        watcher.scan()
+        print(watcher.report(backlog() if backlog else None))
+        return 0
+    try:
+        watcher.watch(backlog, args.poll, args.interval, args.report_interval)
+    except KeyboardInterrupt:
+        print(watcher.report(backlog() if backlog else None))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+# investigation_tab.py
+import re
+import time
+
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QCheckBox,
+                             QPushButton, QPlainTextEdit)
+from PyQt6.QtGui import QTextCursor, QTextDocument
+from PyQt6.QtCore import QTimer
+
+from blackbird_output import HIT, MISS, ERROR
+from output_view import OutputView
+
+class InvestigationTab(QWidget):
+    """One investigation: its output view, worker, live counters and settings snapshot"""
+
+    def __init__(self, title, settings=None, parent=None):
+        super().__init__(parent)
+        self.title = title
+        # Frozen collect_settings() snapshot taken when the run was launched
+        self.settings = settings or {}
+        self.worker = None
+        # Every worker of the investigation (main scan, AI pass...), their run logs are searched
+        self.workers = []
+        # Search hits as (worker index, line number in its run log), and the selected one
+        self.search_key = None
+        self.search_matches = []
+        self.search_position = -1
+        # Set once the tab is closed; late messages of its worker go to the Log tab
+        self.closed = False
+        # Per-investigation AI report state (see BlackbirdGUI.update_output)
+        self.ai_results_buffer = []
+        self.ai_results_started = False
+        self.pending_ai_cache_key = None
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        status_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        layout.addLayout(status_layout)
+        self.output_area = OutputView()
+        layout.addWidget(self.output_area)
+
+        # Search over the full run logs, answered from the index the workers build
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search the full run log")
+        self.search_input.returnPressed.connect(lambda: self.step_search(1))
+        search_layout.addWidget(self.search_input)
+        self.search_regex_checkbox = QCheckBox("Regex")
+        search_layout.addWidget(self.search_regex_checkbox)
+        previous_button = QPushButton("◀")
+        previous_button.setFixedWidth(30)
+        previous_button.clicked.connect(lambda: self.step_search(-1))
+        search_layout.addWidget(previous_button)
+        next_button = QPushButton("▶")
+        next_button.setFixedWidth(30)
+        next_button.clicked.connect(lambda: self.step_search(1))
+        search_layout.addWidget(next_button)
+        self.search_label = QLabel()
+        search_layout.addWidget(self.search_label)
+        layout.addLayout(search_layout)
+
+        # Lines around the selected hit, read back from the run log
+        self.search_context = QPlainTextEdit()
+        self.search_context.setReadOnly(True)
+        self.search_context.setMaximumHeight(110)
+        self.search_context.hide()
+        layout.addWidget(self.search_context)
+        self.setLayout(layout)
+
+        self.status_timer = QTimer(self)
+        self.status_timer.setInterval(1000)
+        self.status_timer.timeout.connect(self.refresh_status)
+        self.refresh_status()
+
+    def target_text(self, key):
+        return str(self.settings.get(key) or "").strip()
+
+    def attach_worker(self, worker):
+        """Follow a new worker of this investigation (main scan, then e.g. the AI pass)"""
+        self.worker = worker
+        self.workers.append(worker)
+        worker.tab = self
+        worker.finished.connect(self.refresh_status)
+        self.status_timer.start()
+        self.refresh_status()
+
+    def restore_runs(self, runs):
+        """Show runs of a previous session (session_snapshot.RestoredRun), searchable like live ones"""
+        self.workers = list(runs)
+        self.worker = self.workers[-1]
+        self.refresh_status()
+
+    def is_running(self):
+        return bool(self.worker and self.worker.isRunning())
+
+    def stop(self):
+        if self.is_running():
+            self.worker.terminate()
+            self.worker.wait()
+        self.refresh_status()
+
+    def refresh_status(self):
+        worker = self.worker
+        if not worker:
+            self.status_label.setText("Idle")
+            return
+        if worker.isRunning():
+            state = "Running"
+        else:
+            state = "Stopped" if worker.stopped else "Finished"
+            if getattr(worker, 'restored', False):
+                state = f"Restored · {state}"
+            self.status_timer.stop()
+        elapsed = ((worker.finished_at or time.time()) - worker.started_at) if worker.started_at else 0
+        self.status_label.setText(
+            f"{state} · {elapsed:.0f}s · hits {worker.stats[HIT]} · misses {worker.stats[MISS]} · "
+            f"errors {worker.stats[ERROR]}")
+
+    def run_searches(self, query, regex):
+        """Matches over the run logs of every worker, in run order"""
+        matches = []
+        for number, worker in enumerate(self.workers):
+            if worker.run_log:
+                matches.extend((number, line) for line in worker.run_log.search(query, regex))
+        return matches
+
+    def step_search(self, step):
+        """Go to the next (step=1) or previous (step=-1) hit, searching again when the query changed"""
+        query = self.search_input.text()
+        if not query:
+            self.search_label.setText("")
+            self.search_context.hide()
+            return
+        regex = self.search_regex_checkbox.isChecked()
+        # Lines keep arriving while a run is live, so a running tab always searches again
+        key = (query, regex)
+        if key != self.search_key or self.is_running():
+            try:
+                matches = self.run_searches(query, regex)
+            except re.error as e:
+                self.search_label.setText(f"Invalid regex: {e}")
+                self.search_context.hide()
+                return
+            if key != self.search_key:
+                self.search_position = -1 if step > 0 else len(matches)
+            self.search_key = key
+            self.search_matches = matches
+        if not self.search_matches:
+            self.search_label.setText("No matches")
+            self.search_context.hide()
+            return
+
+        self.search_position = (self.search_position + step) % len(self.search_matches)
+        self.show_search_match(*self.search_matches[self.search_position])
+
+    def count_later_copies(self, worker_number, line, text):
+        """Log lines identical to text after line, in this run and the tab's later runs"""
+        count = 0
+        for number in range(worker_number, len(self.workers)):
+            run_log = self.workers[number].run_log
+            if not run_log:
+                continue
+            for match in run_log.search(text):
+                if (number > worker_number or match > line) and run_log.read_lines(match, match + 1) == [text]:
+                    count += 1
+        return count
+
+    def find_output_line(self, text, skip):
+        """Cursor in the output view on the block equal to text, skipping the last skip such
+        blocks; counted from the end because a restored tab only shows the tail of each log"""
+        document = self.output_area.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        while True:
+            cursor = document.find(text, cursor, QTextDocument.FindFlag.FindBackward)
+            if cursor.isNull():
+                return cursor
+            if cursor.block().text() == text:
+                if skip == 0:
+                    return cursor
+                skip -= 1
+            # Search on before the start of this block
+            cursor.setPosition(cursor.block().position())
+
+    def show_search_match(self, worker_number, line):
+        run_log = self.workers[worker_number].run_log
+        first = max(0, line - 2)
+        lines = run_log.read_lines(first, line + 3)
+        self.search_label.setText(f"{self.search_position + 1}/{len(self.search_matches)} · "
+                                  f"line {line + 1}")
+        self.search_context.setPlainText("\n".join(
+            ("▶ " if first + offset == line else "  ") + text for offset, text in enumerate(lines)))
+        self.search_context.show()
+
+        # Select the line in the output view too, when it was displayed there
+        text = lines[line - first] if line - first < len(lines) else ""
+        self.output_area.flush()
+        cursor = self.find_output_line(text, self.count_later_copies(worker_number, line, text)) if text else QTextCursor()
+        if cursor.isNull():
+            cursor = self.output_area.textCursor()
+            cursor.clearSelection()
+            self.output_area.setTextCursor(cursor)
+            return
+        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        self.output_area.setTextCursor(cursor)
+        self.output_area.ensureCursorVisible()
@@ -4,6 +4,48 @@ import json
 import os
 from PyQt6.QtWidgets import QFileDialog
 
+def apply_settings(gui_instance, settings):
+    """Put a settings dict (saved file format) into the GUI widgets"""
+    # Define a mapping of setting keys to widget methods and types
+    setting_mappings = {
+        "username_input": (gui_instance.username_input.setText, str),
+        # "username_file_input": (gui_instance.username_file_input.setText, str),
+        "email_input": (gui_instance.email_input.setText, str),
+        # "hudson_email_input": (gui_instance.hudson_email_input.setText, str),
+        # "email_file_input": (gui_instance.email_file_input.setText, str),
+        # "breach_email_file_input": (gui_instance.breach_email_file_input.setText, str),
+        "tor_checkbox": (gui_instance.tor_checkbox.setChecked, bool),
+        "permute_checkbox": (gui_instance.permute_checkbox.setChecked, bool),
+        "enable_breach_username_checkbox": (gui_instance.enable_breach_username_checkbox.setChecked, bool),
+        "enable_breach_email_checkbox": (gui_instance.enable_breach_email_checkbox.setChecked, bool),
+        "permuteall_checkbox": (gui_instance.permuteall_checkbox.setChecked, bool),
+        "no_nsfw_checkbox": (gui_instance.no_nsfw_checkbox.setChecked, bool),
+        "proxy_input": (gui_instance.proxy_input.setText, str),
+        "timeout_spinbox": (gui_instance.timeout_spinbox.setValue, int),
+        "net_total_slots": (gui_instance.net_total_spinbox.setValue, int),
+        "net_weights": (gui_instance.net_weights_input.setText, str),
+        "no_update_checkbox": (gui_instance.no_update_checkbox.setChecked, bool),
+        "diff_checkbox": (gui_instance.diff_checkbox.setChecked, bool),
+        "two_pass_checkbox": (gui_instance.two_pass_checkbox.setChecked, bool),
+        "two_pass_top_n": (gui_instance.two_pass_top_n_spinbox.setValue, int),
+        "csv_checkbox": (gui_instance.csv_checkbox.setChecked, bool),
+        "pdf_checkbox": (gui_instance.pdf_checkbox.setChecked, bool),
+        "json_checkbox": (gui_instance.json_checkbox.setChecked, bool),
+        "verbose_checkbox": (gui_instance.verbose_checkbox.setChecked, bool),
+        "dump_checkbox": (gui_instance.dump_checkbox.setChecked, bool),
+        "display_level": (lambda level: gui_instance.display_level_combo.setCurrentIndex(
+            gui_instance.display_level_combo.findData(level)), int),
+        "instagram_session_id": (gui_instance.instagram_session_id.setText, str),
+        "AI_checkbox": (gui_instance.AI_checkbox.setChecked, bool),
+        "ai_second_pass_checkbox": (gui_instance.ai_second_pass_checkbox.setChecked, bool),
+        "filter": (gui_instance.filter_input.setText, str)
+    }
+
+    # Apply the loaded settings
+    for key, (set_method, value_type) in setting_mappings.items():
+        if key in settings:
+            set_method(value_type(settings[key]))
+
 def load_settings(gui_instance):
     # Open a file dialog to select a JSON file to load
     file_name, _ = QFileDialog.getOpenFileName(gui_instance, "Open Settings", "", "JSON Files (*.json);;All Files (*)")
@@ -12,37 +54,10 @@ def load_settings(gui_instance):
         with open(file_name, 'r') as f:
             settings = json.load(f)
 
-        # Define a mapping of setting keys to widget methods and types
-        setting_mappings = {
-            "username_input": (gui_instance.username_input.setText, str),
-            # "username_file_input": (gui_instance.username_file_input.setText, str),
-            "email_input": (gui_instance.email_input.setText, str),
-            # "hudson_email_input": (gui_instance.hudson_email_input.setText, str),
-            # "email_file_input": (gui_instance.email_file_input.setText, str),
-            # "breach_email_file_input": (gui_instance.breach_email_file_input.setText, str),
-            "tor_checkbox": (gui_instance.tor_checkbox.setChecked, bool),
-            "permute_checkbox": (gui_instance.permute_checkbox.setChecked, bool),
-            "enable_breach_username_checkbox": (gui_instance.enable_breach_username_checkbox.setChecked, bool),
-            "enable_breach_email_checkbox": (gui_instance.enable_breach_email_checkbox.setChecked, bool),
-            "permuteall_checkbox": (gui_instance.permuteall_checkbox.setChecked, bool),
-            "no_nsfw_checkbox": (gui_instance.no_nsfw_checkbox.setChecked, bool),
-            "proxy_input": (gui_instance.proxy_input.setText, str),
-            "timeout_spinbox": (gui_instance.timeout_spinbox.setValue, int),
-            "no_update_checkbox": (gui_instance.no_update_checkbox.setChecked, bool),
-            "csv_checkbox": (gui_instance.csv_checkbox.setChecked, bool),
-            "pdf_checkbox": (gui_instance.pdf_checkbox.setChecked, bool),
-            "json_checkbox": (gui_instance.json_checkbox.setChecked, bool),
-            "verbose_checkbox": (gui_instance.verbose_checkbox.setChecked, bool),
-            "dump_checkbox": (gui_instance.dump_checkbox.setChecked, bool),
-            "instagram_session_id": (gui_instance.instagram_session_id.setText, str),
-            "AI_checkbox": (gui_instance.AI_checkbox.setChecked, bool),
-            "filter": (gui_instance.filter_input.setText, str)
-        }
+        apply_settings(gui_instance, settings)
 
-        # Apply the loaded settings
-        for key, (set_method, value_type) in setting_mappings.items():
-            if key in settings:
-                set_method(value_type(settings[key]))
+        # setText does not emit editingFinished, push the network budget explicitly
+        gui_instance.apply_network_budget()
 
         # Special handling for ai_api_key
         if "ai_api_key" in settings and settings["ai_api_key"]:
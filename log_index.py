@@ -0,0 +1,220 @@
+# log_index.py
+import os
+import re
+import zlib
+import struct
+import bisect
+import threading
+from array import array
+from contextlib import nullcontext
+
+TOKEN_REGEX = re.compile(r"\w+")
+# Above this share of candidate lines a straight scan of the spool is cheaper than seeking
+SCAN_RATIO = 0.25
+# Saved index files: magic, then zlib-compressed header, offsets and postings
+INDEX_MAGIC = b"CROWIDX1"
+INDEX_HEADER = struct.Struct("<qII")
+TOKEN_HEADER = struct.Struct("<II")
+
+def text_literals(query):
+    """Words of a plain-text query, each must occur inside one token of a matching line"""
+    return [token.casefold() for token in TOKEN_REGEX.findall(query)]
+
+def regex_literals(pattern):
+    """Word runs every match of pattern must contain, [] when that cannot be told cheaply"""
+    literals = []
+    current = ""
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            following = pattern[index + 1:index + 2]
+            if following in ("x", "u", "U", "N") or following.isdigit():
+                # \x58, \u00e9, \N{...}, octal escapes and backreferences stand for characters
+                # the pattern does not spell out, so nothing can be required
+                return []
+            # \d, \b, \. ...: never part of a word run
+            literals.append(current)
+            current = ""
+            index += 2
+            continue
+        if char in "|(":
+            # Alternation and groups can make any literal optional
+            return []
+        if char == "[":
+            # A character class is one unknown character
+            literals.append(current)
+            current = ""
+            index += 1
+            if pattern[index:index + 1] == "^":
+                index += 1
+            # A ] right after [ or [^ is a literal one
+            if pattern[index:index + 1] == "]":
+                index += 1
+            while index < len(pattern) and pattern[index] != "]":
+                # \] inside the class does not close it
+                index += 2 if pattern[index] == "\\" else 1
+            index += 1
+            continue
+        if char in "?*{":
+            # The previous character is optional
+            literals.append(current[:-1])
+            current = ""
+            if char == "{":
+                closing = pattern.find("}", index)
+                index = closing if closing != -1 else index
+        elif char == "+":
+            literals.append(current)
+            current = ""
+        elif TOKEN_REGEX.match(char):
+            current += char
+        else:
+            literals.append(current)
+            current = ""
+        index += 1
+    literals.append(current)
+    return [literal.casefold() for literal in literals if literal]
+
+def compile_query(query, regex=False):
+    """Line predicate for a query (case-insensitive), raises re.error for a bad pattern"""
+    if regex:
+        return re.compile(query, re.IGNORECASE).search
+    needle = query.casefold()
+    return lambda line: needle in line.casefold()
+
+class LogIndex:
+    """Token -> line numbers of a run log spool, filled by the worker as lines are written"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Byte offset of every line in the spool
+        self.offsets = array('q')
+        # End offset of the last line
+        self.end = 0
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def add(self, offset, length, text):
+        """Index a line of length bytes written at offset"""
+        tokens = {token.casefold() for token in TOKEN_REGEX.findall(text)}
+        with self.lock:
+            line = len(self.offsets)
+            self.offsets.append(offset)
+            self.end = offset + length
+            for token in tokens:
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = array('I')
+                postings.append(line)
+
+    def candidate_lines(self, literals):
+        """Sorted lines holding every literal inside a token, None when the index cannot narrow"""
+        if not literals:
+            return None
+        with self.lock:
+            vocabulary = list(self.postings)
+            result = None
+            for literal in literals:
+                lines = set()
+                for token in vocabulary:
+                    if literal in token:
+                        lines.update(self.postings[token])
+                result = lines if result is None else result & lines
+                if not result:
+                    break
+        return sorted(result or ())
+
+    def search(self, path, query, regex=False, spool=None):
+        """Line numbers of the spool at path matching query, only lines already on disk
+
+        spool: the file already open (e.g. memory-mapped) to read instead of path
+        """
+        matches = compile_query(query, regex)
+        literals = regex_literals(query) if regex else text_literals(query)
+        if spool is not None:
+            size = len(spool)
+        else:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                return []
+        with self.lock:
+            offsets = self.offsets[:]
+            end = self.end
+        # Lines still (even partly) in the writer's buffer are not readable yet
+        if end <= size:
+            available = len(offsets)
+        else:
+            available = max(0, bisect.bisect_right(offsets, size) - 1)
+
+        candidates = self.candidate_lines(literals)
+        if candidates is not None:
+            candidates = [line for line in candidates if line < available]
+        found = []
+        with open(path, 'rb') if spool is None else nullcontext(spool) as f:
+            if candidates is None or len(candidates) > available * SCAN_RATIO:
+                f.seek(offsets[0] if available else 0)
+                for line in range(available):
+                    text = f.readline().decode('utf-8', errors='replace')
+                    if matches(text.rstrip("\n")):
+                        found.append(line)
+            else:
+                for line in candidates:
+                    f.seek(offsets[line])
+                    if matches(f.readline().decode('utf-8', errors='replace').rstrip("\n")):
+                        found.append(line)
+        return found
+
+    def read_lines(self, path, start, end, spool=None):
+        """Lines start..end-1 of the spool"""
+        with self.lock:
+            offsets = self.offsets[max(0, start):end]
+        lines = []
+        with open(path, 'rb') if spool is None else nullcontext(spool) as f:
+            for offset in offsets:
+                f.seek(offset)
+                lines.append(f.readline().decode('utf-8', errors='replace').rstrip("\n"))
+        return lines
+
+    def save(self, path):
+        """Write the index to path (atomically), compact enough to keep per session"""
+        with self.lock:
+            parts = [INDEX_HEADER.pack(self.end, len(self.offsets), len(self.postings)), self.offsets.tobytes()]
+            for token, postings in self.postings.items():
+                encoded = token.encode('utf-8')
+                parts.append(TOKEN_HEADER.pack(len(encoded), len(postings)))
+                parts.append(encoded)
+                parts.append(postings.tobytes())
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(zlib.compress(b"".join(parts), 1))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Index saved by save(), raises ValueError for a file that is not one"""
+        with open(path, 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"{path} is not a log index")
+            try:
+                data = zlib.decompress(f.read())
+            except zlib.error as e:
+                raise ValueError(f"{path} is corrupt: {e}")
+        index = cls()
+        index.end, lines, tokens = INDEX_HEADER.unpack_from(data)
+        position = INDEX_HEADER.size
+        index.offsets.frombytes(data[position:position + lines * 8])
+        position += lines * 8
+        for _ in range(tokens):
+            length, count = TOKEN_HEADER.unpack_from(data, position)
+            position += TOKEN_HEADER.size
+            token = data[position:position + length].decode('utf-8')
+            position += length
+            postings = array('I')
+            postings.frombytes(data[position:position + count * 4])
+            position += count * 4
+            index.postings[token] = postings
+        return index
@@ -0,0 +1,279 @@
+# metrics.py
+import os
+import time
+import atexit
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DEFAULT_TEXTFILE_INTERVAL = 15
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_float(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def format_labels(labelnames, labelvalues, extra=None):
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    """A named metric with optional labels, one value (or histogram) per label combination"""
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self):
+        lines = self.header()
+        with self.lock:
+            items = sorted(self.values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{format_labels(self.labelnames, labelvalues)} {format_float(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self.key(labels), 0)
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self.key(labels), 0)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            # [per-bucket counts..., sum, count]; buckets are made cumulative when rendering
+            entry = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[index] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+
+    def time(self, **labels):
+        """Context manager observing the duration of a block"""
+        return Timer(self, labels)
+
+    def render(self):
+        lines = self.header()
+        with self.lock:
+            items = sorted((key, list(entry)) for key, entry in self.values.items())
+        for labelvalues, entry in items:
+            running = 0
+            for bound, count in zip(self.buckets, entry):
+                running += count
+                labels = format_labels(self.labelnames, labelvalues, ("le", format_float(bound)))
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            labels = format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {format_float(entry[-2])}")
+            lines.append(f"{self.name}_count{labels} {entry[-1]}")
+        return lines
+
+class Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+class MetricsRegistry:
+    """Process-wide collection of metrics, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+
+    def register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing:
+                # Modules may be imported more than once, keep the first instance
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# Crow's own metrics, shared by the GUI, the breach modules and the Tor helpers
+BLACKBIRD_LINES = REGISTRY.counter(
+    "crow_blackbird_lines_total", "Blackbird output lines by category", ["category"])
+BREACH_REQUESTS = REGISTRY.counter(
+    "crow_breach_requests_total", "Breach.vip requests by module, endpoint and HTTP status",
+    ["module", "endpoint", "status"])
+BREACH_REQUEST_SECONDS = REGISTRY.histogram(
+    "crow_breach_request_seconds", "Breach.vip request latency", ["module", "endpoint"])
+TOR_PROBES = REGISTRY.counter(
+    "crow_tor_probes_total", "Tor connectivity probes by result", ["result"])
+TOR_PROBE_SECONDS = REGISTRY.histogram(
+    "crow_tor_probe_seconds", "Tor connectivity probe latency")
+CACHE_REQUESTS = REGISTRY.counter(
+    "crow_cache_requests_total", "Cache lookups by cache and result (hit/miss)", ["cache", "result"])
+GUI_EVENT_LOOP_LAG = REGISTRY.histogram(
+    "crow_gui_event_loop_lag_seconds", "Delay of the GUI heartbeat timer beyond its interval",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+GUI_EVENT_LOOP_LAG_MAX = REGISTRY.gauge(
+    "crow_gui_event_loop_lag_max_seconds", "Largest GUI event-loop lag seen since start")
+
+def record_breach_request(module, endpoint, started, status_code=None):
+    """Count one breach.vip request started at time.perf_counter() value started;
+    status_code None means the request failed before a response arrived"""
+    BREACH_REQUEST_SECONDS.observe(time.perf_counter() - started, module=module, endpoint=endpoint)
+    BREACH_REQUESTS.inc(module=module, endpoint=endpoint, status=str(status_code) if status_code else "error")
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the console
+        pass
+
+def start_http_server(port, address="127.0.0.1", registry=REGISTRY):
+    """Serve /metrics from a daemon thread, returns the server"""
+    handler = type("CrowMetricsHandler", (MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((address, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    return server
+
+def write_textfile(path, registry=REGISTRY):
+    """Write the registry for node_exporter's textfile collector, atomically"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(registry.render())
+    os.replace(temp_path, path)
+
+def start_textfile_writer(path, interval=DEFAULT_TEXTFILE_INTERVAL, registry=REGISTRY):
+    """Rewrite the textfile every interval seconds and once more at exit"""
+    def loop():
+        while True:
+            try:
+                write_textfile(path, registry)
+            except OSError as e:
+                print(f"Warning: Could not write metrics textfile: {e}")
+            time.sleep(interval)
+
+    threading.Thread(target=loop, name="metrics-textfile", daemon=True).start()
+    atexit.register(lambda: write_textfile(path, registry))
+
+_exporters_started = False
+
+def start_exporters_from_env():
+    """Start the exporters configured through CROW_METRICS_PORT / CROW_METRICS_TEXTFILE"""
+    global _exporters_started
+    if _exporters_started:
+        return []
+    _exporters_started = True
+
+    started = []
+    port = os.environ.get("CROW_METRICS_PORT")
+    if port:
+        address = os.environ.get("CROW_METRICS_ADDRESS", "127.0.0.1")
+        try:
+            start_http_server(int(port), address)
+            started.append(f"http://{address}:{port}/metrics")
+        except (ValueError, OSError) as e:
+            print(f"Warning: Could not start metrics endpoint on port {port}: {e}")
+
+    textfile = os.environ.get("CROW_METRICS_TEXTFILE")
+    if textfile:
+        try:
+            interval = float(os.environ.get("CROW_METRICS_INTERVAL", DEFAULT_TEXTFILE_INTERVAL))
+        except ValueError:
+            interval = DEFAULT_TEXTFILE_INTERVAL
+        start_textfile_writer(textfile, interval)
+        started.append(textfile)
+    return started
@@ -0,0 +1,137 @@
+# net_budget.py
+import time
+import threading
+from contextlib import contextmanager
+
+from metrics import REGISTRY
+
+# Everything in Crow that opens network connections asks for a slot first:
+#   blackbird - one slot per running Blackbird process
+#   breach    - one slot per breach.vip request
+#   tor       - one slot per Tor connectivity probe
+SUBSYSTEMS = ("blackbird", "breach", "tor")
+DEFAULT_TOTAL = 8
+DEFAULT_WEIGHTS = {"blackbird": 2, "breach": 1, "tor": 1}
+
+QUEUE_DELAY_SECONDS = REGISTRY.histogram(
+    "crow_net_queue_delay_seconds", "Time spent waiting for a network slot", ["subsystem"])
+SLOTS_IN_USE = REGISTRY.gauge(
+    "crow_net_slots_in_use", "Network slots currently held", ["subsystem"])
+
+def parse_weights(text):
+    """Parse 'blackbird=2, breach=1, tor=1' into a weights dict, raises ValueError"""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in (text or "").replace(';', ',').split(','):
+        if not part.strip():
+            continue
+        if '=' not in part and ':' not in part:
+            raise ValueError(f"Expected subsystem=weight, got '{part.strip()}'")
+        name, value = part.replace(':', '=').split('=', 1)
+        name = name.strip().lower()
+        if name not in SUBSYSTEMS:
+            raise ValueError(f"Unknown subsystem '{name}' (expected one of {', '.join(SUBSYSTEMS)})")
+        try:
+            weight = float(value)
+        except ValueError:
+            raise ValueError(f"Weight of {name} is not a number: '{value.strip()}'")
+        if weight <= 0:
+            raise ValueError(f"Weight of {name} must be positive")
+        weights[name] = weight
+    return weights
+
+def format_weights(weights):
+    return ", ".join(f"{name}={weights[name]:g}" for name in SUBSYSTEMS)
+
+class NetworkBudget:
+    """Global cap on concurrent network work, split between subsystems by weight
+
+    Each subsystem gets max(1, total * weight / sum(weights)) slots and the total
+    is enforced on top, so a busy subsystem can never starve the others.
+    """
+
+    def __init__(self, total=DEFAULT_TOTAL, weights=None):
+        self.condition = threading.Condition()
+        self.in_use = {name: 0 for name in SUBSYSTEMS}
+        self.waits = {name: [0, 0.0, 0.0] for name in SUBSYSTEMS}  # count, total, max seconds
+        self.configure(total, weights)
+
+    def configure(self, total, weights=None):
+        weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        total = max(1, int(total))
+        weight_sum = sum(weights[name] for name in SUBSYSTEMS)
+        with self.condition:
+            self.total = total
+            self.weights = weights
+            self.limits = {name: max(1, int(total * weights[name] / weight_sum)) for name in SUBSYSTEMS}
+            # Waiters re-check against the new limits
+            self.condition.notify_all()
+
+    def available(self, subsystem):
+        return (self.in_use[subsystem] < self.limits[subsystem] and
+                sum(self.in_use.values()) < self.total)
+
+    def acquire(self, subsystem, timeout=None):
+        """Take a slot, waiting at most timeout seconds (None waits forever); returns True on success"""
+        if subsystem not in self.in_use:
+            raise ValueError(f"Unknown subsystem '{subsystem}'")
+        started = time.monotonic()
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.available(subsystem), timeout):
+                return False
+            self.in_use[subsystem] += 1
+            waited = time.monotonic() - started
+            stats = self.waits[subsystem]
+            if waited > 0.001:
+                stats[0] += 1
+                stats[1] += waited
+                stats[2] = max(stats[2], waited)
+        QUEUE_DELAY_SECONDS.observe(waited, subsystem=subsystem)
+        SLOTS_IN_USE.inc(subsystem=subsystem)
+        return True
+
+    def release(self, subsystem):
+        with self.condition:
+            self.in_use[subsystem] = max(0, self.in_use[subsystem] - 1)
+            self.condition.notify_all()
+        SLOTS_IN_USE.dec(subsystem=subsystem)
+
+    @contextmanager
+    def slot(self, subsystem):
+        self.acquire(subsystem)
+        try:
+            yield
+        finally:
+            self.release(subsystem)
+
+    @contextmanager
+    def try_slot(self, subsystem, timeout):
+        """Like slot(), but yields False (holding nothing) when no slot comes free within timeout"""
+        acquired = self.acquire(subsystem, timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release(subsystem)
+
+    def stats(self):
+        """{subsystem: {'limit', 'in_use', 'waits', 'queued_seconds', 'max_wait'}}"""
+        with self.condition:
+            return {name: {'limit': self.limits[name], 'in_use': self.in_use[name],
+                           'waits': self.waits[name][0], 'queued_seconds': self.waits[name][1],
+                           'max_wait': self.waits[name][2]}
+                    for name in SUBSYSTEMS}
+
+    def delay_report(self, since=None):
+        """Per-subsystem queueing lines, optionally relative to an earlier stats() snapshot"""
+        lines = []
+        for name, entry in self.stats().items():
+            before = (since or {}).get(name, {})
+            waits = entry['waits'] - before.get('waits', 0)
+            queued = entry['queued_seconds'] - before.get('queued_seconds', 0.0)
+            if waits:
+                lines.append(f"⏳ {name}: waited {queued:.1f}s for a network slot "
+                             f"({waits} time(s), limit {entry['limit']}/{self.total})")
+        return lines
+
+# Shared by every subsystem of the process
+BUDGET = NetworkBudget()
@@ -0,0 +1,100 @@
+# output_view.py
+from PyQt6.QtWidgets import QTextEdit
+from PyQt6.QtGui import QTextCursor, QTextCharFormat, QColor, QFont
+from PyQt6.QtCore import QTimer
+
+from blackbird_output import classify_line, HIT, MISS, ERROR
+
+AI = "ai"
+AI_SECTION = "ai_section"
+AI_SECTION_PREFIXES = ('[Summary]', '[Profile Type]', '[Insights]', '[Risk Flags]', '[Tags]')
+# Lines arriving within one interval are inserted together, in one edit block
+FLUSH_INTERVAL_MS = 50
+
+def line_category(text):
+    """Display category of an output line, None for plain text"""
+    category = classify_line(text)
+    if category:
+        return category
+    if text.startswith(AI_SECTION_PREFIXES):
+        return AI_SECTION
+    lower = text.lower()
+    if 'analyzing with ai' in lower or 'ai queries left' in lower or '✨' in text:
+        return AI
+    return None
+
+def build_formats():
+    """One QTextCharFormat per category, created once and reused for every insert"""
+    def char_format(color=None, bold=False):
+        fmt = QTextCharFormat()
+        if color:
+            fmt.setForeground(QColor(color))
+        if bold:
+            fmt.setFontWeight(QFont.Weight.Bold)
+        return fmt
+
+    return {
+        None: char_format(),
+        HIT: char_format("#1b7f3b", bold=True),
+        MISS: char_format("#808080"),
+        ERROR: char_format("#c25e00"),
+        AI: char_format("#5b3cc4", bold=True),
+        AI_SECTION: char_format("#5b3cc4"),
+    }
+
+class OutputView(QTextEdit):
+    """Read-only log view: plain-text inserts through a QTextCursor instead of append()
+
+    append() keeps its signature so existing callers (breach modules, TOR logging) get
+    the fast path: no rich-text parsing, cached formats, no undo stack, and lines
+    batched per event-loop tick inside beginEditBlock/endEditBlock.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        # The undo stack would keep a copy of every insert of a read-only view
+        self.setUndoRedoEnabled(False)
+        self.formats = build_formats()
+        self.pending = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def append(self, text):
+        self.pending.append(text)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        """Insert every pending line in one edit block"""
+        if not self.pending:
+            return
+        lines, self.pending = self.pending, []
+
+        scrollbar = self.verticalScrollBar()
+        was_at_bottom = scrollbar.value() == scrollbar.maximum()
+
+        document = self.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        first = document.isEmpty()
+        for text in lines:
+            if not first:
+                cursor.insertBlock()
+            first = False
+            cursor.insertText(text, self.formats.get(line_category(text), self.formats[None]))
+        cursor.endEditBlock()
+
+        if was_at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def clear(self):
+        self.pending = []
+        super().clear()
+
+    def toPlainText(self):
+        self.flush()
+        return super().toPlainText()
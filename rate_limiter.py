@@ -0,0 +1,140 @@
+# rate_limiter.py
+import time
+import threading
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+from metrics import REGISTRY
+
+# Used on a 429 that says nothing about when to come back
+DEFAULT_BACKOFF = 60.0
+# Longest pause a response can impose: a reset hours away (or a bogus header) must not
+# hold every later request that long, the server can still answer the next one with a 429
+MAX_BACKOFF = 900.0
+# X-RateLimit-Reset values above this are Unix timestamps, below it seconds to wait
+EPOCH_THRESHOLD = 1e9
+
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "crow_rate_limit_wait_seconds", "Time requests waited for their rate limiter", ["limiter"])
+RATE_LIMIT_BACKOFFS = REGISTRY.counter(
+    "crow_rate_limit_backoffs_total", "Pauses requested by a server (429 or exhausted quota)", ["limiter"])
+
+def header_seconds(value, now=None):
+    """Seconds to wait from a Retry-After style value: delta seconds, HTTP date or Unix timestamp"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    now = time.time() if now is None else now
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, when.timestamp() - now)
+    if seconds > EPOCH_THRESHOLD:
+        seconds -= now
+    return max(0.0, seconds)
+
+def backoff_seconds(status_code, headers):
+    """How long the server asks us to stop sending, None when it does not
+
+    Retry-After wins; otherwise a RateLimit-Reset/X-RateLimit-Reset counts when the
+    remaining quota is zero or the response is a 429. A bare 429 means DEFAULT_BACKOFF.
+    """
+    headers = headers or {}
+    seconds = header_seconds(headers.get('Retry-After'))
+    if seconds is not None:
+        return seconds
+    remaining = headers.get('RateLimit-Remaining', headers.get('X-RateLimit-Remaining'))
+    if status_code == 429 or (remaining is not None and remaining.strip() == "0"):
+        seconds = header_seconds(headers.get('RateLimit-Reset', headers.get('X-RateLimit-Reset')))
+        if seconds is not None:
+            return seconds
+    if status_code == 429:
+        return DEFAULT_BACKOFF
+    return None
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, at most capacity saved up
+
+    acquire() is called when a request starts, so the time a request takes counts
+    towards the next one's wait instead of being added to it. pause() stops every
+    caller until a server-imposed deadline; afterwards one request goes through right
+    away and the rest follow at the normal rate instead of in a burst.
+    """
+
+    def __init__(self, rate, capacity=1, name="default"):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.name = name
+        self.condition = threading.Condition()
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self):
+        """Seconds until a token is available"""
+        with self.condition:
+            now = time.monotonic()
+            self.refill(now)
+            return max(self.paused_until - now, (1 - self.tokens) / self.rate, 0.0)
+
+    def acquire(self, timeout=None):
+        """Take a token, waiting at most timeout seconds (None waits as long as needed)
+
+        Returns the seconds waited, or None when the timeout ran out first.
+        """
+        started = time.monotonic()
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self.refill(now)
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+                if wait <= 0:
+                    self.tokens -= 1
+                    break
+                if timeout is not None:
+                    remaining = started + timeout - now
+                    if remaining <= 0:
+                        return None
+                    wait = min(wait, remaining)
+                # pause() notifies, so a longer deadline is picked up right away
+                self.condition.wait(wait)
+        waited = time.monotonic() - started
+        RATE_LIMIT_WAIT_SECONDS.observe(waited, limiter=self.name)
+        return waited
+
+    def pause(self, seconds):
+        """Let nothing through for seconds (a shorter pause never cuts a longer one short)"""
+        with self.condition:
+            now = time.monotonic()
+            self.refill(now)
+            self.paused_until = max(self.paused_until, now + seconds)
+            # A pause of a full interval or more restarts the server's window: one token
+            # is ready when it ends. A shorter one cannot hand out more than the bucket had
+            self.tokens = 1.0 if seconds * self.rate >= 1 else min(self.tokens, 1.0)
+            self.updated = max(self.updated, self.paused_until)
+            self.condition.notify_all()
+        RATE_LIMIT_BACKOFFS.inc(limiter=self.name)
+
+    def observe(self, status_code, headers):
+        """Apply what a response says about the rate limit, returns the pause in seconds (None if none)
+
+        The pause is capped at MAX_BACKOFF.
+        """
+        seconds = backoff_seconds(status_code, headers)
+        if seconds is not None:
+            seconds = min(seconds, MAX_BACKOFF)
+            self.pause(seconds)
+        return seconds
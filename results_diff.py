@@ -0,0 +1,159 @@
+# results_diff.py
+import json
+import time
+import sqlite3
+import threading
+
+from crow_db import connect
+from blackbird_output import parse_hit, parse_site, HIT, MISS, ERROR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_hits (
+    run_id INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    site TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (run_id, site, url)
+);
+CREATE INDEX IF NOT EXISTS idx_run_hits_target ON run_hits(target);
+CREATE INDEX IF NOT EXISTS idx_run_hits_site ON run_hits(site);
+CREATE TABLE IF NOT EXISTS target_snapshots (
+    target TEXT NOT NULL,
+    catalog_version TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    taken_at REAL NOT NULL,
+    PRIMARY KEY (target, catalog_version)
+);
+"""
+
+def target_key(command_args):
+    """Stable identifier for 'the same target' across runs"""
+    def split(text):
+        text = (text or "").strip()
+        if text.startswith("file:"):
+            return [text]
+        return sorted(item.strip().lower() for item in text.split(',') if item.strip())
+
+    return json.dumps({
+        "usernames": split(command_args.get("username_input")),
+        "emails": split(command_args.get("email_input")),
+        "permute": bool(command_args.get("permute_checkbox")),
+        "permuteall": bool(command_args.get("permuteall_checkbox")),
+    }, sort_keys=True)
+
+class ResultsStore:
+    """Per-run hits plus the baseline snapshot used by differential mode"""
+
+    def __init__(self, db_path=None):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    def record_hits(self, run_id, target, catalog_version, hits, snapshot=True):
+        """Store a run's hits; a complete run also becomes the new baseline"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO run_hits (run_id, target, site, url) VALUES (?, ?, ?, ?)",
+                [(run_id, target, site, url) for site, url in hits]
+            )
+            if snapshot:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO target_snapshots (target, catalog_version, run_id, taken_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (target, catalog_version, run_id, time.time())
+                )
+
+    def previous_results(self, target, catalog_version):
+        """Return {site: set(urls)} of the last complete run, or None if there is none"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT run_id FROM target_snapshots WHERE target = ? AND catalog_version = ?",
+                (target, catalog_version)
+            ).fetchone()
+            if not row:
+                return None
+            rows = self.conn.execute(
+                "SELECT site, url FROM run_hits WHERE run_id = ?", (row["run_id"],)
+            ).fetchall()
+
+        results = {}
+        for site, url in rows:
+            results.setdefault(site, set()).add(url)
+        return results
+
+    def site_hit_rates(self, min_runs=1):
+        """Return {site: fraction of stored runs that found a profile there}"""
+        with self.lock:
+            try:
+                total = self.conn.execute("SELECT COUNT(*) FROM runs WHERE finished_at IS NOT NULL").fetchone()[0]
+            except sqlite3.OperationalError:
+                # Used without the run history: only runs with hits are known
+                total = self.conn.execute("SELECT COUNT(DISTINCT run_id) FROM run_hits").fetchone()[0]
+            rows = self.conn.execute(
+                "SELECT site, COUNT(DISTINCT run_id) AS runs FROM run_hits GROUP BY site"
+            ).fetchall()
+        if not total or total < min_runs:
+            return {}
+        return {row["site"]: min(row["runs"] / total, 1.0) for row in rows}
+
+class DiffFilter:
+    """Suppress unchanged results while the worker parses Blackbird's output"""
+
+    def __init__(self, previous):
+        self.previous = previous or {}
+        self.current = {}
+        self.errored_sites = set()
+        self.changed_sites = set()
+        self.counts = {"new": 0, "changed": 0, "missing": 0, "unchanged": 0}
+
+    def filter_line(self, text, category):
+        """Return the line to display, or None when it is unchanged"""
+        if category == HIT:
+            site, url = parse_hit(text)
+            seen_before = url in self.current.get(site, set())
+            self.current.setdefault(site, set()).add(url)
+            if seen_before:
+                return None
+            if site not in self.previous:
+                self.counts["new"] += 1
+                return f"🆕 NEW {text}"
+            if url in self.previous[site]:
+                self.counts["unchanged"] += 1
+                return None
+            if site not in self.changed_sites:
+                self.changed_sites.add(site)
+                self.counts["changed"] += 1
+            return f"🔄 CHANGED {text} (was: {', '.join(sorted(self.previous[site]))})"
+
+        if category == ERROR:
+            site = parse_site(text)
+            if site:
+                self.errored_sites.add(site)
+            return text
+
+        # Misses are either unchanged or reported as missing in the summary
+        if category == MISS:
+            return None
+        return text
+
+    def summary_lines(self):
+        """Lines for results that disappeared, emitted once the run is complete"""
+        lines = []
+        for site in sorted(self.previous):
+            if site in self.current:
+                gone = self.previous[site] - self.current[site]
+                if gone and site not in self.changed_sites:
+                    self.changed_sites.add(site)
+                    self.counts["changed"] += 1
+                for url in sorted(gone):
+                    lines.append(f"🔄 CHANGED [{site}] no longer at {url}")
+            elif site in self.errored_sites:
+                lines.append(f"⚠️  UNKNOWN [{site}] errored this run, previously {', '.join(sorted(self.previous[site]))}")
+            else:
+                self.counts["missing"] += 1
+                lines.append(f"➖ MISSING [{site}] {', '.join(sorted(self.previous[site]))}")
+
+        lines.append(f"📊 Changes since last run: {self.counts['new']} new, {self.counts['changed']} changed, "
+                     f"{self.counts['missing']} missing, {self.counts['unchanged']} unchanged (hidden)")
+        return lines
@@ -0,0 +1,192 @@
+# results_feed.py
+import os
+import sys
+import json
+import time
+import socket
+import select
+import argparse
+import threading
+
+from event_bus import BUS, RESULT
+from metrics import REGISTRY
+
+FEED_VERSION = 1
+DEFAULT_TCP_HOST = "127.0.0.1"
+# Events queued per subscriber; a slower consumer loses the oldest ones and gets a "gap" line
+DEFAULT_BUFFER = 1000
+# Events written to a subscriber in one send
+SEND_BATCH = 100
+
+FEED_SUBSCRIBERS = REGISTRY.gauge("crow_feed_subscribers", "Connected results feed subscribers")
+FEED_EVENTS_SENT = REGISTRY.counter("crow_feed_events_sent_total", "Results feed events written to subscribers")
+
+def parse_address(text):
+    """('unix', path) or ('tcp', (host, port)) from 'unix:/path', 'tcp:host:port', 'host:port' or 'port'"""
+    if text.startswith("unix:"):
+        return "unix", text[5:]
+    if text.startswith("tcp:"):
+        text = text[4:]
+    host, _, port = text.rpartition(":")
+    try:
+        return "tcp", (host or DEFAULT_TCP_HOST, int(port))
+    except ValueError:
+        raise ValueError(f"Invalid feed address {text!r}, expected unix:/path or [tcp:][host:]port")
+
+def feed_record(event):
+    """NDJSON object of a result event: its type, time and source, then its own fields"""
+    return {'type': event.message, 'time': event.timestamp, 'source': event.source, **(event.data or {})}
+
+def encode(record):
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+
+class FeedSubscriber:
+    """One connected consumer: its own bounded bus subscription and writer thread"""
+
+    def __init__(self, feed, connection, buffer):
+        self.feed = feed
+        self.connection = connection
+        # Lossy: a stalled consumer must never hold up a Blackbird worker
+        self.subscription = feed.bus.subscribe((RESULT,), buffer, block=False)
+        self.thread = threading.Thread(target=self.run, name="feed-subscriber", daemon=True)
+
+    def run(self):
+        try:
+            self.connection.sendall(encode({'type': 'hello', 'version': FEED_VERSION, 'time': time.time()}))
+            while not self.feed.closed and not self.peer_closed():
+                event = self.subscription.get(timeout=0.5)
+                dropped = self.subscription.take_dropped()
+                chunks = []
+                if dropped:
+                    chunks.append(encode({'type': 'gap', 'dropped': dropped, 'time': time.time()}))
+                if event is not None:
+                    events = [event] + self.subscription.drain(SEND_BATCH - 1)
+                    chunks.extend(encode(feed_record(item)) for item in events)
+                    FEED_EVENTS_SENT.inc(len(events))
+                if chunks:
+                    self.connection.sendall(b"".join(chunks))
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    def peer_closed(self):
+        """True once the consumer hung up (it is not expected to send anything)"""
+        readable, _, _ = select.select([self.connection], [], [], 0)
+        return bool(readable) and not self.connection.recv(4096)
+
+    def close(self):
+        self.subscription.close()
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+        self.feed.remove(self)
+
+class ResultsFeed:
+    """Serves every parsed hit, breach record and AI report as NDJSON to local socket subscribers"""
+
+    def __init__(self, address, bus=None, buffer=DEFAULT_BUFFER):
+        self.family, self.address = parse_address(address)
+        self.bus = bus or BUS
+        self.buffer = buffer
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.closed = False
+        self.listener = None
+
+    def start(self):
+        if self.family == "unix":
+            if os.path.exists(self.address):
+                # A socket left behind by a previous run
+                os.remove(self.address)
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.listener.bind(self.address)
+            # Results are as sensitive as the results directory
+            os.chmod(self.address, 0o600)
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind(self.address)
+        self.listener.listen()
+        threading.Thread(target=self.accept_loop, name="results-feed", daemon=True).start()
+        return self
+
+    def describe(self):
+        if self.family == "unix":
+            return f"unix:{self.address}"
+        host, port = self.listener.getsockname()[:2] if self.listener else self.address
+        return f"tcp:{host}:{port}"
+
+    def accept_loop(self):
+        while not self.closed:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                break
+            subscriber = FeedSubscriber(self, connection, self.buffer)
+            with self.lock:
+                self.subscribers.append(subscriber)
+                FEED_SUBSCRIBERS.set(len(self.subscribers))
+            subscriber.thread.start()
+
+    def remove(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+            FEED_SUBSCRIBERS.set(len(self.subscribers))
+
+    def close(self):
+        self.closed = True
+        if self.listener:
+            self.listener.close()
+        for subscriber in list(self.subscribers):
+            subscriber.close()
+        if self.family == "unix" and os.path.exists(self.address):
+            os.remove(self.address)
+
+def start_feed_from_env(address=None):
+    """Start the feed on address or CROW_FEED, None when neither is set or it cannot start"""
+    address = address or os.environ.get("CROW_FEED")
+    if not address:
+        return None
+    try:
+        return ResultsFeed(address).start()
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not start the results feed on {address}: {e}")
+        return None
+
+def connect(address):
+    family, target = parse_address(address)
+    connection = socket.socket(socket.AF_UNIX if family == "unix" else socket.AF_INET, socket.SOCK_STREAM)
+    connection.connect(target)
+    return connection
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Follow Crow's results feed (NDJSON)")
+    parser.add_argument("address", nargs="?", default=os.environ.get("CROW_FEED"),
+                        help="unix:/path or [tcp:][host:]port (default: CROW_FEED)")
+    parser.add_argument("--type", action="append", help="Only these event types (hit, breach, ai_report...)")
+    args = parser.parse_args(argv)
+    if not args.address:
+        parser.error("no feed address given and CROW_FEED is not set")
+
+    try:
+        connection = connect(args.address)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not connect to {args.address}: {e}")
+        return 1
+    try:
+        for line in connection.makefile('r', encoding='utf-8'):
+            if args.type and json.loads(line).get('type') not in args.type:
+                continue
+            sys.stdout.write(line)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        connection.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,391 @@
+# results_index.py
+import os
+import re
+import sys
+import csv
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from crow_db import connect
+from correlation_index import (SCHEMA as CORRELATION_SCHEMA, SITE, EMAIL, EMAIL_REGEX,
+                               upsert_entities, remove_entities, entities_from_values, file_entities)
+
+DEFAULT_RESULTS_DIRECTORY = "results"
+# Crow's own files in results/ that are not Blackbird output
+IGNORED_DIRECTORIES = ("dump_store", "ai_cache", "session")
+IGNORED_FILES = ("ai_quota.json",)
+AI_REPORT_REGEX = re.compile(r'^blackbird_ai_(?P<target>.+)_\d{8}_\d{6}\.txt$')
+# Blackbird names its exports <target>_<date>_blackbird.csv/json
+RESULT_STEM_REGEX = re.compile(r'^(?P<target>.+?)_\d[\d_\-]*(?:_blackbird)?$')
+RESULT_SUFFIX_REGEX = re.compile(r'^_\d[\d_\-]*(?:_blackbird)?$')
+
+# Field names seen in Blackbird exports, first match wins
+SITE_KEYS = ("name", "site", "app", "platform")
+URL_KEYS = ("url", "uri", "link", "profile")
+CATEGORY_KEYS = ("category", "cat")
+STATUS_KEYS = ("status", "result", "found")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    run_id INTEGER,
+    target TEXT,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT NOT NULL REFERENCES result_files(path) ON DELETE CASCADE,
+    run_id INTEGER,
+    target TEXT,
+    site TEXT,
+    url TEXT,
+    category TEXT,
+    status TEXT,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_target ON results(target);
+CREATE INDEX IF NOT EXISTS idx_results_site ON results(site COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_results_category ON results(category);
+CREATE INDEX IF NOT EXISTS idx_results_file ON results(file_path);
+
+CREATE TABLE IF NOT EXISTS ai_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT NOT NULL UNIQUE REFERENCES result_files(path) ON DELETE CASCADE,
+    target TEXT,
+    created_at REAL,
+    report TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ai_reports_target ON ai_reports(target);
+"""
+
+# The FTS tables keep their own copy of the text, rowid = results.id / ai_reports.id
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(target, site, url);
+CREATE VIRTUAL TABLE IF NOT EXISTS ai_reports_fts USING fts5(target, report);
+"""
+
+def phrase_query(query):
+    """Quote a query as one FTS5 phrase, so input like 'mastodon.social' is not parsed as syntax"""
+    return '"' + query.replace('"', '""') + '"'
+
+def first_value(row, keys):
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+def target_from_path(path):
+    """Target of a result file from its name (or its directory's name)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = RESULT_STEM_REGEX.match(stem)
+    if not match:
+        parent = os.path.basename(os.path.dirname(path))
+        match = RESULT_STEM_REGEX.match(parent)
+    return match.group('target') if match else stem.replace("_blackbird", "")
+
+def run_targets(command_args):
+    """Case-folded usernames and emails a run searches (file: inputs are read), and whether it permutes"""
+    targets = set()
+    for key in ("username_input", "email_input"):
+        text = (command_args.get(key) or "").strip()
+        if text.startswith("file:"):
+            try:
+                with open(text[5:], 'r', encoding='utf-8', errors='replace') as f:
+                    entries = [line.strip() for line in f]
+            except OSError:
+                entries = []
+        else:
+            entries = [item.strip() for item in text.split(',')]
+        targets.update(entry.casefold() for entry in entries if entry)
+    permute = bool(command_args.get("permute_checkbox") or command_args.get("permuteall_checkbox"))
+    return targets, permute
+
+def stem_targets(name):
+    """Every target a <target>_<date>[_blackbird] name can stand for (targets may end in _<digits>)"""
+    return {name[:i] for i, char in enumerate(name) if char == "_" and i and RESULT_SUFFIX_REGEX.match(name[i:])}
+
+def path_targets(path, results_directory=DEFAULT_RESULTS_DIRECTORY):
+    """Targets a file under results_directory may belong to: from an AI report name, or from the
+    <target>_<date>_blackbird folders and file name on its path"""
+    parts = os.path.relpath(path, results_directory).split(os.sep)
+    ai_match = AI_REPORT_REGEX.match(parts[-1])
+    if ai_match:
+        return {ai_match.group('target').casefold()}
+    parts[-1] = os.path.splitext(parts[-1])[0]
+    return {target.casefold() for part in parts for target in stem_targets(part)}
+
+def belongs_to_run(path, targets, permute=False, results_directory=DEFAULT_RESULTS_DIRECTORY):
+    """True when a file was written for one of a run's targets (permutations contain the original)"""
+    found = path_targets(path, results_directory)
+    if permute:
+        return any(original in target for target in found for original in targets)
+    return not found.isdisjoint(targets)
+
+def read_result_rows(path):
+    """Rows of a Blackbird CSV or JSON export as lowercase-keyed dicts"""
+    if path.lower().endswith(".csv"):
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            return [{(key or "").strip().lower(): value for key, value in row.items()}
+                    for row in csv.DictReader(f)]
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        # Either {"results": [...]}, {"accounts": [...]} or one account
+        for key in ("results", "accounts", "found", "data"):
+            if isinstance(data.get(key), list):
+                data = data[key]
+                break
+        else:
+            data = [data]
+    return [{str(key).lower(): value for key, value in row.items()} for row in data if isinstance(row, dict)]
+
+def normalize_row(row):
+    """(site, url, category, status, metadata JSON) of one exported account"""
+    site = first_value(row, SITE_KEYS)
+    url = first_value(row, URL_KEYS)
+    used = set(SITE_KEYS + URL_KEYS + CATEGORY_KEYS + STATUS_KEYS)
+    metadata = {key: value for key, value in row.items() if key not in used and value not in (None, "")}
+    return (site, url, first_value(row, CATEGORY_KEYS), first_value(row, STATUS_KEYS),
+            json.dumps(metadata, ensure_ascii=False, default=str) if metadata else None)
+
+def find_result_files(results_directory=DEFAULT_RESULTS_DIRECTORY, since=None):
+    """Blackbird CSV/JSON exports and Crow AI reports under results_directory"""
+    found = []
+    for root, dirs, files in os.walk(results_directory):
+        dirs[:] = [name for name in dirs if name not in IGNORED_DIRECTORIES]
+        for name in files:
+            lower = name.lower()
+            if name in IGNORED_FILES:
+                continue
+            if not (lower.endswith((".csv", ".json")) or AI_REPORT_REGEX.match(name)):
+                continue
+            path = os.path.join(root, name)
+            try:
+                if since is None or os.path.getmtime(path) >= since:
+                    found.append(path)
+            except OSError:
+                continue
+    return sorted(found)
+
+class ResultsIndex:
+    """Blackbird result files and AI reports loaded into crow.db with full-text search"""
+
+    def __init__(self, db_path=None):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+            self.conn.executescript(CORRELATION_SCHEMA)
+            try:
+                self.conn.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: search falls back to LIKE
+                self.fts = False
+
+    def is_current(self, path, mtime, size):
+        row = self.conn.execute("SELECT mtime, size FROM result_files WHERE path = ?", (path,)).fetchone()
+        return row is not None and row["mtime"] == mtime and row["size"] == size
+
+    def forget(self, path):
+        """Drop a file's rows (and their FTS entries) and its correlation links before re-ingesting it"""
+        known = self.conn.execute("SELECT target FROM result_files WHERE path = ?", (path,)).fetchone()
+        if known:
+            remove_entities(self.conn, known['target'], file_entities(self.conn, path))
+        if self.fts:
+            self.conn.execute("DELETE FROM results_fts WHERE rowid IN (SELECT id FROM results WHERE file_path = ?)",
+                              (path,))
+            self.conn.execute("DELETE FROM ai_reports_fts WHERE rowid IN "
+                              "(SELECT id FROM ai_reports WHERE file_path = ?)", (path,))
+        self.conn.execute("DELETE FROM results WHERE file_path = ?", (path,))
+        self.conn.execute("DELETE FROM ai_reports WHERE file_path = ?", (path,))
+        self.conn.execute("DELETE FROM result_files WHERE path = ?", (path,))
+
+    def ingest_file(self, path, run_id=None):
+        """Load one file unless it is unchanged since the last ingestion; returns rows added or None"""
+        path = os.path.normpath(path)
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            print(f"Warning: Could not read {path}: {e}")
+            return None
+
+        # Unchanged files are skipped before parsing, re-ingesting years of results stays cheap
+        with self.lock:
+            if self.is_current(path, stat.st_mtime, stat.st_size):
+                return None
+
+        ai_match = AI_REPORT_REGEX.match(os.path.basename(path))
+        try:
+            if ai_match:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    report = f.read()
+                rows = None
+            else:
+                rows = [normalize_row(row) for row in read_result_rows(path)]
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"Warning: Could not parse {path}: {e}")
+            return None
+
+        target = ai_match.group('target') if ai_match else target_from_path(path)
+        with self.lock, self.conn:
+            self.forget(path)
+            self.conn.execute(
+                "INSERT INTO result_files (path, kind, mtime, size, run_id, target, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, "ai_report" if ai_match else "results", stat.st_mtime, stat.st_size,
+                 run_id, target, time.time()))
+
+            if ai_match:
+                cursor = self.conn.execute(
+                    "INSERT INTO ai_reports (file_path, target, created_at, report) VALUES (?, ?, ?, ?)",
+                    (path, target, stat.st_mtime, report))
+                if self.fts:
+                    self.conn.execute("INSERT INTO ai_reports_fts (rowid, target, report) VALUES (?, ?, ?)",
+                                      (cursor.lastrowid, target, report))
+                upsert_entities(self.conn, target, {(EMAIL, email.lower()) for email in EMAIL_REGEX.findall(report)})
+                return 1
+
+            # Correlation index is updated in the same transaction as the rows it is derived from
+            entities = set()
+            for site, url, category, status, metadata in rows:
+                cursor = self.conn.execute(
+                    "INSERT INTO results (file_path, run_id, target, site, url, category, status, metadata) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, run_id, target, site, url, category, status, metadata))
+                if self.fts:
+                    self.conn.execute("INSERT INTO results_fts (rowid, target, site, url) VALUES (?, ?, ?, ?)",
+                                      (cursor.lastrowid, target, site, url))
+                if site:
+                    entities.add((SITE, site))
+                if metadata:
+                    entities |= entities_from_values(json.loads(metadata))
+            upsert_entities(self.conn, target, entities)
+            return len(rows)
+
+    def ingest_directory(self, results_directory=DEFAULT_RESULTS_DIRECTORY, since=None, run_id=None, targets=None,
+                         permute=False):
+        """Incrementally load new or changed files; returns {'files', 'rows'}
+
+        targets (see run_targets) limits ingestion to one run's files, so runs finishing
+        while others are still going never claim their files.
+        """
+        files = rows = 0
+        for path in find_result_files(results_directory, since):
+            if targets is not None and not belongs_to_run(path, targets, permute, results_directory):
+                continue
+            added = self.ingest_file(path, run_id)
+            if added is not None:
+                files += 1
+                rows += added
+        return {'files': files, 'rows': rows}
+
+    def match(self, sql, query, limit):
+        """Run an FTS query, retrying it as a plain phrase when it is not valid FTS5 syntax"""
+        try:
+            return self.conn.execute(sql, (query, limit)).fetchall()
+        except sqlite3.OperationalError:
+            return self.conn.execute(sql, (phrase_query(query), limit)).fetchall()
+
+    def search(self, query, limit=50):
+        """Accounts whose target, site or URL match a full-text query"""
+        with self.lock:
+            if self.fts:
+                rows = self.match(
+                    """SELECT r.target, r.site, r.url, r.category, r.file_path FROM results_fts f
+                       JOIN results r ON r.id = f.rowid WHERE results_fts MATCH ?
+                       ORDER BY f.rank LIMIT ?""", query, limit)
+            else:
+                pattern = f"%{query}%"
+                rows = self.conn.execute(
+                    """SELECT target, site, url, category, file_path FROM results
+                       WHERE target LIKE ? OR site LIKE ? OR url LIKE ? LIMIT ?""",
+                    (pattern, pattern, pattern, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_reports(self, query, limit=20):
+        """AI reports matching a full-text query, with a highlighted snippet"""
+        with self.lock:
+            if self.fts:
+                rows = self.match(
+                    """SELECT a.target, a.file_path, snippet(ai_reports_fts, 1, '[', ']', '…', 12) AS snippet
+                       FROM ai_reports_fts f JOIN ai_reports a ON a.id = f.rowid
+                       WHERE ai_reports_fts MATCH ? ORDER BY f.rank LIMIT ?""", query, limit)
+            else:
+                rows = self.conn.execute(
+                    "SELECT target, file_path, substr(report, 1, 120) AS snippet FROM ai_reports "
+                    "WHERE report LIKE ? LIMIT ?", (f"%{query}%", limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def targets_with_site(self, site):
+        """Targets with an account on a site (exact name, case-insensitive)"""
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT target, COUNT(*) AS accounts, MAX(url) AS url FROM results
+                   WHERE site = ? COLLATE NOCASE GROUP BY target ORDER BY target""", (site,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        with self.lock:
+            row = self.conn.execute(
+                """SELECT (SELECT COUNT(*) FROM result_files) AS files, (SELECT COUNT(*) FROM results) AS results,
+                          (SELECT COUNT(DISTINCT target) FROM results) AS targets,
+                          (SELECT COUNT(*) FROM ai_reports) AS ai_reports""").fetchone()
+        return dict(row)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search Blackbird results and AI reports across runs")
+    parser.add_argument("--db", help="Path to the Crow database (default: results/crow.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = sub.add_parser("ingest", help="Load new or changed result files")
+    ingest_parser.add_argument("--results", default=DEFAULT_RESULTS_DIRECTORY)
+
+    search_parser = sub.add_parser("search", help="Full-text search over targets, sites and URLs")
+    search_parser.add_argument("query")
+    search_parser.add_argument("-n", "--limit", type=int, default=50)
+
+    reports_parser = sub.add_parser("reports", help="Full-text search over AI reports")
+    reports_parser.add_argument("query")
+    reports_parser.add_argument("-n", "--limit", type=int, default=20)
+
+    site_parser = sub.add_parser("site", help="Targets with an account on a site")
+    site_parser.add_argument("site")
+
+    sub.add_parser("stats", help="Index size")
+
+    args = parser.parse_args(argv)
+    index = ResultsIndex(args.db)
+
+    try:
+        if args.command == "ingest":
+            result = index.ingest_directory(args.results)
+            print(f"✅ {result['files']} new or changed file(s), {result['rows']} row(s)")
+        elif args.command == "search":
+            for row in index.search(args.query, args.limit):
+                print(f"{(row['target'] or '-')[:25]:<25} {(row['site'] or '-')[:25]:<25} {row['url'] or '-'}")
+        elif args.command == "reports":
+            for row in index.search_reports(args.query, args.limit):
+                print(f"{row['target']:<25} {row['file_path']}\n    {' '.join(row['snippet'].split())}")
+        elif args.command == "site":
+            for row in index.targets_with_site(args.site):
+                print(f"{row['target']:<30} {row['url'] or '-'}")
+        elif args.command == "stats":
+            counts = index.counts()
+            print(f"{counts['files']} file(s), {counts['results']} result(s) for {counts['targets']} target(s), "
+                  f"{counts['ai_reports']} AI report(s)")
+    except sqlite3.OperationalError as e:
+        print(f"❌ Query failed: {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# run_history.py
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+
+from crow_db import connect
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Never persist credentials into the history database
+SECRET_KEYS = ("ai_api_key", "instagram_session_id")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    duration REAL,
+    status TEXT NOT NULL DEFAULT 'running',
+    exit_code INTEGER,
+    command_args TEXT NOT NULL,
+    command TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    hits INTEGER DEFAULT 0,
+    misses INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    breach_lookups INTEGER DEFAULT 0,
+    peak_memory_kb INTEGER,
+    first_hit_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+"""
+
+# Columns added after the first release of the table: (name, SQL type)
+MIGRATIONS = [
+    ("first_hit_seconds", "REAL"),
+]
+
+def redact(values):
+    """Return a copy of a settings/arguments dict without secrets"""
+    return {key: ("<redacted>" if key in SECRET_KEYS and value else value)
+            for key, value in values.items()}
+
+def read_peak_memory_kb(pid):
+    """Peak resident memory (VmHWM) of a running process in KB, or None"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def children_peak_memory_kb():
+    """Fallback when /proc is unavailable: largest child RSS seen so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # macOS reports bytes, Linux reports KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+class RunHistory:
+    """One row per Blackbird run in the shared Crow database"""
+
+    def __init__(self, db_path=None):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+            existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(runs)")}
+            for column, column_type in MIGRATIONS:
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+            self.conn.commit()
+
+    def start_run(self, command_args, command, settings, started_at=None):
+        """Insert a new run row and return its id"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, command_args, command, settings) VALUES (?, ?, ?, ?)",
+                (started_at or time.time(),
+                 json.dumps(redact(command_args)),
+                 json.dumps(command),
+                 json.dumps(redact(settings)))
+            )
+            return cursor.lastrowid
+
+    def finish_run(self, run_id, status="finished", exit_code=None, hits=0, misses=0,
+                   errors=0, breach_lookups=0, peak_memory_kb=None, first_hit_seconds=None):
+        """Close a run row with its counters"""
+        finished_at = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """UPDATE runs SET finished_at = ?, duration = ? - started_at, status = ?,
+                   exit_code = ?, hits = ?, misses = ?, errors = ?, breach_lookups = ?,
+                   peak_memory_kb = ?, first_hit_seconds = ? WHERE id = ?""",
+                (finished_at, finished_at, status, exit_code, hits, misses, errors,
+                 breach_lookups, peak_memory_kb, first_hit_seconds, run_id)
+            )
+
+    def list_runs(self, limit=50):
+        """Most recent runs first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_run(self, run_id):
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def compare_runs(self, base_id, other_id):
+        """Compare two runs field by field, flagging settings that changed"""
+        base = self.get_run(base_id)
+        other = self.get_run(other_id)
+        if not base or not other:
+            return None
+
+        metrics = {}
+        for field in ("duration", "first_hit_seconds", "hits", "misses", "errors",
+                      "breach_lookups", "peak_memory_kb"):
+            a, b = base.get(field), other.get(field)
+            change = None
+            if a not in (None, 0) and b is not None:
+                change = (b - a) / a * 100
+            metrics[field] = {"base": a, "other": b, "change_pct": change}
+
+        base_settings = json.loads(base["settings"])
+        other_settings = json.loads(other["settings"])
+        changed_settings = {
+            key: (base_settings.get(key), other_settings.get(key))
+            for key in sorted(set(base_settings) | set(other_settings))
+            if base_settings.get(key) != other_settings.get(key)
+        }
+        return {"base": base, "other": other, "metrics": metrics, "changed_settings": changed_settings}
+
+def format_timestamp(value):
+    return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S") if value else "-"
+
+def format_duration(value):
+    return f"{value:.1f}s" if value is not None else "-"
+
+def format_run_row(run):
+    """One-line summary used by the CLI and the GUI history view"""
+    args = json.loads(run["command_args"])
+    target = args.get("username_input") or args.get("email_input") or "-"
+    memory = f"{run['peak_memory_kb'] // 1024}MB" if run.get("peak_memory_kb") else "-"
+    return (f"#{run['id']:<5} {format_timestamp(run['started_at'])}  {format_duration(run['duration']):>8}  "
+            f"first={format_duration(run.get('first_hit_seconds')):>7}  "
+            f"hits={run['hits']:<4} miss={run['misses']:<5} err={run['errors']:<4} "
+            f"breach={run['breach_lookups']:<3} mem={memory:<6} {run['status']:<8} {target}")
+
+def format_value(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "-" if value is None else str(value)
+
+def format_comparison(comparison):
+    """Human readable comparison report"""
+    lines = [f"Run #{comparison['base']['id']} → Run #{comparison['other']['id']}", "=" * 60]
+    for field, values in comparison["metrics"].items():
+        change = values["change_pct"]
+        change_text = f"{change:+.1f}%" if change is not None else "n/a"
+        flag = ""
+        # More time, errors or memory for the same work is a regression
+        if change is not None and change > 10 and field in ("duration", "first_hit_seconds", "errors", "peak_memory_kb"):
+            flag = "  ⚠️  regression"
+        lines.append(f"{field:<18} {format_value(values['base']):>12} → {format_value(values['other']):<12} {change_text}{flag}")
+
+    lines.append("")
+    if comparison["changed_settings"]:
+        lines.append("Changed settings:")
+        for key, (a, b) in comparison["changed_settings"].items():
+            lines.append(f"  {key}: {a!r} → {b!r}")
+    else:
+        lines.append("Settings identical")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query Crow's run history")
+    parser.add_argument("--db", help="Path to the Crow database (default: results/crow.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", help="List recent runs")
+    list_parser.add_argument("-n", "--limit", type=int, default=20)
+
+    show_parser = sub.add_parser("show", help="Show one run in full")
+    show_parser.add_argument("run_id", type=int)
+
+    compare_parser = sub.add_parser("compare", help="Compare two runs")
+    compare_parser.add_argument("base_id", type=int)
+    compare_parser.add_argument("other_id", type=int)
+
+    args = parser.parse_args(argv)
+    history = RunHistory(args.db)
+
+    if args.command == "list":
+        for run in history.list_runs(args.limit):
+            print(format_run_row(run))
+    elif args.command == "show":
+        run = history.get_run(args.run_id)
+        if not run:
+            print(f"❌ No run #{args.run_id}")
+            return 1
+        for key in ("command_args", "settings", "command"):
+            run[key] = json.loads(run[key])
+        print(json.dumps(run, indent=4, ensure_ascii=False))
+    elif args.command == "compare":
+        comparison = history.compare_runs(args.base_id, args.other_id)
+        if not comparison:
+            print("❌ One of the runs does not exist")
+            return 1
+        print(format_comparison(comparison))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+# run_log.py
+import os
+import time
+
+from log_index import LogIndex
+
+# Full, unfiltered output of every run; the GUI may only show part of it
+DEFAULT_RUN_LOG_DIRECTORY = os.path.join("results", "run_logs")
+# Searches only see lines already on disk, so flush at least this often (seconds)
+FLUSH_INTERVAL = 0.5
+
+class RunLog:
+    """Append-only text log of one run's output, indexed for search as it is written"""
+
+    def __init__(self, label=None, directory=DEFAULT_RUN_LOG_DIRECTORY):
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        label = label or time.strftime("run_%Y%m%d_%H%M%S")
+        self.path = os.path.join(directory, f"{label}.log")
+        # Binary so the byte offsets handed to the index are exact. Always a new file:
+        # labels repeat (daemon job ids restart, two runs in one second), logs must not mix
+        suffix = 1
+        while True:
+            try:
+                self.file = open(self.path, 'xb')
+                break
+            except FileExistsError:
+                suffix += 1
+                self.path = os.path.join(directory, f"{label}_{suffix}.log")
+        self.size = 0
+        self.index = LogIndex()
+        self.last_flush = time.monotonic()
+
+    def write(self, text):
+        data = (text + "\n").encode('utf-8', errors='replace')
+        self.file.write(data)
+        self.index.add(self.size, len(data), text)
+        self.size += len(data)
+        now = time.monotonic()
+        if now - self.last_flush > FLUSH_INTERVAL:
+            self.file.flush()
+            self.last_flush = now
+
+    def search(self, query, regex=False):
+        """Matching line numbers, see LogIndex.search"""
+        return self.index.search(self.path, query, regex)
+
+    def read_lines(self, start, end):
+        return self.index.read_lines(self.path, start, end)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
@@ -0,0 +1,210 @@
+# run_queue.py
+import sys
+import json
+import time
+import argparse
+import threading
+
+from crow_db import connect
+from run_history import format_timestamp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    run_id INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_run_queue_status ON run_queue(status, position);
+CREATE TABLE IF NOT EXISTS run_queue_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+STOPPED = "stopped"
+FAILED = "failed"
+
+# The AI key is global to the GUI; a queued job never needs its own copy on disk
+DROPPED_KEYS = ("ai_api_key",)
+
+def job_label(settings):
+    """Target of a settings snapshot, as shown in the queue"""
+    return (settings.get("username_input") or settings.get("email_input") or "-").strip() or "-"
+
+class RunQueue:
+    """Persistent queue of settings snapshots (save_settings format) run back to back"""
+
+    def __init__(self, db_path=None):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.executescript(SCHEMA)
+        # A job still marked running was cut short by a restart, run it again
+        self.requeue_interrupted()
+
+    def requeue_interrupted(self):
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "UPDATE run_queue SET status = ?, started_at = NULL, run_id = NULL WHERE status = ?",
+                (QUEUED, RUNNING)).rowcount
+
+    def enqueue(self, settings, label=None):
+        """Append a snapshot to the end of the queue, returns the job id"""
+        settings = {key: value for key, value in settings.items() if key not in DROPPED_KEYS}
+        with self.lock, self.conn:
+            position = self.conn.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM run_queue").fetchone()[0]
+            cursor = self.conn.execute(
+                "INSERT INTO run_queue (position, label, settings, created_at) VALUES (?, ?, ?, ?)",
+                (position, label or job_label(settings), json.dumps(settings), time.time()))
+            return cursor.lastrowid
+
+    def jobs(self, include_finished=True):
+        """Running job first, then the queued ones in order, then finished ones (newest first)"""
+        query = "SELECT * FROM run_queue"
+        if not include_finished:
+            query += f" WHERE status IN ('{QUEUED}', '{RUNNING}')"
+        query += (f" ORDER BY CASE status WHEN '{RUNNING}' THEN 0 WHEN '{QUEUED}' THEN 1 ELSE 2 END,"
+                  f" CASE WHEN status IN ('{RUNNING}', '{QUEUED}') THEN position ELSE -finished_at END")
+        with self.lock:
+            rows = self.conn.execute(query).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job["settings"] = json.loads(job["settings"])
+            jobs.append(job)
+        return jobs
+
+    def next_job(self):
+        """First queued job, or None"""
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM run_queue WHERE status = ? ORDER BY position LIMIT 1",
+                                    (QUEUED,)).fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job["settings"] = json.loads(job["settings"])
+        return job
+
+    def move(self, job_id, offset):
+        """Swap a queued job with the queued job offset places away, returns True if it moved"""
+        with self.lock, self.conn:
+            ids = [row[0] for row in self.conn.execute(
+                "SELECT id FROM run_queue WHERE status = ? ORDER BY position", (QUEUED,))]
+            if job_id not in ids:
+                return False
+            index = ids.index(job_id)
+            target = index + offset
+            if target < 0 or target >= len(ids) or target == index:
+                return False
+            other_id = ids[target]
+            positions = dict(self.conn.execute(
+                "SELECT id, position FROM run_queue WHERE id IN (?, ?)", (job_id, other_id)).fetchall())
+            self.conn.execute("UPDATE run_queue SET position = ? WHERE id = ?", (positions[other_id], job_id))
+            self.conn.execute("UPDATE run_queue SET position = ? WHERE id = ?", (positions[job_id], other_id))
+            return True
+
+    def remove(self, job_id):
+        """Delete a job that is not running, returns True if it was removed"""
+        with self.lock, self.conn:
+            return self.conn.execute("DELETE FROM run_queue WHERE id = ? AND status != ?",
+                                     (job_id, RUNNING)).rowcount > 0
+
+    def mark_running(self, job_id, run_id=None):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE run_queue SET status = ?, started_at = ?, run_id = ? WHERE id = ?",
+                              (RUNNING, time.time(), run_id, job_id))
+
+    def mark_finished(self, job_id, status, run_id=None, error=None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE run_queue SET status = ?, finished_at = ?, run_id = COALESCE(?, run_id), error = ? "
+                "WHERE id = ?", (status, time.time(), run_id, error, job_id))
+
+    def clear_finished(self):
+        with self.lock, self.conn:
+            return self.conn.execute("DELETE FROM run_queue WHERE status NOT IN (?, ?)",
+                                     (QUEUED, RUNNING)).rowcount
+
+    def is_paused(self):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM run_queue_state WHERE key = 'paused'").fetchone()
+        return bool(row and row[0] == "1")
+
+    def set_paused(self, paused):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO run_queue_state (key, value) VALUES ('paused', ?)",
+                              ("1" if paused else "0",))
+
+    def counts(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM run_queue GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+def format_job_row(job):
+    """One-line summary used by the CLI and the GUI queue panel"""
+    run = f"run #{job['run_id']}" if job.get("run_id") else ""
+    when = format_timestamp(job["finished_at"] or job["started_at"] or job["created_at"])
+    error = f"  {job['error']}" if job.get("error") else ""
+    return f"#{job['id']:<5} {job['status']:<8} {when}  {job['label']:<30} {run}{error}".rstrip()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage Crow's run queue")
+    parser.add_argument("--db", help="Path to the Crow database (default: results/crow.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", help="List jobs")
+    list_parser.add_argument("--pending", action="store_true", help="Only queued and running jobs")
+    add_parser = sub.add_parser("add", help="Queue saved settings files (Save Settings format)")
+    add_parser.add_argument("files", nargs="+")
+    remove_parser = sub.add_parser("remove", help="Remove a job")
+    remove_parser.add_argument("job_id", type=int)
+    move_parser = sub.add_parser("move", help="Move a queued job up (negative) or down (positive)")
+    move_parser.add_argument("job_id", type=int)
+    move_parser.add_argument("offset", type=int)
+    sub.add_parser("pause", help="Stop starting new jobs")
+    sub.add_parser("resume", help="Start queued jobs again")
+    sub.add_parser("clear", help="Remove finished jobs")
+
+    args = parser.parse_args(argv)
+    queue = RunQueue(args.db)
+
+    if args.command == "list":
+        if queue.is_paused():
+            print("⏸️  Queue paused")
+        for job in queue.jobs(include_finished=not args.pending):
+            print(format_job_row(job))
+    elif args.command == "add":
+        for path in args.files:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    settings = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"❌ {path}: {e}")
+                return 1
+            print(f"✅ Queued #{queue.enqueue(settings)} {job_label(settings)}")
+    elif args.command == "remove":
+        if not queue.remove(args.job_id):
+            print(f"❌ No removable job #{args.job_id}")
+            return 1
+    elif args.command == "move":
+        if not queue.move(args.job_id, args.offset):
+            print(f"❌ Job #{args.job_id} cannot move by {args.offset}")
+            return 1
+    elif args.command in ("pause", "resume"):
+        queue.set_paused(args.command == "pause")
+    elif args.command == "clear":
+        print(f"🧹 Removed {queue.clear_finished()} finished job(s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
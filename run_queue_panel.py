@@ -0,0 +1,79 @@
+# run_queue_panel.py
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QPushButton
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt
+
+from run_queue import QUEUED, RUNNING, format_job_row
+
+class RunQueuePanel(QWidget):
+    """Queue tab: reorder, remove, pause and resume queued runs"""
+
+    def __init__(self, run_queue, on_change, parent=None):
+        super().__init__(parent)
+        self.run_queue = run_queue
+        # Called after every edit so the GUI can start the next job right away
+        self.on_change = on_change
+
+        layout = QVBoxLayout()
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        monospace = QFont("Monospace")
+        monospace.setStyleHint(QFont.StyleHint.TypeWriter)
+        self.job_list = QListWidget()
+        self.job_list.setFont(monospace)
+        layout.addWidget(self.job_list)
+
+        button_layout = QHBoxLayout()
+        for text, handler in (("Move Up", lambda: self.move_selected(-1)),
+                              ("Move Down", lambda: self.move_selected(1)),
+                              ("Remove", self.remove_selected),
+                              ("Clear Finished", self.clear_finished)):
+            button = QPushButton(text)
+            button.clicked.connect(handler)
+            button_layout.addWidget(button)
+        self.pause_button = QPushButton()
+        self.pause_button.clicked.connect(self.toggle_paused)
+        button_layout.addWidget(self.pause_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        self.refresh()
+
+    def selected_job_id(self):
+        item = self.job_list.currentItem()
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
+
+    def refresh(self):
+        selected = self.selected_job_id()
+        self.job_list.clear()
+        for job in self.run_queue.jobs():
+            item = QListWidgetItem(format_job_row(job))
+            item.setData(Qt.ItemDataRole.UserRole, job["id"])
+            self.job_list.addItem(item)
+            if job["id"] == selected:
+                self.job_list.setCurrentItem(item)
+
+        counts = self.run_queue.counts()
+        paused = self.run_queue.is_paused()
+        state = "⏸️  Paused" if paused else "▶️  Running"
+        self.status_label.setText(f"{state} · {counts.get(RUNNING, 0)} running · {counts.get(QUEUED, 0)} queued")
+        self.pause_button.setText("Resume" if paused else "Pause")
+
+    def move_selected(self, offset):
+        job_id = self.selected_job_id()
+        if job_id is not None and self.run_queue.move(job_id, offset):
+            self.refresh()
+
+    def remove_selected(self):
+        job_id = self.selected_job_id()
+        if job_id is not None and self.run_queue.remove(job_id):
+            self.refresh()
+
+    def clear_finished(self):
+        self.run_queue.clear_finished()
+        self.refresh()
+
+    def toggle_paused(self):
+        self.run_queue.set_paused(not self.run_queue.is_paused())
+        self.refresh()
+        self.on_change()
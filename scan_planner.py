@@ -0,0 +1,58 @@
+# scan_planner.py
+from site_catalog import load_sites, parse_filter, site_matches, quote_filter_value
+
+DEFAULT_TOP_N = 25
+
+def is_filter_safe_name(name):
+    """Blackbird errors out on names with several spaces (see README); quotes and shell
+    metacharacters would break the double-quoted --filter argument"""
+    return name.count(' ') <= 1 and not any(char in name for char in "'\"`$\\")
+
+def plan_two_pass(filter_text, hit_rates, top_n=DEFAULT_TOP_N, sites=None):
+    """Split one scan into a fast pass over the most productive sites and a long-tail pass
+
+    Both passes are expressed as Blackbird --filter strings. Together they select
+    exactly the sites the original filter selects, so the total work is unchanged.
+    """
+    if not hit_rates:
+        return {'success': False, 'error': "No hit history yet - run a few scans first"}
+
+    # The command runs through a shell, so users type the filter wrapped in double quotes
+    filter_text = (filter_text or "").strip().strip('"').strip()
+    # The long-tail pass appends 'and name!=...', which would bind to the last OR-group only
+    if ' or ' in f" {filter_text.lower()} ":
+        return {'success': False, 'error': "Filters containing 'or' cannot be split into two passes"}
+
+    try:
+        parsed = parse_filter(filter_text)
+    except ValueError as e:
+        return {'success': False, 'error': f"Could not parse filter: {e}"}
+
+    sites = load_sites() if sites is None else sites
+    if parsed and not sites:
+        return {'success': False, 'error': "Site catalog not found - cannot apply the filter to the fast pass"}
+
+    if sites:
+        selected = {site.get("name") for site in sites if site.get("name") and site_matches(site, parsed)}
+    else:
+        selected = set(hit_rates)
+
+    # Most productive sites first, ties broken by name for stable filters
+    ranked = sorted((site for site in hit_rates if site in selected and hit_rates[site] > 0),
+                    key=lambda site: (-hit_rates[site], site))
+    top_sites = [site for site in ranked if is_filter_safe_name(site)][:top_n]
+    if not top_sites:
+        return {'success': False, 'error': "None of the selected sites has produced hits before"}
+
+    first_pass = " or ".join(f"name={quote_filter_value(site)}" for site in top_sites)
+    exclusions = " and ".join(f"name!={quote_filter_value(site)}" for site in top_sites)
+    second_pass = f"{filter_text} and {exclusions}" if filter_text else exclusions
+
+    return {
+        'success': True,
+        'top_sites': top_sites,
+        'first_pass_filter': f'"{first_pass}"',
+        'second_pass_filter': f'"{second_pass}"',
+        'expected_hit_share': sum(hit_rates[site] for site in top_sites) /
+                              max(sum(hit_rates[site] for site in ranked), 1e-9)
+    }
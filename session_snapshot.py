@@ -0,0 +1,223 @@
+# session_snapshot.py
+import os
+import sys
+import json
+import mmap
+import time
+import shutil
+import argparse
+
+from log_index import LogIndex
+from run_history import format_timestamp, format_duration, redact
+
+DEFAULT_SESSION_DIRECTORY = os.path.join("results", "session")
+MANIFEST_NAME = "session.json"
+SNAPSHOT_VERSION = 1
+# Lines of each run log shown in a restored tab; search still covers the whole log
+TAIL_LINES = 200
+
+class SpoolView:
+    """Run log of a past session: memory-mapped on first use, its index loaded on first search"""
+
+    def __init__(self, path, index_path=None, size=None):
+        self.path = path
+        self.index_path = index_path
+        # Bytes covered by the snapshot, anything appended later is ignored
+        self.size = size
+        self.spool = None
+        self.index = None
+
+    def open(self):
+        """The memory-mapped spool, None when it is empty"""
+        if self.spool is None:
+            with open(self.path, 'rb') as f:
+                length = os.fstat(f.fileno()).st_size
+                if self.size is not None:
+                    length = min(length, self.size)
+                if length:
+                    self.spool = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+        return self.spool
+
+    def load_index(self):
+        if self.index is None:
+            if self.index_path:
+                try:
+                    self.index = LogIndex.load(self.index_path)
+                except (OSError, ValueError) as e:
+                    print(f"Warning: Could not load the index of {self.path}, rebuilding it: {e}")
+            if self.index is None:
+                self.index = self.rebuild_index()
+        return self.index
+
+    def rebuild_index(self):
+        index = LogIndex()
+        spool = self.open()
+        if spool is None:
+            return index
+        spool.seek(0)
+        offset = 0
+        for line in iter(spool.readline, b""):
+            index.add(offset, len(line), line.decode('utf-8', errors='replace').rstrip("\n"))
+            offset += len(line)
+        return index
+
+    def search(self, query, regex=False):
+        """Matching line numbers, see LogIndex.search"""
+        spool = self.open()
+        if spool is None:
+            return []
+        return self.load_index().search(self.path, query, regex, spool)
+
+    def read_lines(self, start, end):
+        spool = self.open()
+        if spool is None:
+            return []
+        return self.load_index().read_lines(self.path, start, end, spool)
+
+    def tail(self, count=TAIL_LINES):
+        """Last count lines, found by scanning back from the end of the map (no index needed)"""
+        spool = self.open()
+        if spool is None:
+            return []
+        end = len(spool)
+        if spool[end - 1:end] == b"\n":
+            end -= 1
+        start = end
+        for _ in range(count):
+            start = spool.rfind(b"\n", 0, start)
+            if start == -1:
+                break
+        return spool[start + 1:end].decode('utf-8', errors='replace').split("\n")
+
+    def close(self):
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
+
+class RestoredRun:
+    """Stands in for a finished BlackbirdWorker in a restored tab"""
+
+    restored = True
+
+    def __init__(self, entry):
+        self.run_id = entry.get('run_id')
+        self.stats = entry.get('stats', {})
+        self.hits = [tuple(hit) for hit in entry.get('hits', [])]
+        self.started_at = entry.get('started_at')
+        self.finished_at = entry.get('finished_at')
+        self.stopped = entry.get('stopped', False)
+        self.returncode = entry.get('returncode')
+        self.lines = entry.get('lines', 0)
+        self.run_log = SpoolView(entry['log'], entry.get('index'), entry.get('log_size'))
+
+    def isRunning(self):
+        return False
+
+def run_entry(worker, directory):
+    """Manifest entry of one worker (live or restored), saving its log index into directory"""
+    run_log = worker.run_log
+    index_path = os.path.join(directory, os.path.basename(run_log.path) + ".idx")
+    index = run_log.index
+    if index is not None and not (getattr(worker, 'restored', False) and os.path.exists(index_path)):
+        index.save(index_path)
+    elif index is None and run_log.index_path and os.path.abspath(run_log.index_path) != os.path.abspath(index_path):
+        # A restored log whose index was never loaded: carry the saved file over as is
+        shutil.copyfile(run_log.index_path, index_path)
+    size = run_log.size if run_log.size is not None else os.path.getsize(run_log.path)
+    return {
+        'run_id': worker.run_id,
+        'log': run_log.path,
+        'log_size': size,
+        'index': index_path if os.path.exists(index_path) else None,
+        'lines': len(index) if index is not None else getattr(worker, 'lines', 0),
+        'stats': dict(worker.stats),
+        'hits': [list(hit) for hit in worker.hits if hit],
+        'started_at': worker.started_at,
+        'finished_at': getattr(worker, 'finished_at', None) or time.time(),
+        'stopped': worker.stopped,
+        'returncode': worker.returncode,
+    }
+
+def save_session(tabs, directory=DEFAULT_SESSION_DIRECTORY):
+    """Write the manifest for tabs, a list of dicts with title, settings, workers and current
+
+    Only workers with a run log are kept. Index files no longer referenced are removed.
+    Returns the number of tabs saved.
+    """
+    os.makedirs(directory, exist_ok=True)
+    saved_tabs = []
+    for tab in tabs:
+        runs = []
+        for worker in tab['workers']:
+            if not getattr(worker, 'run_log', None):
+                continue
+            try:
+                runs.append(run_entry(worker, directory))
+            except OSError as e:
+                print(f"Warning: Could not snapshot {worker.run_log.path}: {e}")
+        if runs:
+            # The manifest is plain JSON under results/: no API key or session id in it
+            saved_tabs.append({'title': tab['title'], 'settings': redact(tab['settings']),
+                               'current': tab.get('current', False), 'runs': runs})
+
+    manifest = {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'tabs': saved_tabs}
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, manifest_path)
+
+    referenced = {os.path.basename(run['index']) for tab in saved_tabs for run in tab['runs'] if run['index']}
+    for name in os.listdir(directory):
+        if name.endswith(".idx") and name not in referenced:
+            os.remove(os.path.join(directory, name))
+    return len(saved_tabs)
+
+def load_session(directory=DEFAULT_SESSION_DIRECTORY):
+    """The saved manifest, None when there is none (or it cannot be read)"""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read the session snapshot: {e}")
+        return None
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        return None
+    return manifest
+
+def restored_runs(tab_entry):
+    """RestoredRun objects of a manifest tab whose run logs still exist"""
+    return [RestoredRun(run) for run in tab_entry['runs'] if os.path.exists(run['log'])]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the session Crow restores at startup")
+    parser.add_argument("--directory", default=DEFAULT_SESSION_DIRECTORY)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="Tabs and runs of the saved session")
+    sub.add_parser("clear", help="Forget the saved session (run logs are kept)")
+    args = parser.parse_args(argv)
+
+    if args.command == "clear":
+        if os.path.isdir(args.directory):
+            shutil.rmtree(args.directory)
+        print("🧹 Session snapshot removed")
+        return 0
+
+    manifest = load_session(args.directory)
+    if not manifest:
+        print("No session snapshot")
+        return 0
+    print(f"Session saved {format_timestamp(manifest['saved_at'])}, {len(manifest['tabs'])} tab(s)")
+    for tab in manifest['tabs']:
+        print(f"  {tab['title']}")
+        for run in tab['runs']:
+            duration = (run['finished_at'] - run['started_at']) if run['started_at'] else 0
+            missing = "" if os.path.exists(run['log']) else "  (run log missing)"
+            print(f"    run #{run['run_id']}  {run['lines']} lines  {len(run['hits'])} hit(s)  "
+                  f"{format_duration(duration)}  {run['log']}{missing}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
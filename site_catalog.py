@@ -0,0 +1,115 @@
+# site_catalog.py
+import os
+import json
+import hashlib
+import re
+
+# Blackbird ships the WhatsMyName catalog next to blackbird.py
+DEFAULT_CATALOG_PATH = os.path.join("data", "wmn-data.json")
+
+_version_cache = {}
+
+def catalog_version(path=DEFAULT_CATALOG_PATH):
+    """Short content hash of the site catalog, 'unknown' if it is missing"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return "unknown"
+
+    cached = _version_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    version = digest.hexdigest()[:12]
+    _version_cache[path] = (mtime, version)
+    return version
+
+def load_sites(path=DEFAULT_CATALOG_PATH):
+    """Return the list of site dicts from the catalog, or [] if unavailable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+    if isinstance(data, dict):
+        return data.get("sites", [])
+    return data if isinstance(data, list) else []
+
+# Blackbird --filter syntax: <property><operator><value> joined by 'and' / 'or'
+FILTER_PROPERTIES = ("name", "cat", "uri_check", "e_code", "e_string", "m_string", "m_code")
+FILTER_CONDITION_REGEX = re.compile(
+    r"\s*(?P<prop>" + "|".join(FILTER_PROPERTIES) + r")\s*(?P<op>>=|<=|!=|=|~|>|<)\s*"
+    r"(?P<value>'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\S+)\s*"
+)
+FILTER_JOIN_REGEX = re.compile(r"\s*\b(and|or)\b\s*", re.IGNORECASE)
+
+def parse_filter(filter_text):
+    """Parse a filter into a list of OR-groups, each a list of AND-ed (prop, op, value)
+
+    Returns None for an empty filter and raises ValueError on syntax errors.
+    """
+    text = (filter_text or "").strip().strip('"')
+    if not text:
+        return None
+
+    groups = [[]]
+    position = 0
+    while True:
+        match = FILTER_CONDITION_REGEX.match(text, position)
+        if not match:
+            raise ValueError(f"Invalid filter near: {text[position:position + 30]!r}")
+        value = match.group('value')
+        if value[:1] in ("'", '"') and value[-1:] == value[:1]:
+            value = value[1:-1].replace("\\'", "'").replace('\\"', '"')
+        groups[-1].append((match.group('prop'), match.group('op'), value))
+        position = match.end()
+        if position >= len(text):
+            return groups
+
+        join = FILTER_JOIN_REGEX.match(text, position)
+        if not join:
+            raise ValueError(f"Expected 'and' / 'or' near: {text[position:position + 30]!r}")
+        if join.group(1).lower() == "or":
+            groups.append([])
+        position = join.end()
+
+def _condition_matches(site, prop, op, value):
+    actual = site.get(prop)
+    if actual is None:
+        return op == "!="
+    if op in (">", "<", ">=", "<="):
+        try:
+            actual, value = float(actual), float(value)
+        except (TypeError, ValueError):
+            return False
+        return {">": actual > value, "<": actual < value,
+                ">=": actual >= value, "<=": actual <= value}[op]
+    actual = str(actual)
+    if op == "~":
+        return value.lower() in actual.lower()
+    if op == "=":
+        return actual.lower() == value.lower()
+    return actual.lower() != value.lower()
+
+def site_matches(site, parsed_filter):
+    """Evaluate a parsed filter against one catalog site ('and' binds tighter than 'or')"""
+    if not parsed_filter:
+        return True
+    return any(all(_condition_matches(site, *condition) for condition in group)
+               for group in parsed_filter)
+
+def matching_sites(filter_text, sites=None):
+    """Names of catalog sites selected by a filter"""
+    sites = load_sites() if sites is None else sites
+    parsed = parse_filter(filter_text)
+    return [site.get("name") for site in sites if site.get("name") and site_matches(site, parsed)]
+
+def quote_filter_value(value):
+    """Quote a value the way the filter generator does (single quotes when it has spaces)"""
+    if ' ' in value:
+        return "'" + value.replace("'", "\\'") + "'"
+    return value
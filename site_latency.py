@@ -0,0 +1,131 @@
+# site_latency.py
+import os
+import re
+import glob
+import math
+from urllib.parse import urlparse
+
+from blackbird_output import parse_site
+from site_catalog import load_sites
+
+# Blackbird's verbose logs (logs/*.log) and --verbose output carry per-request lines such as
+#   2024-05-01 10:00:00 DEBUG GET https://github.com/user - 200 - 0.412s
+#   [GitHub] status=404 elapsed=1.2s
+#   [Twitch] ClientConnectorError: Cannot connect to host twitch.tv
+# The patterns below are deliberately loose so minor format changes keep working.
+DEFAULT_LOG_DIRECTORY = "logs"
+URL_REGEX = re.compile(r'https?://[^\s\'"<>]+')
+STATUS_REGEX = re.compile(r'(?:\bstatus(?:[ _]code)?|\bHTTP(?:/\d\.\d)?|\bcode|\s-)\s*[:=]?\s*([1-5]\d\d)\b', re.IGNORECASE)
+DURATION_REGEX = re.compile(r'(\d+(?:\.\d+)?)\s*(ms|s|sec|secs|seconds)\b', re.IGNORECASE)
+ERROR_REGEX = re.compile(r'\b([A-Za-z]*(?:Error|Exception|Timeout))\b')
+TIMEOUT_REGEX = re.compile(r'time(?:d)?\s*out|timeout', re.IGNORECASE)
+
+_host_to_site = None
+
+def host_to_site():
+    """Map catalog hostnames to site names so log lines with only a URL can be attributed"""
+    global _host_to_site
+    if _host_to_site is None:
+        _host_to_site = {}
+        for site in load_sites():
+            url = site.get("uri_check") or ""
+            host = urlparse(url.replace("{account}", "x")).hostname
+            if host and site.get("name"):
+                _host_to_site.setdefault(host.lower(), site["name"])
+    return _host_to_site
+
+def parse_latency_line(text):
+    """Extract {'site', 'duration', 'status', 'error'} from a log/output line, or None
+
+    duration is in seconds. Lines without a site (or URL) and without any
+    measurement are ignored.
+    """
+    site = parse_site(text)
+    url_match = URL_REGEX.search(text)
+    if not site and url_match:
+        host = (urlparse(url_match.group(0)).hostname or "").lower()
+        site = host_to_site().get(host) or host or None
+    if not site:
+        return None
+
+    # Drop the URL before looking for numbers, paths often contain digits
+    remainder = URL_REGEX.sub(" ", text)
+
+    duration = None
+    duration_match = DURATION_REGEX.search(remainder)
+    if duration_match:
+        value = float(duration_match.group(1))
+        duration = value / 1000 if duration_match.group(2).lower() == "ms" else value
+
+    status_match = STATUS_REGEX.search(remainder)
+    status = int(status_match.group(1)) if status_match else None
+
+    error = None
+    error_match = ERROR_REGEX.search(remainder)
+    if error_match:
+        error = error_match.group(1)
+    elif TIMEOUT_REGEX.search(remainder):
+        error = "Timeout"
+
+    if duration is None and status is None and error is None:
+        return None
+    return {'site': site, 'duration': duration, 'status': status, 'error': error}
+
+def collect_from_logs(log_directory=DEFAULT_LOG_DIRECTORY):
+    """Parse every log file into a list of latency records"""
+    records = []
+    for path in sorted(glob.glob(os.path.join(log_directory, "**", "*.log"), recursive=True)):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    record = parse_latency_line(line.strip())
+                    if record:
+                        records.append(record)
+        except OSError as e:
+            print(f"Warning: Could not read {path}: {e}")
+    return records
+
+def summarize(records):
+    """Group records per site: {site: {'durations': [...], 'requests': n, 'errors': n}}"""
+    sites = {}
+    for record in records:
+        entry = sites.setdefault(record['site'], {'durations': [], 'requests': 0, 'errors': 0})
+        entry['requests'] += 1
+        if record['error'] or (record['status'] and record['status'] >= 500):
+            entry['errors'] += 1
+        elif record['duration'] is not None:
+            entry['durations'].append(record['duration'])
+    return sites
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+def snapshot_log_offsets(log_directory=DEFAULT_LOG_DIRECTORY):
+    """Current size of every log file, taken when a run starts"""
+    offsets = {}
+    for path in glob.glob(os.path.join(log_directory, "**", "*.log"), recursive=True):
+        try:
+            offsets[path] = os.path.getsize(path)
+        except OSError:
+            continue
+    return offsets
+
+def collect_new_log_records(offsets, log_directory=DEFAULT_LOG_DIRECTORY):
+    """Latency records from log lines written since snapshot_log_offsets()"""
+    records = []
+    for path in glob.glob(os.path.join(log_directory, "**", "*.log"), recursive=True):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                f.seek(offsets.get(path, 0))
+                for line in f:
+                    record = parse_latency_line(line.strip())
+                    if record:
+                        records.append(record)
+        except OSError:
+            continue
+    return records
@@ -0,0 +1,215 @@
+# stall_watchdog.py
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import traceback
+from collections import Counter
+
+from metrics import REGISTRY
+from run_history import format_timestamp
+
+DEFAULT_LOG_PATH = os.path.join("results", "stalls.jsonl")
+DEFAULT_THRESHOLD = 0.1
+# How often the watchdog thread looks at the heartbeat (and samples a stalled stack)
+CHECK_INTERVAL = 0.02
+STACK_LIMIT = 40
+# A stall this long is written down while it lasts (again each time it doubles), so a
+# hang that ends with Crow being killed still leaves a record
+IN_PROGRESS_AFTER = 2.0
+# Frames from these files only say "Qt was running the event loop"
+OWN_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+GUI_STALLS = REGISTRY.counter(
+    "crow_gui_stalls_total", "GUI event-loop stalls above the watchdog threshold", ["source"])
+GUI_STALL_SECONDS = REGISTRY.histogram(
+    "crow_gui_stall_seconds", "Duration of GUI event-loop stalls above the watchdog threshold",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+
+def stall_source(frames):
+    """Innermost frame of Crow's own code ('file:function'), else the innermost frame"""
+    for frame in reversed(frames):
+        if os.path.abspath(frame.filename).startswith(OWN_DIRECTORY + os.sep) and \
+                os.path.basename(frame.filename) != "stall_watchdog.py":
+            return f"{os.path.basename(frame.filename)}:{frame.name}"
+    if frames:
+        return f"{os.path.basename(frames[-1].filename)}:{frames[-1].name}"
+    return "unknown"
+
+class StallWatchdog:
+    """Watches the GUI heartbeat from a thread of its own and records the stack of every stall
+
+    The GUI thread calls beat() from a QTimer every heartbeat_interval seconds. When no
+    beat arrives for heartbeat_interval + threshold, the GUI thread is stuck: its stack
+    is sampled every CHECK_INTERVAL until the next beat, and the stall is logged with the
+    stack seen most often. Long stalls get in-progress records first, which the final
+    record (same id) replaces in load_stalls().
+    """
+
+    def __init__(self, heartbeat_interval, threshold=DEFAULT_THRESHOLD, path=DEFAULT_LOG_PATH, thread_id=None):
+        self.heartbeat_interval = heartbeat_interval
+        self.threshold = threshold
+        self.path = path
+        self.thread_id = thread_id or threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stall = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="stall-watchdog", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def beat(self):
+        """Called on the GUI thread by its heartbeat timer"""
+        self.last_beat = time.monotonic()
+
+    def run(self):
+        while not self.stopped.wait(CHECK_INTERVAL):
+            last_beat = self.last_beat
+            due = last_beat + self.heartbeat_interval
+            if self.stall and last_beat != self.stall['beat']:
+                # The event loop is back: the stall lasted until this beat
+                self.finish_stall(last_beat - self.stall['due'])
+            elif time.monotonic() - due > self.threshold:
+                if not self.stall:
+                    wall_time = time.time()
+                    self.stall = {'beat': last_beat, 'due': due, 'wall_time': wall_time,
+                                  'id': f"{os.getpid()}-{int(wall_time * 1000)}",
+                                  'samples': Counter(), 'stacks': {}, 'report_after': IN_PROGRESS_AFTER}
+                self.sample_stack()
+                duration = time.monotonic() - due
+                if duration >= self.stall['report_after'] and self.stall['samples']:
+                    self.stall['report_after'] = duration * 2
+                    self.write_record(self.stall_record(self.stall, duration, in_progress=True))
+
+    def sample_stack(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        frames = traceback.extract_stack(frame, limit=STACK_LIMIT)
+        # Keyed by function and line: samples taken in the same place are the same stack
+        key = tuple((f.filename, f.lineno, f.name) for f in frames)
+        self.stall['samples'][key] += 1
+        self.stall['stacks'].setdefault(key, frames)
+
+    def finish_stall(self, duration):
+        stall, self.stall = self.stall, None
+        if not stall['samples']:
+            return
+        record = self.stall_record(stall, duration)
+        GUI_STALLS.inc(source=record['source'])
+        GUI_STALL_SECONDS.observe(duration)
+        self.write_record(record)
+
+    def stall_record(self, stall, duration, in_progress=False):
+        """Diagnostics record of a stall with the stack seen most often so far"""
+        key, count = stall['samples'].most_common(1)[0]
+        frames = stall['stacks'][key]
+        return {
+            'id': stall['id'],
+            'time': stall['wall_time'],
+            'duration': round(duration, 4),
+            'threshold': self.threshold,
+            'source': stall_source(frames),
+            'samples': sum(stall['samples'].values()),
+            'dominant_samples': count,
+            'stack': traceback.format_list(frames),
+            'in_progress': in_progress,
+        }
+
+    def write_record(self, record):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"Warning: Could not write stall diagnostics: {e}")
+
+def load_stalls(path=DEFAULT_LOG_PATH):
+    """Stall records from the diagnostics file, oldest first
+
+    Only the last record of each stall id counts: the final one, or the latest
+    in-progress one when Crow never got to finish the stall.
+    """
+    stalls = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f):
+                try:
+                    stall = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                # Dicts keep first-insertion order, so a stall stays where it started
+                stalls[stall.get('id', number)] = stall
+    except FileNotFoundError:
+        pass
+    return list(stalls.values())
+
+def summarize(stalls):
+    """Stall sources by total blocked time: count, total, max and the stack of the longest stall"""
+    sources = {}
+    for stall in stalls:
+        entry = sources.setdefault(stall['source'], {'source': stall['source'], 'count': 0, 'total': 0.0,
+                                                     'max': 0.0, 'last': 0, 'stack': []})
+        entry['count'] += 1
+        entry['total'] += stall['duration']
+        entry['last'] = max(entry['last'], stall['time'])
+        if stall['duration'] >= entry['max']:
+            entry['max'] = stall['duration']
+            entry['stack'] = stall['stack']
+    return sorted(sources.values(), key=lambda entry: entry['total'], reverse=True)
+
+def format_summary_row(entry):
+    """One-line summary used by the CLI and the GUI stall view"""
+    return (f"{entry['count']:>5}x  total {entry['total']:>8.2f}s  max {entry['max']:>7.2f}s  "
+            f"last {format_timestamp(entry['last'])}  {entry['source']}")
+
+def watchdog_from_env(heartbeat_interval):
+    """Watchdog for the calling (GUI) thread; CROW_STALL_THRESHOLD_MS sets the threshold, 0 disables it"""
+    try:
+        threshold_ms = float(os.environ.get("CROW_STALL_THRESHOLD_MS", DEFAULT_THRESHOLD * 1000))
+    except ValueError:
+        print("Warning: CROW_STALL_THRESHOLD_MS is not a number, using the default")
+        threshold_ms = DEFAULT_THRESHOLD * 1000
+    if threshold_ms <= 0:
+        return None
+    path = os.environ.get("CROW_STALL_LOG", DEFAULT_LOG_PATH)
+    return StallWatchdog(heartbeat_interval, threshold_ms / 1000, path).start()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize GUI stalls recorded by the watchdog")
+    parser.add_argument("--path", default=os.environ.get("CROW_STALL_LOG", DEFAULT_LOG_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary_parser = sub.add_parser("summary", help="Top stall sources")
+    summary_parser.add_argument("-n", "--limit", type=int, default=10)
+    summary_parser.add_argument("--stacks", action="store_true", help="Show the stack of each source's longest stall")
+    tail_parser = sub.add_parser("tail", help="Most recent stalls")
+    tail_parser.add_argument("-n", "--limit", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    stalls = load_stalls(args.path)
+    if not stalls:
+        print(f"No stalls recorded in {args.path}")
+        return 0
+
+    if args.command == "summary":
+        for entry in summarize(stalls)[:args.limit]:
+            print(format_summary_row(entry))
+            if args.stacks:
+                print("".join(entry['stack']))
+    elif args.command == "tail":
+        for stall in stalls[-args.limit:]:
+            unfinished = "  (unfinished)" if stall.get('in_progress') else ""
+            print(f"{format_timestamp(stall['time'])}  {stall['duration']:>7.2f}s  {stall['source']}{unfinished}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# target_preflight.py
+import os
+import re
+import sys
+import argparse
+import unicodedata
+
+from site_catalog import load_sites, matching_sites
+from timeout_tuner import load_site_stats, entry_percentile
+from run_history import format_duration
+from breach_client import rate_per_minute
+
+# Same address check as the Breach.vip email module
+EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+USERNAME_REGEX = re.compile(r'^\S{2,}$')
+INVALID_SAMPLES = 10
+# Spacing of breach.vip searches enforced by the shared rate limiter
+BREACH_SECONDS_PER_LOOKUP = 60 / rate_per_minute()
+DEAD_ERROR_RATE = 0.8
+
+def normalize_entry(text):
+    """NFKC-normalized, trimmed entry and its dedupe key (case-folded)"""
+    entry = unicodedata.normalize("NFKC", text).strip()
+    return entry, entry.casefold()
+
+def is_valid_entry(entry, kind):
+    regex = EMAIL_REGEX if kind == "email" else USERNAME_REGEX
+    return bool(regex.match(entry))
+
+def analyze_file(path, kind="username"):
+    """Stream a target file: valid unique entries (first spelling kept) and row counts"""
+    entries = []
+    seen = set()
+    stats = {'rows': 0, 'blank': 0, 'valid': 0, 'invalid': 0, 'duplicates': 0, 'normalized': 0,
+             'invalid_samples': []}
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                stats['rows'] += 1
+                entry, key = normalize_entry(line)
+                if not entry:
+                    stats['blank'] += 1
+                    continue
+                if entry != line.strip():
+                    stats['normalized'] += 1
+                if not is_valid_entry(entry, kind):
+                    stats['invalid'] += 1
+                    if len(stats['invalid_samples']) < INVALID_SAMPLES:
+                        stats['invalid_samples'].append(entry)
+                    continue
+                stats['valid'] += 1
+                if key in seen:
+                    stats['duplicates'] += 1
+                    continue
+                seen.add(key)
+                entries.append(entry)
+    except OSError as e:
+        return {'success': False, 'error': f"Could not read {path}: {e}"}
+    # Running the original file would differ from running the deduplicated one
+    changed = bool(stats['blank'] or stats['invalid'] or stats['duplicates'] or stats['normalized'])
+    return {'success': True, 'path': path, 'kind': kind, 'entries': entries, 'unique': len(entries),
+            'changed': changed, **stats}
+
+def estimate_runtime(targets, filter_text="", timeout=30, site_stats=None, sites=None, breach=False,
+                     percentile=95):
+    """Requests and seconds for a run over targets entries
+
+    Blackbird checks a target's sites concurrently, so a target takes about as long
+    as its slowest site capped by the timeout (dead sites cost the full timeout).
+    Sites without latency samples are left out; without any latency history every
+    target is assumed to hit the timeout.
+    """
+    sites = load_sites() if sites is None else sites
+    try:
+        names = matching_sites(filter_text, sites) if sites else None
+    except ValueError:
+        names = None
+    site_stats = load_site_stats() if site_stats is None else site_stats
+
+    measured = []
+    for name in (names if names is not None else site_stats):
+        entry = site_stats.get(name)
+        if not entry or not entry['requests']:
+            continue
+        latency = entry_percentile(entry, percentile)
+        if entry['errors'] / entry['requests'] >= DEAD_ERROR_RATE:
+            latency = timeout
+        elif latency is None:
+            # Seen, but never timed: no reason to assume it hangs
+            continue
+        measured.append(min(latency, timeout))
+
+    per_target = max(measured) if measured else timeout
+    seconds = per_target * targets
+    breach_seconds = targets * BREACH_SECONDS_PER_LOOKUP if breach else 0
+    return {
+        'sites': len(names) if names is not None else None,
+        'requests': targets * len(names) if names is not None else None,
+        'measured_sites': len(measured),
+        'seconds_per_target': per_target,
+        'blackbird_seconds': seconds,
+        'breach_seconds': breach_seconds,
+        'total_seconds': seconds + breach_seconds,
+    }
+
+def deduped_path(path):
+    root, extension = os.path.splitext(path)
+    return f"{root}.dedup{extension or '.txt'}"
+
+def write_entries(entries, path):
+    """Write one entry per line, atomically"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(entry + "\n")
+    os.replace(temp_path, path)
+    return path
+
+def format_preflight(analysis, estimate):
+    """Human readable report for the CLI and the GUI dialog"""
+    if not analysis['success']:
+        return f"❌ {analysis['error']}"
+    lines = [
+        f"File:             {os.path.basename(analysis['path'])} ({analysis['kind']}s)",
+        f"Rows:             {analysis['rows']} ({analysis['blank']} blank)",
+        f"Valid:            {analysis['valid']}",
+        f"Invalid:          {analysis['invalid']}",
+        f"Duplicates:       {analysis['duplicates']} (case, spacing and Unicode form ignored)",
+        f"Normalized:       {analysis['normalized']} (Unicode NFKC)",
+        f"Unique targets:   {analysis['unique']}",
+    ]
+    if estimate['sites'] is not None:
+        lines.append(f"Sites per target: {estimate['sites']}")
+        lines.append(f"Total requests:   {estimate['requests']}")
+    if estimate['measured_sites']:
+        lines.append(f"Runtime estimate: {format_duration(estimate['total_seconds'])} "
+                     f"(~{format_duration(estimate['seconds_per_target'])} per target, "
+                     f"latency history of {estimate['measured_sites']} site(s))")
+    else:
+        lines.append(f"Runtime estimate: up to {format_duration(estimate['total_seconds'])} "
+                     f"(no latency history, timeout per target)")
+    if estimate['breach_seconds']:
+        lines.append(f"  incl. Breach.vip rate limit: {format_duration(estimate['breach_seconds'])}")
+    if analysis['invalid_samples']:
+        lines.extend(["", "Invalid rows (first ones):"])
+        lines.extend(f"  {sample}" for sample in analysis['invalid_samples'])
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate, dedupe and estimate a Crow target file")
+    parser.add_argument("path")
+    parser.add_argument("--kind", choices=("username", "email"), default="username")
+    parser.add_argument("--filter", default="", help="Blackbird site filter of the planned run")
+    parser.add_argument("--timeout", type=int, default=30)
+    parser.add_argument("--breach", action="store_true", help="Include Breach.vip lookups")
+    parser.add_argument("--write", action="store_true", help="Write the deduplicated file next to the original")
+    args = parser.parse_args(argv)
+
+    analysis = analyze_file(args.path, args.kind)
+    if not analysis['success']:
+        print(f"❌ {analysis['error']}")
+        return 1
+    estimate = estimate_runtime(analysis['unique'], args.filter, args.timeout, breach=args.breach)
+    print(format_preflight(analysis, estimate))
+    if args.write:
+        print(f"✅ Wrote {write_entries(analysis['entries'], deduped_path(args.path))}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# telemetry_store.py
+import sys
+import time
+import argparse
+import threading
+
+from crow_db import connect
+
+# Histogram bucket upper bounds in milliseconds, the last bucket catches everything slower
+LATENCY_BUCKETS_MS = [50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 4000, 5000,
+                      7500, 10000, 15000, 20000, 30000, 45000, 60000, 90000, 120000, 180000, 300000]
+OVERFLOW_BUCKET_MS = 10 ** 9
+
+# site_requests is append-only; the three rollup tables are maintained in the same
+# transaction so histograms and error tables never have to scan the raw rows.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS site_requests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER,
+    recorded_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    site TEXT NOT NULL,
+    duration_ms INTEGER,
+    status INTEGER,
+    error_class TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_site_requests_site ON site_requests(site, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_site_requests_run ON site_requests(run_id);
+
+CREATE TABLE IF NOT EXISTS site_totals (
+    site TEXT PRIMARY KEY,
+    requests INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    timed INTEGER NOT NULL DEFAULT 0,
+    duration_ms_sum INTEGER NOT NULL DEFAULT 0,
+    last_seen REAL
+);
+CREATE TABLE IF NOT EXISTS site_latency_histogram (
+    site TEXT NOT NULL,
+    bucket_ms INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (site, bucket_ms)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS site_error_classes (
+    site TEXT NOT NULL,
+    error_class TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (site, error_class)
+) WITHOUT ROWID;
+"""
+
+def bucket_for(duration_ms):
+    for bound in LATENCY_BUCKETS_MS:
+        if duration_ms <= bound:
+            return bound
+    return OVERFLOW_BUCKET_MS
+
+def is_error(record):
+    return bool(record.get('error')) or (record.get('status') or 0) >= 500
+
+def histogram_percentile(histogram, pct):
+    """Percentile in seconds from [(bucket_ms, count)], using bucket upper bounds"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    threshold = pct / 100 * total
+    running = 0
+    for bucket_ms, count in sorted(histogram):
+        running += count
+        if running >= threshold:
+            return min(bucket_ms, LATENCY_BUCKETS_MS[-1]) / 1000
+    return LATENCY_BUCKETS_MS[-1] / 1000
+
+class TelemetryStore:
+    """Append-only per-site request telemetry with pre-aggregated rollups"""
+
+    def __init__(self, db_path=None):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    def record(self, run_id, records, source="output", recorded_at=None):
+        """Append site_latency records ({'site', 'duration', 'status', 'error'}) in one transaction"""
+        if not records:
+            return 0
+        recorded_at = recorded_at or time.time()
+        rows = []
+        totals = {}
+        buckets = {}
+        errors = {}
+        for record in records:
+            duration_ms = int(record['duration'] * 1000) if record.get('duration') is not None else None
+            rows.append((run_id, recorded_at, source, record['site'], duration_ms,
+                         record.get('status'), record.get('error')))
+
+            total = totals.setdefault(record['site'], [0, 0, 0, 0])
+            total[0] += 1
+            if is_error(record):
+                total[1] += 1
+                error_class = record.get('error') or f"HTTP {record.get('status')}"
+                key = (record['site'], error_class)
+                errors[key] = errors.get(key, 0) + 1
+            elif duration_ms is not None:
+                total[2] += 1
+                total[3] += duration_ms
+                key = (record['site'], bucket_for(duration_ms))
+                buckets[key] = buckets.get(key, 0) + 1
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO site_requests (run_id, recorded_at, source, site, duration_ms, status, error_class) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.executemany(
+                """INSERT INTO site_totals (site, requests, errors, timed, duration_ms_sum, last_seen)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(site) DO UPDATE SET requests = requests + excluded.requests,
+                       errors = errors + excluded.errors, timed = timed + excluded.timed,
+                       duration_ms_sum = duration_ms_sum + excluded.duration_ms_sum,
+                       last_seen = excluded.last_seen""",
+                [(site, *values, recorded_at) for site, values in totals.items()])
+            self.conn.executemany(
+                """INSERT INTO site_latency_histogram (site, bucket_ms, count) VALUES (?, ?, ?)
+                   ON CONFLICT(site, bucket_ms) DO UPDATE SET count = count + excluded.count""",
+                [(site, bucket, count) for (site, bucket), count in buckets.items()])
+            self.conn.executemany(
+                """INSERT INTO site_error_classes (site, error_class, count) VALUES (?, ?, ?)
+                   ON CONFLICT(site, error_class) DO UPDATE SET count = count + excluded.count""",
+                [(site, error_class, count) for (site, error_class), count in errors.items()])
+        return len(rows)
+
+    def histogram(self, site):
+        """[(bucket_ms, count)] for one site"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT bucket_ms, count FROM site_latency_histogram WHERE site = ? ORDER BY bucket_ms",
+                (site,)).fetchall()
+        return [(row["bucket_ms"], row["count"]) for row in rows]
+
+    def error_rates(self, limit=50, min_requests=1):
+        """Sites ordered by error rate, with their most common error class"""
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT t.site, t.requests, t.errors, 1.0 * t.errors / t.requests AS error_rate,
+                          (SELECT error_class FROM site_error_classes e WHERE e.site = t.site
+                           ORDER BY e.count DESC LIMIT 1) AS top_error
+                   FROM site_totals t WHERE t.requests >= ?
+                   ORDER BY error_rate DESC, t.requests DESC LIMIT ?""",
+                (min_requests, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def slowest_sites(self, limit=50):
+        """Sites ordered by mean latency"""
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT site, timed, 1.0 * duration_ms_sum / timed / 1000 AS mean_seconds
+                   FROM site_totals WHERE timed > 0 ORDER BY mean_seconds DESC LIMIT ?""",
+                (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def site_stats(self):
+        """Per-site stats in the shape timeout_tuner.recommend() expects
+
+        Sites seen only on untimed lines (no latency sample, no error) say nothing about
+        speed or health and are left out.
+        """
+        with self.lock:
+            totals = self.conn.execute(
+                "SELECT site, requests, errors FROM site_totals WHERE timed > 0 OR errors > 0").fetchall()
+            histograms = self.conn.execute(
+                "SELECT site, bucket_ms, count FROM site_latency_histogram").fetchall()
+        stats = {row["site"]: {'requests': row["requests"], 'errors': row["errors"], 'histogram': []}
+                 for row in totals}
+        for row in histograms:
+            if row["site"] in stats:
+                stats[row["site"]]['histogram'].append((row["bucket_ms"], row["count"]))
+        return stats
+
+def format_histogram(site, histogram):
+    total = sum(count for _, count in histogram)
+    if not total:
+        return f"No latency data for {site}"
+    lines = [f"Latency histogram for {site} ({total} samples)"]
+    widest = max(count for _, count in histogram)
+    for bucket_ms, count in histogram:
+        label = "slower" if bucket_ms == OVERFLOW_BUCKET_MS else f"≤{bucket_ms / 1000:g}s"
+        lines.append(f"{label:>9} {count:>7} {'█' * max(1, int(40 * count / widest))}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query Crow's per-site latency and error telemetry")
+    parser.add_argument("--db", help="Path to the Crow database (default: results/crow.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    histogram_parser = sub.add_parser("histogram", help="Latency histogram of one site")
+    histogram_parser.add_argument("site")
+
+    errors_parser = sub.add_parser("errors", help="Error-rate table")
+    errors_parser.add_argument("-n", "--limit", type=int, default=30)
+    errors_parser.add_argument("--min-requests", type=int, default=3)
+
+    slow_parser = sub.add_parser("slowest", help="Slowest sites by mean latency")
+    slow_parser.add_argument("-n", "--limit", type=int, default=30)
+
+    args = parser.parse_args(argv)
+    store = TelemetryStore(args.db)
+
+    if args.command == "histogram":
+        print(format_histogram(args.site, store.histogram(args.site)))
+    elif args.command == "errors":
+        print(f"{'site':<30} {'requests':>9} {'errors':>7} {'rate':>6}  top error")
+        for row in store.error_rates(args.limit, args.min_requests):
+            print(f"{row['site'][:30]:<30} {row['requests']:>9} {row['errors']:>7} "
+                  f"{row['error_rate']:>6.0%}  {row['top_error'] or '-'}")
+    elif args.command == "slowest":
+        print(f"{'site':<30} {'samples':>8} {'mean':>8}")
+        for row in store.slowest_sites(args.limit):
+            print(f"{row['site'][:30]:<30} {row['timed']:>8} {row['mean_seconds']:>7.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# timeout_tuner.py
+import sys
+import math
+import argparse
+
+from site_latency import collect_from_logs, summarize, percentile, DEFAULT_LOG_DIRECTORY
+from telemetry_store import TelemetryStore, histogram_percentile
+from scan_planner import is_filter_safe_name
+from site_catalog import quote_filter_value
+
+MIN_TIMEOUT = 1      # Same range as the GUI's timeout_spinbox
+MAX_TIMEOUT = 300
+HEADROOM = 1.2       # Margin on top of the observed percentile
+
+def entry_percentile(entry, pct):
+    """Latency percentile of a site from raw durations (logs) or a histogram (telemetry store)"""
+    if entry.get('durations'):
+        return percentile(entry['durations'], pct)
+    if entry.get('histogram'):
+        return histogram_percentile(entry['histogram'], pct)
+    return None
+
+def recommend(site_stats, target_percentile=95, current_timeout=30, min_samples=3,
+              dead_error_rate=0.8, targets=1):
+    """Recommend a global timeout and an exclusion list from per-site latency stats
+
+    site_stats maps sites to {'requests', 'errors'} plus either 'durations'
+    (site_latency.summarize) or 'histogram' (TelemetryStore.site_stats). Blackbird checks all
+    sites of a target concurrently, so a target takes about as long as its
+    slowest site, capped by the timeout; dead sites always cost the full timeout.
+    Only the error rate marks a site dead, sites without latency samples are left out.
+    """
+    latencies = {}
+    dead = {}
+    for site, entry in site_stats.items():
+        if entry['requests'] < min_samples:
+            continue
+        error_rate = entry['errors'] / entry['requests']
+        latency = entry_percentile(entry, target_percentile)
+        if error_rate >= dead_error_rate:
+            dead[site] = f"dead ({error_rate:.0%} errors)"
+        elif latency is not None:
+            # Sites answering without timing information are neither dead nor slow
+            latencies[site] = latency
+
+    if not latencies:
+        return {'success': False, 'error': f"Not enough data (need {min_samples}+ samples per site)"}
+
+    # The timeout lets target_percentile% of sites answer at their own target percentile
+    recommended = percentile(list(latencies.values()), target_percentile) * HEADROOM
+    recommended = max(MIN_TIMEOUT, min(MAX_TIMEOUT, int(math.ceil(recommended))))
+
+    # Sites that normally answer slower than the recommendation are chronically slow
+    excluded = dict(dead)
+    kept = {}
+    for site, latency in latencies.items():
+        if latency > recommended:
+            excluded[site] = f"slow (p{target_percentile} {latency:.1f}s)"
+        else:
+            kept[site] = latency
+    if not kept:
+        return {'success': False,
+                'error': f"Every measured site answers slower than the recommended {recommended}s timeout"}
+
+    # Dead sites hang until the timeout, the others cost their latency capped by it
+    current_costs = [min(latency, current_timeout) for latency in latencies.values()]
+    current_costs += [current_timeout] * len(dead)
+    current_runtime = max(current_costs) * targets
+    projected_runtime = max(kept.values()) * targets
+
+    safe_exclusions = [site for site in sorted(excluded) if is_filter_safe_name(site)]
+    exclusion_filter = " and ".join(f"name!={quote_filter_value(site)}" for site in safe_exclusions)
+
+    return {
+        'success': True,
+        'recommended_timeout': recommended,
+        'current_timeout': current_timeout,
+        'sites_measured': len(site_stats),
+        'excluded': excluded,
+        'exclusion_filter': exclusion_filter,
+        'current_runtime': current_runtime,
+        'projected_runtime': projected_runtime,
+        'saving': max(0.0, current_runtime - projected_runtime),
+        # Sites whose usual answer arrives after the current timeout, i.e. lost hits
+        'cut_off_sites': sum(1 for latency in kept.values() if latency > current_timeout)
+    }
+
+def combine_filters(user_filter, exclusion_filter):
+    """AND an exclusion filter onto the user's filter, or None when that is not expressible"""
+    user_filter = (user_filter or "").strip().strip('"').strip()
+    if not exclusion_filter:
+        return f'"{user_filter}"' if user_filter else ""
+    if ' or ' in f" {user_filter.lower()} ":
+        return None
+    combined = f"{user_filter} and {exclusion_filter}" if user_filter else exclusion_filter
+    return f'"{combined}"'
+
+def format_recommendation(result):
+    """Human readable report for the CLI and the GUI dialog"""
+    if not result['success']:
+        return f"❌ {result['error']}"
+    lines = [
+        f"Sites measured:        {result['sites_measured']}",
+        f"Current timeout:       {result['current_timeout']}s",
+        f"Recommended timeout:   {result['recommended_timeout']}s",
+        f"Projected runtime:     {result['current_runtime']:.1f}s → {result['projected_runtime']:.1f}s "
+        f"(saves {result['saving']:.1f}s)",
+    ]
+    if result['cut_off_sites']:
+        lines.append(f"⚠️  The current timeout cuts off {result['cut_off_sites']} site(s) that usually answer")
+    lines.extend(["", f"Sites to exclude ({len(result['excluded'])}):"])
+    for site, reason in sorted(result['excluded'].items()):
+        lines.append(f"  - {site}: {reason}")
+    if result['exclusion_filter']:
+        lines.extend(["", "Exclusion filter:", result['exclusion_filter']])
+    return "\n".join(lines)
+
+def load_site_stats(log_directory=DEFAULT_LOG_DIRECTORY, db_path=None):
+    """Per-site latency stats: the telemetry store when it has data, else the raw logs
+
+    The store already contains the log lines of runs launched from Crow, so the
+    two sources are not merged to avoid counting those requests twice.
+    """
+    try:
+        stats = TelemetryStore(db_path).site_stats()
+        if any(entry['histogram'] for entry in stats.values()):
+            return stats
+    except Exception as e:
+        print(f"Warning: Telemetry store unavailable: {e}")
+    return summarize(collect_from_logs(log_directory))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recommend a Blackbird timeout from observed site latencies")
+    parser.add_argument("--logs", default=DEFAULT_LOG_DIRECTORY, help="Blackbird log directory")
+    parser.add_argument("--db", help="Path to the Crow database (default: results/crow.db)")
+    parser.add_argument("--percentile", type=int, default=95)
+    parser.add_argument("--timeout", type=int, default=30, help="Current timeout in seconds")
+    parser.add_argument("--targets", type=int, default=1, help="Number of targets in the planned run")
+    args = parser.parse_args(argv)
+
+    result = recommend(load_site_stats(args.logs, args.db), args.percentile, args.timeout, targets=args.targets)
+    print(format_recommendation(result))
+    return 0 if result['success'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,9 @@ import time
 import os
 import subprocess
 import socket
-from PyQt6.QtWidgets import QMessageBox
+from metrics import TOR_PROBES, TOR_PROBE_SECONDS
+from net_budget import BUDGET
+from event_bus import BUS, PROGRESS, WARNING
 
 class TORSpoofer:
     def __init__(self, gui_instance=None):
@@ -15,10 +17,9 @@ class TORSpoofer:
         self.tor_password = "hashbrownyummy"  # Set your password here, change it
     
     def log_message(self, message):
-        """Log messages to GUI output area if available"""
-        if self.gui_instance and hasattr(self.gui_instance, 'output_area'):
-            self.gui_instance.output_area.append(f"🔒 TOR: {message}")
-        else:
+        """Publish a message on the event bus (the GUI subscribes), print it when nobody listens"""
+        kind = WARNING if message.startswith(("❌", "⚠️")) else PROGRESS
+        if not BUS.publish(kind, "tor", f"🔒 TOR: {message}"):
             print(f"TOR: {message}")
     
     def check_tor_connection(self):
@@ -51,7 +52,11 @@ class TORSpoofer:
                     'Accept': 'application/json, text/plain, */*'
                 }
                 
-                response = session.get(url, headers=headers, timeout=5)
+                with BUDGET.slot("tor"):
+                    started = time.perf_counter()
+                    response = session.get(url, headers=headers, timeout=5)
+                    TOR_PROBE_SECONDS.observe(time.perf_counter() - started)
+                TOR_PROBES.inc(result="ok" if response.status_code == 200 else "http_error")
                 
                 # Handle 503 and other non-200 responses
                 if response.status_code != 200:
@@ -90,10 +95,12 @@ class TORSpoofer:
                     continue
                     
             except requests.exceptions.Timeout:
+                TOR_PROBES.inc(result="timeout")
                 self.log_message(f"⚠️  Timeout connecting to {url}, trying next...")
                 last_error = "Timeout"
                 continue
             except requests.exceptions.ConnectionError:
+                TOR_PROBES.inc(result="connection_error")
                 self.log_message(f"⚠️  Connection error to {url}, trying next...")
                 last_error = "Connection error"
                 continue